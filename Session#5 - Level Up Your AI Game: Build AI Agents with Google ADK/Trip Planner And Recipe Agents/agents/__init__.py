@@ -1,14 +1,53 @@
-"""Agent modules for ADK Planner."""
-
-from .flight_agent import flight_agent
-from .hotel_agent import hotel_agent
-from .itinerary_generator_agent import itinerary_generator_agent
-from .agent import parallel_search_agent, root_agent
-
-__all__ = [
-    'flight_agent',
-    'hotel_agent',
-    'itinerary_generator_agent',
-    'parallel_search_agent',
-    'root_agent'
-]
+"""
+Agent modules for ADK Planner.
+
+The agents are loaded lazily: `import agents` is cheap, and google.adk is only
+imported the first time an agent below is accessed (e.g. `agents.root_agent`, or
+ADK loading the app). Model clients go further: each agent's models are LazyLlm
+tiers (see agents.model_router), so LiteLLM and the provider clients load on an
+agent's first model call. Lightweight helpers such as agents.serp_client or
+agents.cache can be imported without paying for any of them.
+"""
+
+import importlib
+import sys
+import types
+
+# Exported name -> module that defines it.
+_EXPORTS = {
+    'flight_agent': '.flight_agent',
+    'hotel_agent': '.hotel_agent',
+    'itinerary_generator_agent': '.itinerary_generator_agent',
+    'trip_summary_agent': '.itinerary_generator_agent',
+    'trip_params_agent': '.trip_params',
+    'parallel_search_agent': '.agent',
+    'root_agent': '.agent',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _LazyPackage(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package; keep `agents.flight_agent` etc.
+        # resolving to the agent objects, as they did when these were eager imports.
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyPackage
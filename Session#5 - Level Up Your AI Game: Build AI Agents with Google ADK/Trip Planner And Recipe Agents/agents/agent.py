@@ -1,24 +1,48 @@
 from google.adk.agents import ParallelAgent, SequentialAgent
-from agents.flight_agent import flight_agent
-from agents.hotel_agent import hotel_agent
-from agents.itinerary_generator_agent import itinerary_generator_agent
+from agents.flight_agent import flight_agent, search_flights_from_params
+from agents.hotel_agent import hotel_agent, search_hotels_from_params
+from agents.itinerary_generator_agent import itinerary_generator_agent, trip_summary_agent
+from agents.tracing import setup_tracing
+from agents.trip_params import FLIGHT_PARAMS, HOTEL_PARAMS, DirectSearchAgent, trip_params_agent
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv(override=True)
 
-# Step 1: Create parallel search agent for TRUE parallel execution of flight + hotel
+# Export agent, LLM, tool and SERP spans (TRIP_TRACE_FILE and/or OTEL_EXPORTER_OTLP_ENDPOINT).
+setup_tracing()
+
+# Step 1: Each branch searches straight from the trip_params extracted once up front,
+# and only hands the request to its LLM agent when those parameters are missing.
+flight_search_stage = DirectSearchAgent(
+    name='flight_search_stage',
+    search=search_flights_from_params,
+    required=FLIGHT_PARAMS,
+    fallback_agent=flight_agent,
+    output_key='flight_results',
+)
+hotel_search_stage = DirectSearchAgent(
+    name='hotel_search_stage',
+    search=search_hotels_from_params,
+    required=HOTEL_PARAMS,
+    fallback_agent=hotel_agent,
+    output_key='hotel_results',
+)
+
+# Step 2: Create parallel search agent for TRUE parallel execution of flight + hotel
 parallel_search_agent = ParallelAgent(
     name='parallel_search_agent',
     description="Executes flight and hotel searches in parallel",
-    sub_agents=[flight_agent, hotel_agent],
+    sub_agents=[flight_search_stage, hotel_search_stage],
 )
 
-# Step 2: Create sequential workflow agent that guarantees execution order
+# Step 3: Create sequential workflow agent that guarantees execution order.
+# trip_summary_agent picks the flight/hotel and computes costs in code, so the
+# itinerary LLM only receives a compact summary instead of both result documents.
 trip_workflow_agent = SequentialAgent(
     name='trip_workflow_agent',
-    description="Executes trip planning workflow: parallel search then itinerary generation",
-    sub_agents=[parallel_search_agent, itinerary_generator_agent],
+    description="Executes trip planning workflow: parameter extraction, parallel search, cost summary, then itinerary generation",
+    sub_agents=[trip_params_agent, parallel_search_agent, trip_summary_agent, itinerary_generator_agent],
 )
 
-root_agent = trip_workflow_agent
\ No newline at end of file
+root_agent = trip_workflow_agent
@@ -0,0 +1,375 @@
+"""
+Bundled airport/city index.
+
+Resolves city names, airport names and common aliases ("Bombay", "Trivandrum",
+"Bali") to IATA codes locally, so the flight tools can accept either a code or
+a place name. Codes themselves are passed through unchanged (the bundled file
+is far from exhaustive); set AIRPORT_STRICT_CODES to reject codes it lacks.
+Cities with several airports resolve to their metropolitan code ("New York" ->
+NYC) so searches cover all of them.
+
+The data file (agents/data/airports.csv: code,city,name,country,aliases) is
+read through a memory map once per process and indexed into a character trie
+for exact and prefix lookups; typos are matched by edit distance (with
+transpositions) through a symmetric-delete table. All lookups run in
+microseconds. Point AIRPORT_INDEX_PATH at a larger export in the same format
+to cover more airports.
+"""
+
+import csv
+import mmap
+import os
+import threading
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(override=True)
+
+AIRPORT_INDEX_PATH = os.getenv("AIRPORT_INDEX_PATH") or str(Path(__file__).parent / "data" / "airports.csv")
+# Reject 3-letter codes that are not in the index (only sensible with an exhaustive AIRPORT_INDEX_PATH).
+STRICT_CODES = os.getenv("AIRPORT_STRICT_CODES", "false").lower() not in ("0", "false", "no")
+
+# Metropolitan-area codes of the multi-airport cities in the index; a search for one covers every airport.
+METRO_CODES = {
+    "NYC": "New York",
+    "LON": "London",
+    "PAR": "Paris",
+    "TYO": "Tokyo",
+    "WAS": "Washington",
+    "BJS": "Beijing",
+}
+
+# Airport-name words that never start a lookup key on their own ("International Airport").
+_GENERIC_WORDS = {"airport", "international", "aerodrome", "national", "intercontinental", "of", "the"}
+# Largest edit distance fuzzy lookups support (sizes the deletion table).
+FUZZY_MAX_DISTANCE = 2
+
+
+@dataclass(frozen=True, slots=True)
+class Airport:
+    """One row of the index; rank is the row order (primary airports of a city come first)."""
+    code: str
+    city: str
+    name: str
+    country: str
+    rank: int
+
+    def label(self) -> str:
+        return f"{self.city} ({self.code})"
+
+
+def normalize_name(text: str) -> str:
+    """Case-, accent- and punctuation-insensitive form used as the trie key."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    letters = "".join(ch if ch.isalnum() else " " for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(letters.casefold().split())
+
+
+def _deletes(key: str, distance: int) -> set:
+    """key plus every string obtained by deleting up to `distance` characters from it."""
+    variants = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions), capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before_previous, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before_previous is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.codes: List[str] = []
+
+
+class AirportIndex:
+    """
+    In-memory index over the airport data file.
+
+    City names, aliases and airport names (plus each word-suffix of the airport
+    name, so "Changi" finds "Singapore Changi Airport") are keys in one trie
+    whose terminal nodes list airport codes in rank order. Fuzzy matching runs
+    over the city names and aliases only, through a table of their deletion
+    variants (symmetric delete), so a typo costs a few dictionary probes.
+    """
+
+    def __init__(self, path: str = AIRPORT_INDEX_PATH):
+        self.path = path
+        self.airports: Dict[str, Airport] = {}
+        self._root = _TrieNode()
+        self._places: Dict[str, List[str]] = {}
+        self._deleted: Dict[str, List[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            lines = iter(data.readline, b"")
+            next(lines, None)  # header
+            for rank, row in enumerate(csv.reader(line.decode("utf-8") for line in lines)):
+                if len(row) < 4 or not row[0].strip():
+                    continue
+                code, city, name, country = (value.strip() for value in row[:4])
+                aliases = row[4].split("|") if len(row) > 4 and row[4] else []
+                airport = Airport(code.upper(), city, name, country, rank)
+                self.airports[airport.code] = airport
+
+                for key in map(normalize_name, (city, *aliases)):
+                    self._insert(self._root, key, airport.code)
+                    self._add_place(key, airport.code)
+                words = normalize_name(name).split()
+                for start in range(len(words)):
+                    if words[start] not in _GENERIC_WORDS:
+                        self._insert(self._root, " ".join(words[start:]), airport.code)
+
+    @staticmethod
+    def _insert(root: _TrieNode, key: str, code: str) -> None:
+        if not key:
+            return
+        node = root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+        if code not in node.codes:
+            node.codes.append(code)
+
+    def _add_place(self, key: str, code: str) -> None:
+        if not key:
+            return
+        codes = self._places.setdefault(key, [])
+        if code in codes:
+            return
+        if not codes:
+            for variant in _deletes(key, FUZZY_MAX_DISTANCE):
+                self._deleted.setdefault(variant, []).append(key)
+        codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.airports)
+
+    def _node(self, key: str) -> Optional[_TrieNode]:
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def _ranked(self, codes) -> List[Airport]:
+        return sorted((self.airports[code] for code in set(codes)), key=lambda airport: airport.rank)
+
+    def _collect(self, node: _TrieNode, limit: int) -> List[Airport]:
+        """Codes at and below node, breadth-first so shorter keys come first."""
+        found: List[str] = []
+        level = [node]
+        while level and len(found) < limit:
+            for current in level:
+                found.extend(code for code in current.codes if code not in found)
+            level = [child for current in level for child in current.children.values()]
+        return [self.airports[code] for code in found[:limit]]
+
+    def get(self, code: str) -> Optional[Airport]:
+        """Airport for an IATA code, or None."""
+        return self.airports.get((code or "").strip().upper())
+
+    def lookup(self, name: str) -> List[Airport]:
+        """Airports whose city, alias or airport name matches exactly (after normalization)."""
+        node = self._node(normalize_name(name))
+        return self._ranked(node.codes) if node else []
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Airport]:
+        """Airports with a key starting with prefix, shortest completions first."""
+        node = self._node(normalize_name(prefix))
+        return self._collect(node, limit) if node else []
+
+    def fuzzy(self, query: str, max_distance: Optional[int] = None, limit: int = 5) -> List[Tuple[Airport, int]]:
+        """
+        Airports whose city name or alias is within max_distance edits of the query.
+
+        Edits are insertions, deletions, substitutions and adjacent transpositions
+        ("Dehli" -> "Delhi" is one edit). The default allows 1 edit for short
+        queries and 2 for longer ones.
+
+        Returns:
+            (airport, distance) pairs, closest and highest-ranked first
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(key) <= 4 else 2
+        max_distance = min(max_distance, FUZZY_MAX_DISTANCE)
+
+        # Any key within d edits shares a "delete up to d characters" variant with the query.
+        candidates = set()
+        for variant in _deletes(key, max_distance):
+            candidates.update(self._deleted.get(variant, ()))
+
+        best: Dict[str, int] = {}
+        for candidate in candidates:
+            distance = _edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                for code in self._places[candidate]:
+                    best[code] = min(best.get(code, distance), distance)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], self.airports[item[0]].rank))
+        return [(self.airports[code], distance) for code, distance in ranked[:limit]]
+
+    def resolve(self, query: str) -> Optional[Airport]:
+        """
+        Best airport for a code or place name: exact code, then exact name, then the
+        leading words of a name ("Heathrow", "Goa airport"), then a single
+        unambiguous fuzzy match.
+        """
+        query = (query or "").strip()
+        if len(query) == 3 and query.isalpha() and query.isupper() and query in self.airports:
+            return self.airports[query]
+
+        matches = self.lookup(query)
+        if matches:
+            return matches[0]
+
+        words = [word for word in normalize_name(query).split() if word not in _GENERIC_WORDS]
+        if words:
+            key = " ".join(words)
+            matches = self.lookup(key)
+            node = self._node(key + " ")
+            if not matches and node is not None:
+                matches = self._collect(node, 1)
+            if matches:
+                return matches[0]
+
+        if len(query) == 3 and query.isalpha() and query.upper() in self.airports:
+            return self.airports[query.upper()]
+
+        candidates = self.fuzzy(query, limit=2)
+        if len(candidates) == 1 or (len(candidates) == 2 and candidates[0][1] < candidates[1][1]):
+            return candidates[0][0]
+        return None
+
+    def suggest(self, query: str, limit: int = 3) -> List[Airport]:
+        """Close matches to show when a query can't be resolved."""
+        suggestions = [airport for airport, _ in self.fuzzy(query, limit=limit)]
+        for airport in self.complete(query, limit):
+            if airport not in suggestions:
+                suggestions.append(airport)
+        return suggestions[:limit]
+
+
+_index: Optional[AirportIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """The process-wide index, built on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AirportIndex()
+    return _index
+
+
+def metro_code(value: str) -> Optional[str]:
+    """Metropolitan code for a metro code or the name of its city in any case ("nyc", "New York"), or None."""
+    key = normalize_name(value)
+    for code, city in METRO_CODES.items():
+        if key in (code.lower(), normalize_name(city)):
+            return code
+    return None
+
+
+def _is_code(value: str) -> bool:
+    return len(value) == 3 and value.isalpha() and value.isupper()
+
+
+@lru_cache(maxsize=4096)
+def resolve_airport_code(value: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Turn an airport code or place name into an IATA code, without calling SERP.
+    Results are memoized, so repeated (including fuzzy) lookups are dictionary hits.
+
+    An uppercase 3-letter code is passed through unchanged unless it is missing
+    from the index and is the name of an indexed place instead ("GOA" -> GOI);
+    with AIRPORT_STRICT_CODES, codes missing from the index are rejected.
+    Multi-airport cities resolve to their metropolitan code ("New York" -> NYC).
+
+    Args:
+        value: Code ("DEL", "AUS", "NYC"), city ("Delhi", "Bombay") or airport name
+
+    Returns:
+        (code, error_message) - exactly one of them is set
+    """
+    value = (value or "").strip()
+    if not value:
+        return None, "Missing airport code"
+
+    index = get_airport_index()
+    if _is_code(value):
+        if value in index.airports or value in METRO_CODES:
+            return value, None
+        matches = index.lookup(value)
+        if matches:
+            return metro_code(matches[0].city) or matches[0].code, None
+        if not STRICT_CODES:
+            return value, None
+
+    metro = metro_code(value)
+    if metro is not None:
+        return metro, None
+
+    airport = index.resolve(value)
+    if airport is not None:
+        return airport.code, None
+
+    if len(value) == 3 and value.isalpha() and not STRICT_CODES:
+        return value.upper(), None
+
+    suggestions = ", ".join(airport.label() for airport in index.suggest(value))
+    hint = f" Did you mean: {suggestions}?" if suggestions else ""
+    return None, f"Unknown airport or city '{value}'.{hint}"
+
+
+def canonical_city(city: str) -> str:
+    """
+    City name for hotel searches: an airport or metro code becomes its city ("BOM" ->
+    "Mumbai", "NYC" -> "New York") and an exact city name gets its canonical
+    spelling ("mumbai" -> "Mumbai").
+
+    Anything else - aliases and nearby places included - is returned as given: an
+    airport alias names the place the airport serves, not the place to stay
+    ("Manali" flies into Kullu, "Bali" into Denpasar), so hotels are searched
+    where the user asked.
+    """
+    city = (city or "").strip()
+    index = get_airport_index()
+
+    if city in METRO_CODES:
+        return METRO_CODES[city]
+    airport = index.get(city) if len(city) == 3 and city.isupper() else None
+    if airport is None:
+        key = normalize_name(city)
+        airport = next((match for match in index.lookup(city) if normalize_name(match.city) == key), None)
+    return airport.city if airport is not None else city
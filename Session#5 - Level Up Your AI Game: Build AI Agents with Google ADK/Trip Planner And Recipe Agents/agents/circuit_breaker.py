@@ -0,0 +1,161 @@
+"""Per-engine circuit breakers for the SERP backends."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"{name} is temporarily unavailable (circuit open, retrying in {retry_in:.0f}s)")
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    - closed: calls flow; failure_threshold consecutive failures open the breaker
+    - open: calls fail fast for recovery_seconds
+    - half_open: up to half_open_max_calls probes go through; a success closes
+      the breaker, a failure re-opens it
+
+    Every state change starts a new generation. Callers that pass the generation
+    admit() gave them to record_success/record_failure/release only affect the
+    breaker while it is still in that generation, so a slow call admitted while
+    closed cannot close a breaker that has since tripped open.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._generation += 1
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._generation += 1
+        self.opened_count += 1
+
+    def _is_stale(self, generation: Optional[int]) -> bool:
+        return generation is not None and generation != self._generation
+
+    def admit(self) -> Optional[int]:
+        """
+        Let a call through if the breaker allows it (counting it as a probe when half-open).
+
+        Returns:
+            The generation the call was admitted in, or None if it must fail fast
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return self._generation
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return self._generation
+            self.rejected += 1
+            return None
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed (counting it as a probe when half-open)."""
+        return self.admit() is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will let a probe through."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.recovery_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state != CLOSED:
+                self._generation += 1
+            self._state = CLOSED
+            self._failures = 0
+
+    def release(self, generation: Optional[int] = None) -> None:
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if self._is_stale(generation):
+                return
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def stats(self) -> dict:
+        """Return the current state and counters."""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened_count": self.opened_count,
+                "rejected": self.rejected,
+            }
+
+
+class BreakerRegistry:
+    """Lazily creates one CircuitBreaker per upstream name with shared settings."""
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(
+                    name, self.failure_threshold, self.recovery_seconds, self.half_open_max_calls
+                )
+            return breaker
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in breakers.items()}
@@ -1,27 +1,71 @@
+import asyncio
+import contextvars
 import os
+import time
+import httpx
 import requests
-from datetime import datetime
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from google.adk.agents.llm_agent import Agent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.tools.tool_context import ToolContext
+from agents.airport_index import resolve_airport_code
+from agents.cache import TTLCache
+from agents.circuit_breaker import CLOSED, CircuitOpenError
+from agents.flight_ranking import rank_flight_options
+from agents.flight_results import FlightOption, parse_flight_options, render_flight_markdown, render_flight_results
+from agents.model_router import routed_model
+from agents.prompt_cache import dated_instruction, record_prompt_cache_usage
+from agents.serp_client import serp_breakers, serp_get, serp_get_async
+from agents.serp_decode import FLIGHT_PROJECTION, decode_serp
+from agents.singleflight import AsyncSingleFlight, SingleFlight
+from agents.tracing import get_tracer
 
 # Load environment variables
 load_dotenv(override=True)
 
-def _fetch_one_way_flights(
-    departure_id: str,
-    arrival_id: str,
-    travel_date: str,
-    api_key: str
-) -> Tuple[Optional[List[dict]], Optional[str]]:
-    """
-    Fetch one-way flight options for a specific date.
+# Round trips search both legs at the same time under one shared deadline.
+# Set FLIGHT_ROUND_TRIP_CONCURRENT=false to fall back to back-to-back searches.
+ROUND_TRIP_CONCURRENT = os.getenv("FLIGHT_ROUND_TRIP_CONCURRENT", "true").lower() not in ("0", "false", "no")
+ROUND_TRIP_DEADLINE_SECONDS = float(os.getenv("FLIGHT_ROUND_TRIP_DEADLINE_SECONDS", "30"))
+
+# Flexible-date searches fan out over +/- N days; cap N and the number of SERP calls in flight.
+FLEX_MAX_DAYS = int(os.getenv("FLIGHT_FLEX_MAX_DAYS", "3"))
+FLEX_CONCURRENCY = int(os.getenv("FLIGHT_FLEX_CONCURRENCY", "4"))
+
+# "text" returns the rendered block; "structured" returns compact option dicts, which are
+# smaller in the model's context and need no re-parsing.
+RESULT_FORMAT = os.getenv("FLIGHT_TOOL_RESULT_FORMAT", "text").lower()
+RESULT_LIMIT = 5
+
+# Render the final markdown in code and write it straight to flight_results, ending the
+# agent's turn after the tool call instead of spending a second LLM call on formatting.
+DIRECT_RENDER = os.getenv("FLIGHT_DIRECT_RENDER", "false").lower() in ("1", "true", "yes")
+
+# Models tried in order (primary first; see agents/model_router.py) and the time-to-first-response
+# SLO past which calls move to the next tier.
+MODEL_TIERS = os.getenv("FLIGHT_MODEL_TIERS", "claude-sonnet-4-5-20250929,gemini-2.5-flash")
+MODEL_SLO_SECONDS = float(os.getenv("FLIGHT_MODEL_SLO_SECONDS", "15"))
+
+# Successful one-way searches are shared across sessions, keyed by (departure, arrival, date).
+flight_cache = TTLCache(
+    max_size=int(os.getenv("FLIGHT_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("FLIGHT_CACHE_TTL_SECONDS", "900")),
+    # Expired results are kept this much longer to answer from while google_flights is failing.
+    stale_seconds=float(os.getenv("FLIGHT_CACHE_STALE_SECONDS", "3600")),
+)
+# Concurrent cache misses for the same route/date share one upstream SERP call.
+flight_singleflight = SingleFlight()
+flight_singleflight_async = AsyncSingleFlight()
+_tracer = get_tracer(__name__)
 
-    Returns:
-        (flights, error_message)
-    """
-    params = {
+FlightLegResult = Tuple[Optional[List[dict]], Optional[str]]
+
+
+def _flight_search_params(departure_id: str, arrival_id: str, travel_date: str, api_key: str) -> dict:
+    """Build SERP API query parameters for a one-way Google Flights search."""
+    return {
         "engine": "google_flights",
         "departure_id": departure_id,
         "arrival_id": arrival_id,
@@ -32,67 +76,383 @@ def _fetch_one_way_flights(
         "api_key": api_key
     }
 
+
+def _parse_flights(data: dict) -> FlightLegResult:
+    """Pull every flight option out of a Google Flights response (best_flights, then other_flights)."""
+    flights = (data.get("best_flights") or []) + (data.get("other_flights") or [])
+
+    if not flights:
+        return None, "No flights found for this route and date"
+
+    return flights, None
+
+
+def _flight_cache_key(departure_id: str, arrival_id: str, travel_date: str) -> tuple:
+    return ((departure_id or "").upper(), (arrival_id or "").upper(), travel_date)
+
+
+def _stale_fallback(key: tuple, error: str) -> FlightLegResult:
+    """While the google_flights breaker is not closed, answer from an expired cache entry if one exists."""
+    if serp_breakers.get("google_flights").state != CLOSED:
+        flights = flight_cache.get_stale(key)
+        if flights is not None:
+            return flights, None
+    return None, error
+
+
+def _leg_attributes(key: tuple) -> dict:
+    departure_id, arrival_id, travel_date = key
+    return {"flight.departure_id": departure_id, "flight.arrival_id": arrival_id, "flight.date": travel_date}
+
+
+def _resolve_route(departure_id: str, arrival_id: str) -> Tuple[Optional[str], Optional[str], Optional[dict]]:
+    """
+    Resolve both endpoints (codes or place names) against the local airport index.
+
+    Returns:
+        (departure_code, arrival_code, error_response) - error_response is set if either can't be resolved
+    """
+    departure_code, departure_error = resolve_airport_code(departure_id)
+    arrival_code, arrival_error = resolve_airport_code(arrival_id)
+    errors = [error for error in (departure_error, arrival_error) if error]
+    if not errors and departure_code == arrival_code:
+        errors.append(f"Departure and arrival are the same airport ({departure_code})")
+    if errors:
+        return None, None, {"status": "error", "message": " ".join(errors)}
+    return departure_code, arrival_code, None
+
+
+def _get_serp_api_key() -> Optional[str]:
+    """Return the configured SERP API key, or None if it is missing or a placeholder."""
+    api_key = os.getenv("SERP_API_KEY")
+    if not api_key or api_key == "your_serp_api_key_here":
+        return None
+    return api_key
+
+
+def _fetch_one_way_flights(
+    departure_id: str,
+    arrival_id: str,
+    travel_date: str,
+    api_key: str,
+    timeout: float = 30,
+    hedge: Optional[bool] = None
+) -> FlightLegResult:
+    """
+    Fetch one-way flight options for a specific date.
+
+    hedge overrides SERP_HEDGE_ENABLED for this call (see serp_client.serp_get).
+
+    Returns:
+        (flights, error_message)
+    """
+    params = _flight_search_params(departure_id, arrival_id, travel_date, api_key)
+
     try:
-        response = requests.get("https://serpapi.com/search", params=params, timeout=30)
+        response = serp_get(params, timeout=timeout, hedge=hedge)
         response.raise_for_status()
 
-        data = response.json()
-        flights = data.get("best_flights") or data.get("other_flights") or []
+        return _parse_flights(decode_serp(response.content, FLIGHT_PROJECTION, params["engine"]))
+
+    except CircuitOpenError as e:
+        return None, str(e)
+    except requests.exceptions.RequestException as e:
+        return None, f"API request failed: {str(e)}"
+    except Exception as e:
+        return None, f"Error searching flights: {str(e)}"
 
-        if not flights:
-            return None, "No flights found for this route and date"
 
-        return flights, None
+async def _fetch_one_way_flights_async(
+    departure_id: str,
+    arrival_id: str,
+    travel_date: str,
+    api_key: str,
+    timeout: float = 30,
+    hedge: Optional[bool] = None
+) -> FlightLegResult:
+    """
+    Non-blocking version of _fetch_one_way_flights.
 
-    except requests.exceptions.RequestException as e:
+    Returns:
+        (flights, error_message)
+    """
+    params = _flight_search_params(departure_id, arrival_id, travel_date, api_key)
+
+    try:
+        response = await serp_get_async(params, timeout=timeout, hedge=hedge)
+        response.raise_for_status()
+
+        return _parse_flights(decode_serp(response.content, FLIGHT_PROJECTION, params["engine"]))
+
+    except CircuitOpenError as e:
+        return None, str(e)
+    except httpx.HTTPError as e:
         return None, f"API request failed: {str(e)}"
     except Exception as e:
         return None, f"Error searching flights: {str(e)}"
 
-def search_flights(
+
+def _cached_fetch_one_way_flights(
+    departure_id: str,
+    arrival_id: str,
+    travel_date: str,
+    api_key: str,
+    timeout: float = 30,
+    force_refresh: bool = False
+) -> FlightLegResult:
+    """
+    Fetch one-way flights through the in-process route/date cache.
+
+    Only successful searches are cached; force_refresh skips the lookup and
+    overwrites whatever was stored. Concurrent misses for the same key are
+    coalesced into a single SERP request. If the search fails while the
+    google_flights circuit breaker is open, a recently expired entry is served.
+
+    Returns:
+        (flights, error_message)
+    """
+    key = _flight_cache_key(departure_id, arrival_id, travel_date)
+
+    with _tracer.start_as_current_span("flight_search.leg", attributes=_leg_attributes(key)) as span:
+        if not force_refresh:
+            flights = flight_cache.get(key)
+            span.set_attribute("cache.hit", flights is not None)
+            if flights is not None:
+                return flights, None
+
+        def fetch_and_store() -> FlightLegResult:
+            fetched, fetch_error = _fetch_one_way_flights(departure_id, arrival_id, travel_date, api_key, timeout)
+            if not fetch_error:
+                flight_cache.set(key, fetched)
+            return fetched, fetch_error
+
+        (flights, error), shared = flight_singleflight.do(key, fetch_and_store)
+        span.set_attribute("singleflight.shared", shared)
+        if error:
+            flights, error = _stale_fallback(key, error)
+            span.set_attribute("cache.stale_fallback", flights is not None)
+        return flights, error
+
+
+async def _cached_fetch_one_way_flights_async(
+    departure_id: str,
+    arrival_id: str,
+    travel_date: str,
+    api_key: str,
+    timeout: float = 30,
+    force_refresh: bool = False
+) -> FlightLegResult:
+    """
+    Non-blocking version of _cached_fetch_one_way_flights (same cache, async coalescing).
+
+    Returns:
+        (flights, error_message)
+    """
+    key = _flight_cache_key(departure_id, arrival_id, travel_date)
+
+    with _tracer.start_as_current_span("flight_search.leg", attributes=_leg_attributes(key)) as span:
+        if not force_refresh:
+            flights = flight_cache.get(key)
+            span.set_attribute("cache.hit", flights is not None)
+            if flights is not None:
+                return flights, None
+
+        async def fetch_and_store() -> FlightLegResult:
+            fetched, fetch_error = await _fetch_one_way_flights_async(departure_id, arrival_id, travel_date, api_key, timeout)
+            if not fetch_error:
+                flight_cache.set(key, fetched)
+            return fetched, fetch_error
+
+        (flights, error), shared = await flight_singleflight_async.do(key, fetch_and_store)
+        span.set_attribute("singleflight.shared", shared)
+        if error:
+            flights, error = _stale_fallback(key, error)
+            span.set_attribute("cache.stale_fallback", flights is not None)
+        return flights, error
+
+
+def _fetch_round_trip_flights(
     departure_id: str,
     arrival_id: str,
     outbound_date: str,
-    return_date: str = None
-) -> dict:
+    return_date: str,
+    api_key: str,
+    deadline: float = ROUND_TRIP_DEADLINE_SECONDS,
+    force_refresh: bool = False
+) -> Tuple[FlightLegResult, FlightLegResult]:
     """
-    Search for flights using SERP API Google Flights.
-    Round trips are fulfilled by two one-way searches (outbound + inbound).
+    Fetch the outbound and return legs concurrently under a single deadline.
 
-    Args:
-        departure_id: Airport code for departure (e.g., "DEL" for Delhi)
-        arrival_id: Airport code for arrival (e.g., "BOM" for Mumbai)
-        outbound_date: Departure date in YYYY-MM-DD format
-        return_date: Optional return date in YYYY-MM-DD format for round trips
+    Each leg gets its own result, so one slow or failed leg never hides the other
+    and neither leg's error is raised.
 
     Returns:
-        Dictionary containing flight search results
+        ((outbound_flights, outbound_error), (return_flights, return_error))
     """
-    api_key = os.getenv("SERP_API_KEY")
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flight-leg")
+    try:
+        # Each leg runs in a copy of the caller's context so its spans join the request's trace.
+        outbound_future = executor.submit(
+            contextvars.copy_context().run,
+            _cached_fetch_one_way_flights, departure_id, arrival_id, outbound_date, api_key, deadline, force_refresh
+        )
+        return_future = executor.submit(
+            contextvars.copy_context().run,
+            _cached_fetch_one_way_flights, arrival_id, departure_id, return_date, api_key, deadline, force_refresh
+        )
+        wait([outbound_future, return_future], timeout=max(0.0, deadline - (time.monotonic() - started)))
+
+        def leg_result(future) -> FlightLegResult:
+            if not future.done():
+                future.cancel()
+                return None, f"Search timed out after {deadline:g}s"
+            if future.exception() is not None:
+                return None, f"Error searching flights: {future.exception()}"
+            return future.result()
+
+        return leg_result(outbound_future), leg_result(return_future)
+    finally:
+        # Don't block on a leg that overran the deadline; its socket timeout will reap it.
+        executor.shutdown(wait=False)
+
+
+async def _fetch_round_trip_flights_async(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: str,
+    api_key: str,
+    deadline: float = ROUND_TRIP_DEADLINE_SECONDS,
+    force_refresh: bool = False
+) -> Tuple[FlightLegResult, FlightLegResult]:
+    """
+    Non-blocking version of _fetch_round_trip_flights; legs still overrunning the deadline are cancelled.
 
-    if not api_key or api_key == "your_serp_api_key_here":
-        return {
-            "status": "error",
-            "message": "SERP_API_KEY not configured. Please add your SERP API key to .env file"
-        }
+    Returns:
+        ((outbound_flights, outbound_error), (return_flights, return_error))
+    """
+    outbound_task = asyncio.ensure_future(_cached_fetch_one_way_flights_async(
+        departure_id, arrival_id, outbound_date, api_key, deadline, force_refresh
+    ))
+    return_task = asyncio.ensure_future(_cached_fetch_one_way_flights_async(
+        arrival_id, departure_id, return_date, api_key, deadline, force_refresh
+    ))
+    await asyncio.wait([outbound_task, return_task], timeout=deadline)
+
+    def leg_result(task: asyncio.Future) -> FlightLegResult:
+        if not task.done():
+            task.cancel()
+            return None, f"Search timed out after {deadline:g}s"
+        if task.exception() is not None:
+            return None, f"Error searching flights: {task.exception()}"
+        return task.result()
+
+    return leg_result(outbound_task), leg_result(return_task)
+
+
+def _ranked_options(
+    flights: Optional[List[dict]],
+    weights: Optional[Dict[str, float]] = None,
+    limit: Optional[int] = None
+) -> List[FlightOption]:
+    """Parse every option of one leg, drop duplicate itineraries and rank them (see flight_ranking)."""
+    return rank_flight_options(parse_flight_options(flights), weights, limit)
+
+
+def _ranking_weights(
+    price_weight: Optional[float],
+    duration_weight: Optional[float],
+    stops_weight: Optional[float]
+) -> Tuple[Optional[Dict[str, float]], Optional[dict]]:
+    """
+    Collect the user's ranking weights; unset ones keep their defaults.
+
+    Returns:
+        (weights or None, error_response or None)
+    """
+    given = {"price": price_weight, "duration": duration_weight, "stops": stops_weight}
+    weights = {name: float(value) for name, value in given.items() if value is not None}
+    if any(value < 0 for value in weights.values()):
+        return None, {"status": "error", "message": "Ranking weights must be zero or positive"}
+    return weights or None, None
+
+
+def _structured_leg(
+    departure_id: str,
+    arrival_id: str,
+    travel_date: str,
+    leg: FlightLegResult,
+    weights: Optional[Dict[str, float]] = None
+) -> dict:
+    """Compact, JSON-friendly view of one searched direction."""
+    flights, error = leg
+    summary = {"route": f"{departure_id} → {arrival_id}", "date": travel_date}
+    if error:
+        summary["error"] = error
+    else:
+        summary["options"] = [option.to_dict() for option in _ranked_options(flights, weights, RESULT_LIMIT)]
+    return summary
+
+
+def _flight_search_state(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: Optional[str],
+    outbound: FlightLegResult,
+    inbound: Optional[FlightLegResult] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> dict:
+    """Compact structured search output kept in session state for later pipeline stages (ranked, best first)."""
+    def options(leg: Optional[FlightLegResult]) -> List[dict]:
+        flights = leg[0] if leg else None
+        return [option.to_dict() for option in _ranked_options(flights, weights)]
+
+    return {
+        "departure_id": (departure_id or "").upper(),
+        "arrival_id": (arrival_id or "").upper(),
+        "outbound_date": outbound_date,
+        "return_date": return_date,
+        "outbound": options(outbound),
+        "return": options(inbound),
+    }
+
+
+def _build_flight_response(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: Optional[str],
+    outbound: FlightLegResult,
+    inbound: Optional[FlightLegResult] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> dict:
+    """Turn per-leg (flights, error) results into the search_flights tool response."""
+    outbound_flights, outbound_error = outbound
 
     # One-way request
     if not return_date:
-        flights, error = _fetch_one_way_flights(departure_id, arrival_id, outbound_date, api_key)
+        if outbound_error:
+            return {"status": "error", "message": outbound_error}
 
-        if error:
-            return {"status": "error", "message": error}
+        if RESULT_FORMAT == "structured":
+            return {
+                "status": "success",
+                "trip_type": "one_way",
+                "outbound": _structured_leg(departure_id, arrival_id, outbound_date, outbound, weights),
+            }
 
-        formatted_results = format_flight_results(flights, departure_id, arrival_id, outbound_date, return_date)
+        formatted_results = format_flight_results(
+            outbound_flights, departure_id, arrival_id, outbound_date, return_date, weights=weights
+        )
 
         return {
             "status": "success",
             "flights": formatted_results
         }
 
-    # Round-trip: run two one-way searches (SERP API does not reliably return return legs)
-    outbound_flights, outbound_error = _fetch_one_way_flights(departure_id, arrival_id, outbound_date, api_key)
-    return_flights, return_error = _fetch_one_way_flights(arrival_id, departure_id, return_date, api_key)
+    return_flights, return_error = inbound
 
     if outbound_error and return_error:
         return {
@@ -100,19 +460,32 @@ def search_flights(
             "message": f"Outbound search failed: {outbound_error}; Return search failed: {return_error}"
         }
 
+    if RESULT_FORMAT == "structured":
+        return {
+            "status": "success",
+            "trip_type": "round_trip",
+            "note": "Round trip shown as two one-way searches because SERP API responses often omit return legs.",
+            "outbound": _structured_leg(departure_id, arrival_id, outbound_date, outbound, weights),
+            "return": _structured_leg(arrival_id, departure_id, return_date, inbound, weights),
+        }
+
     result_message = "Round trip requested. Showing two one-way searches because SERP API responses often omit return legs.\n\n"
 
     if outbound_error:
         result_message += f"Outbound {departure_id} → {arrival_id} ({outbound_date}) failed: {outbound_error}\n\n"
     else:
         result_message += f"Outbound {departure_id} → {arrival_id} ({outbound_date}):\n"
-        result_message += format_flight_results(outbound_flights, departure_id, arrival_id, outbound_date)
+        result_message += format_flight_results(
+            outbound_flights, departure_id, arrival_id, outbound_date, weights=weights
+        )
 
     if return_error:
         result_message += f"Return {arrival_id} → {departure_id} ({return_date}) failed: {return_error}\n"
     else:
         result_message += f"Return {arrival_id} → {departure_id} ({return_date}):\n"
-        result_message += format_flight_results(return_flights, arrival_id, departure_id, return_date)
+        result_message += format_flight_results(
+            return_flights, arrival_id, departure_id, return_date, weights=weights
+        )
 
     return {
         "status": "success",
@@ -120,155 +493,379 @@ def search_flights(
     }
 
 
-def format_flight_results(flights: list, departure: str, arrival: str, outbound_date: str, return_date: str = None) -> str:
+def _flight_markdown(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: Optional[str],
+    outbound: FlightLegResult,
+    inbound: Optional[FlightLegResult] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> str:
+    """Markdown for the flight_results state key, in the format the agent's instruction describes."""
+    def options(leg: Optional[FlightLegResult]):
+        return _ranked_options(leg[0], weights, RESULT_LIMIT) if leg else []
+
+    return render_flight_markdown(
+        (departure_id or "").upper(),
+        (arrival_id or "").upper(),
+        outbound_date,
+        options(outbound),
+        outbound[1],
+        return_date,
+        options(inbound),
+        inbound[1] if inbound else None,
+        limit=RESULT_LIMIT,
+    )
+
+
+_MISSING_API_KEY_RESPONSE = {
+    "status": "error",
+    "message": "SERP_API_KEY not configured. Please add your SERP API key to .env file"
+}
+
+
+def search_flights(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: str = None,
+    force_refresh: bool = False,
+    price_weight: Optional[float] = None,
+    duration_weight: Optional[float] = None,
+    stops_weight: Optional[float] = None
+) -> dict:
     """
-    Format flight results into a readable string.
+    Search for flights using SERP API Google Flights.
+    Round trips are fulfilled by two one-way searches (outbound + inbound) that run concurrently.
 
     Args:
-        flights: List of flight options from SERP API
-        departure: Departure airport code
-        arrival: Arrival airport code
-        outbound_date: Outbound date
-        return_date: Optional return date
+        departure_id: Airport code for departure (e.g., "DEL" for Delhi); a city name is also accepted
+        arrival_id: Airport code for arrival (e.g., "BOM" for Mumbai); a city name is also accepted
+        outbound_date: Departure date in YYYY-MM-DD format
+        return_date: Optional return date in YYYY-MM-DD format for round trips
+        force_refresh: Skip cached results and fetch live prices (only when the user asks to refresh)
+        price_weight: How much a lower price matters when ranking options (default 0.6)
+        duration_weight: How much a shorter journey matters (default 0.3)
+        stops_weight: How much fewer stops matter (default 0.1)
 
     Returns:
-        Formatted string with flight details
+        Dictionary containing flight search results
     """
-    if not flights:
-        return "No flights available"
-
-    origin_code = (departure or "").upper()
-    destination_code = (arrival or "").upper()
-
-    def get_airport_code(airport: dict) -> str:
-        """Extract the most likely IATA/airport code from the SERP response."""
-        for key in ("code", "iata", "iata_code", "id"):
-            if airport.get(key):
-                return str(airport[key]).upper()
-        return ""
-
-    def classify_leg(flight_leg: dict) -> str:
-        """Identify whether a leg looks outbound or return based on airport codes."""
-        dep_code = get_airport_code(flight_leg.get("departure_airport", {}))
-        arr_code = get_airport_code(flight_leg.get("arrival_airport", {}))
-
-        if dep_code == origin_code and arr_code == destination_code:
-            return "outbound"
-        if dep_code == destination_code and arr_code == origin_code:
-            return "return"
-        return "other"
-
-    def append_leg_block(label: str, legs: list) -> str:
-        """Render a block of legs with an optional label."""
-        block = ""
-        if not legs:
-            return block
-
-        if label:
-            block += f"  {label}:\n"
-
-        for flight_leg in legs:
-            departure_airport = flight_leg.get("departure_airport", {}).get("name", "Unknown")
-            arrival_airport = flight_leg.get("arrival_airport", {}).get("name", "Unknown")
-
-            departure_time = flight_leg.get("departure_airport", {}).get("time", "N/A")
-            arrival_time = flight_leg.get("arrival_airport", {}).get("time", "N/A")
-
-            airline = flight_leg.get("airline", "Unknown")
-            duration = flight_leg.get("duration", "N/A")
-            layovers = flight_leg.get("layovers", [])
-            stops_info = f"{len(layovers)} stop(s)" if layovers else "Direct"
-
-            indent = "     " if label else "  "
-            block += f"{indent}✈️  {airline}\n"
-            block += f"{indent}   {departure_airport} ({departure_time}) → {arrival_airport} ({arrival_time})\n"
-            block += f"{indent}   Duration: {duration} min | {stops_info}\n"
-
-        block += "\n"
-        return block
-
-    trip_type = "Round Trip" if return_date else "One Way"
-    result = f"\n{'='*60}\n"
-    result += f"Flight Search Results: {departure} → {arrival}\n"
-    result += f"Type: {trip_type} | Outbound: {outbound_date}"
-    if return_date:
-        result += f" | Return: {return_date}"
-    result += f"\n{'='*60}\n\n"
-
-    # Show top 5 flights
-    for i, flight in enumerate(flights[:5], 1):
-        result += f"Option {i}:\n"
-
-        # Price
-        price = flight.get("price", "N/A")
-        result += f"  💰 Price: ₹{price:,} INR\n" if isinstance(price, int) else f"  💰 Price: {price}\n"
-
-        flight_legs = flight.get("flights", [])
-        outbound_legs = []
-        return_legs = []
-        on_return = False
-
-        for flight_leg in flight_legs:
-            classification = classify_leg(flight_leg)
-            dep_code = get_airport_code(flight_leg.get("departure_airport", {}))
-
-            if classification == "return":
-                on_return = True
-                return_legs.append(flight_leg)
-                continue
+    api_key = _get_serp_api_key()
+    if not api_key:
+        return dict(_MISSING_API_KEY_RESPONSE)
 
-            if classification == "outbound":
-                if on_return:
-                    return_legs.append(flight_leg)
-                else:
-                    outbound_legs.append(flight_leg)
-                continue
+    departure_id, arrival_id, error_response = _resolve_route(departure_id, arrival_id)
+    if error_response:
+        return error_response
+    weights, error_response = _ranking_weights(price_weight, duration_weight, stops_weight)
+    if error_response:
+        return error_response
+
+    if not return_date:
+        outbound = _cached_fetch_one_way_flights(
+            departure_id, arrival_id, outbound_date, api_key, force_refresh=force_refresh
+        )
+        return _build_flight_response(departure_id, arrival_id, outbound_date, return_date, outbound, weights=weights)
+
+    # Round-trip: run two one-way searches (SERP API does not reliably return return legs)
+    if ROUND_TRIP_CONCURRENT:
+        outbound, inbound = _fetch_round_trip_flights(
+            departure_id, arrival_id, outbound_date, return_date, api_key, force_refresh=force_refresh
+        )
+    else:
+        outbound = _cached_fetch_one_way_flights(
+            departure_id, arrival_id, outbound_date, api_key, force_refresh=force_refresh
+        )
+        inbound = _cached_fetch_one_way_flights(
+            arrival_id, departure_id, return_date, api_key, force_refresh=force_refresh
+        )
+
+    return _build_flight_response(departure_id, arrival_id, outbound_date, return_date, outbound, inbound, weights)
+
+
+async def _search_legs_async(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: Optional[str],
+    api_key: str,
+    force_refresh: bool = False
+) -> Tuple[FlightLegResult, Optional[FlightLegResult]]:
+    """
+    Search the outbound leg, and the return leg for round trips.
+
+    Returns:
+        (outbound, inbound); inbound is None for one-way searches
+    """
+    if not return_date:
+        outbound = await _cached_fetch_one_way_flights_async(
+            departure_id, arrival_id, outbound_date, api_key, force_refresh=force_refresh
+        )
+        return outbound, None
+
+    if ROUND_TRIP_CONCURRENT:
+        return await _fetch_round_trip_flights_async(
+            departure_id, arrival_id, outbound_date, return_date, api_key, force_refresh=force_refresh
+        )
+
+    outbound = await _cached_fetch_one_way_flights_async(
+        departure_id, arrival_id, outbound_date, api_key, force_refresh=force_refresh
+    )
+    inbound = await _cached_fetch_one_way_flights_async(
+        arrival_id, departure_id, return_date, api_key, force_refresh=force_refresh
+    )
+    return outbound, inbound
+
+
+async def search_flights_async(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: str = None,
+    force_refresh: bool = False,
+    price_weight: Optional[float] = None,
+    duration_weight: Optional[float] = None,
+    stops_weight: Optional[float] = None,
+    tool_context: Optional[ToolContext] = None
+) -> dict:
+    """
+    Search for flights using SERP API Google Flights without blocking the event loop.
+    Round trips are fulfilled by two one-way searches (outbound + inbound) that run concurrently.
+
+    Args:
+        departure_id: Airport code for departure (e.g., "DEL" for Delhi); a city name is also accepted
+        arrival_id: Airport code for arrival (e.g., "BOM" for Mumbai); a city name is also accepted
+        outbound_date: Departure date in YYYY-MM-DD format
+        return_date: Optional return date in YYYY-MM-DD format for round trips
+        force_refresh: Skip cached results and fetch live prices (only when the user asks to refresh)
+        price_weight: How much a lower price matters when ranking options (default 0.6)
+        duration_weight: How much a shorter journey matters (default 0.3)
+        stops_weight: How much fewer stops matter (default 0.1)
+
+    Returns:
+        Dictionary containing flight search results. With FLIGHT_DIRECT_RENDER, the markdown
+        is written to the flight_results state key and only a status is returned.
+    """
+    api_key = _get_serp_api_key()
+    if not api_key:
+        return dict(_MISSING_API_KEY_RESPONSE)
+
+    departure_id, arrival_id, error_response = _resolve_route(departure_id, arrival_id)
+    if error_response:
+        return error_response
+    weights, error_response = _ranking_weights(price_weight, duration_weight, stops_weight)
+    if error_response:
+        return error_response
+
+    outbound, inbound = await _search_legs_async(
+        departure_id, arrival_id, outbound_date, return_date, api_key, force_refresh
+    )
+
+    if tool_context is not None:
+        tool_context.state["flight_search"] = _flight_search_state(
+            departure_id, arrival_id, outbound_date, return_date, outbound, inbound, weights
+        )
+
+        if DIRECT_RENDER:
+            tool_context.state["flight_results"] = _flight_markdown(
+                departure_id, arrival_id, outbound_date, return_date, outbound, inbound, weights
+            )
+            tool_context.actions.skip_summarization = True
+            failed = outbound[1] and (inbound is None or inbound[1])
+            return {"status": "error" if failed else "success", "rendered_to": "flight_results"}
+
+    return _build_flight_response(departure_id, arrival_id, outbound_date, return_date, outbound, inbound, weights)
+
+
+async def search_flights_from_params(trip_params: dict) -> dict:
+    """
+    Run the flight search for the extracted trip parameters, without an LLM turn.
+
+    Args:
+        trip_params: Normalized parameters written by trip_params_agent
+
+    Returns:
+        State delta with flight_search and the rendered flight_results markdown
+    """
+    api_key = _get_serp_api_key()
+    if not api_key:
+        return {"flight_results": _MISSING_API_KEY_RESPONSE["message"]}
+
+    departure_id, arrival_id, error_response = _resolve_route(trip_params["departure_id"], trip_params["arrival_id"])
+    if error_response:
+        return {"flight_results": error_response["message"]}
+    outbound_date, return_date = trip_params["outbound_date"], trip_params.get("return_date")
+    outbound, inbound = await _search_legs_async(departure_id, arrival_id, outbound_date, return_date, api_key)
+
+    return {
+        "flight_search": _flight_search_state(departure_id, arrival_id, outbound_date, return_date, outbound, inbound),
+        "flight_results": _flight_markdown(departure_id, arrival_id, outbound_date, return_date, outbound, inbound),
+    }
 
-            if return_date and (on_return or dep_code == destination_code):
-                on_return = True
-                return_legs.append(flight_leg)
-            else:
-                outbound_legs.append(flight_leg)
 
-        if return_date:
-            result += append_leg_block("Outbound", outbound_legs)
-            result += append_leg_block("Return", return_legs)
+def _cheapest_price(flights: Optional[List[dict]]) -> Optional[int]:
+    """Lowest integer price among flight options, if any are priced."""
+    prices = [flight.get("price") for flight in flights or [] if isinstance(flight.get("price"), (int, float))]
+    return int(min(prices)) if prices else None
 
-            if not return_legs:
-                result += "  ⚠️ Return segments not found in SERP response; showing available segments.\n\n"
-        else:
-            result += append_leg_block("", flight_legs)
 
-        # Extensions (carbon emissions, etc.)
-        extensions = flight.get("extensions", [])
-        if extensions:
-            result += f"  📋 {', '.join(extensions)}\n"
+def _flexible_dates(center: str, days: int) -> List[str]:
+    """Dates within +/- days of center (YYYY-MM-DD), skipping any in the past."""
+    base = datetime.strptime(center, "%Y-%m-%d").date()
+    today = datetime.now().date()
+    dates = (base + timedelta(days=offset) for offset in range(-days, days + 1))
+    return [d.isoformat() for d in dates if d >= today]
+
+
+async def search_flights_flexible(
+    departure_id: str,
+    arrival_id: str,
+    outbound_date: str,
+    return_date: str = None,
+    flex_days: int = 3,
+    top_n: int = 3
+) -> dict:
+    """
+    Find the cheapest travel dates around the requested ones.
+    Searches every outbound (and return) date within +/- flex_days and builds a price matrix.
+
+    Args:
+        departure_id: Airport code for departure (e.g., "DEL" for Delhi); a city name is also accepted
+        arrival_id: Airport code for arrival (e.g., "BOM" for Mumbai); a city name is also accepted
+        outbound_date: Preferred departure date in YYYY-MM-DD format
+        return_date: Optional preferred return date in YYYY-MM-DD format for round trips
+        flex_days: How many days either side of each date to search (capped at FLIGHT_FLEX_MAX_DAYS)
+        top_n: How many of the cheapest date combinations to return
+
+    Returns:
+        Dictionary with the cheapest price per date (or a date x date matrix for round trips)
+        and the best date combinations
+    """
+    api_key = _get_serp_api_key()
+    if not api_key:
+        return dict(_MISSING_API_KEY_RESPONSE)
+
+    departure_id, arrival_id, error_response = _resolve_route(departure_id, arrival_id)
+    if error_response:
+        return error_response
+
+    flex_days = max(0, min(int(flex_days), FLEX_MAX_DAYS))
+    try:
+        outbound_dates = _flexible_dates(outbound_date, flex_days)
+        return_dates = _flexible_dates(return_date, flex_days) if return_date else []
+    except ValueError:
+        return {"status": "error", "message": "Dates must be in YYYY-MM-DD format"}
 
-        result += "\n"
+    if not outbound_dates:
+        return {"status": "error", "message": "All candidate outbound dates are in the past"}
 
-    return result
+    semaphore = asyncio.Semaphore(FLEX_CONCURRENCY)
 
+    async def cheapest(origin: str, destination: str, travel_date: str) -> Tuple[str, Optional[int]]:
+        async with semaphore:
+            flights, _ = await _cached_fetch_one_way_flights_async(origin, destination, travel_date, api_key)
+        return travel_date, _cheapest_price(flights)
 
-# Create flight search agent with dynamic date context
-current_date = datetime.now()
-today_str = current_date.strftime("%Y-%m-%d")
-current_year = current_date.year
-current_month_num = current_date.month
+    searches = [cheapest(departure_id, arrival_id, d) for d in outbound_dates]
+    searches += [cheapest(arrival_id, departure_id, d) for d in return_dates]
+    results = await asyncio.gather(*searches)
+    outbound_prices: Dict[str, Optional[int]] = dict(results[:len(outbound_dates)])
+    return_prices: Dict[str, Optional[int]] = dict(results[len(outbound_dates):])
 
+    if not return_date:
+        priced = sorted((price, d) for d, price in outbound_prices.items() if price is not None)
+        if not priced:
+            return {"status": "error", "message": "No priced flights found for any of the candidate dates"}
+        return {
+            "status": "success",
+            "route": f"{departure_id} → {arrival_id}",
+            "currency": "INR",
+            "cheapest_by_date": outbound_prices,
+            "best": [{"outbound_date": d, "total_price": price} for price, d in priced[:top_n]],
+        }
+
+    # Rows are outbound dates, columns are return dates; None marks impossible or unpriced combinations.
+    matrix = []
+    combinations = []
+    for out_date in outbound_dates:
+        row = []
+        for ret_date in return_dates:
+            out_price, ret_price = outbound_prices.get(out_date), return_prices.get(ret_date)
+            if ret_date <= out_date or out_price is None or ret_price is None:
+                row.append(None)
+                continue
+            row.append(out_price + ret_price)
+            combinations.append((out_price + ret_price, out_date, ret_date, out_price, ret_price))
+        matrix.append(row)
+
+    if not combinations:
+        return {"status": "error", "message": "No priced round trips found for any of the candidate dates"}
+
+    combinations.sort()
+    return {
+        "status": "success",
+        "route": f"{departure_id} ⇄ {arrival_id}",
+        "currency": "INR",
+        "outbound_dates": outbound_dates,
+        "return_dates": return_dates,
+        "price_matrix": matrix,
+        "best": [
+            {
+                "outbound_date": out_date,
+                "return_date": ret_date,
+                "total_price": total,
+                "outbound_price": out_price,
+                "return_price": ret_price,
+            }
+            for total, out_date, ret_date, out_price, ret_price in combinations[:top_n]
+        ],
+    }
+
+
+def format_flight_results(
+    flights: list,
+    departure: str,
+    arrival: str,
+    outbound_date: str,
+    return_date: str = None,
+    weights: Optional[Dict[str, float]] = None
+) -> str:
+    """
+    Format flight results into a readable string.
+
+    Args:
+        flights: List of flight options from SERP API
+        departure: Departure airport code
+        arrival: Arrival airport code
+        outbound_date: Outbound date
+        return_date: Optional return date
+        weights: Ranking weights for "price", "duration" and "stops"
+
+    Returns:
+        Formatted string with the top-ranked flight details
+    """
+    options = _ranked_options(flights, weights, RESULT_LIMIT)
+    return render_flight_results(options, departure, arrival, outbound_date, return_date)
+
+
+# Create flight search agent: static instruction (cached prefix) + per-request date context
 flight_agent = Agent(
-    model=LiteLlm(model='claude-sonnet-4-5-20250929', api_key=os.getenv("ANTHROPIC_API_KEY")),
+    model=routed_model('flight_search_agent', MODEL_TIERS, MODEL_SLO_SECONDS),
     name='flight_search_agent',
     description="Searches for flights and returns formatted flight options in markdown",
-    instruction=f"""
+    static_instruction="""
     You are a flight search agent that presents results in clean markdown format.
-
-    CURRENT DATE CONTEXT:
-    - Today's date: {today_str}
-    - Current year: {current_year}
-    - Current month: {current_month_num}
+    Today's date is given in the CURRENT DATE CONTEXT that follows these instructions.
 
     WORKFLOW:
-    1. Call search_flights with the given parameters (ensure dates are valid and not in the past).
+    1. Call search_flights_async with the given parameters (ensure dates are valid and not in the past).
+       Only pass force_refresh=true if the user explicitly asks for fresh or updated prices.
+       Options come back ranked, best first. If the user cares most about speed or direct flights,
+       raise duration_weight or stops_weight (and lower price_weight); keep the returned order.
+       If the user is flexible on dates (e.g. "cheapest week to go"), call search_flights_flexible instead
+       and present its best date combinations (and a compact price table for round trips).
     2. Format the results in beautiful markdown for the user.
 
     MARKDOWN FORMAT:
@@ -306,6 +903,8 @@ flight_agent = Agent(
     - If no flights found, show a friendly message
     - Keep formatting clean and scannable
     """,
-    tools=[search_flights],
+    instruction=dated_instruction(),
+    tools=[search_flights_async, search_flights_flexible],
     output_key="flight_results",
+    after_model_callback=record_prompt_cache_usage,
 )
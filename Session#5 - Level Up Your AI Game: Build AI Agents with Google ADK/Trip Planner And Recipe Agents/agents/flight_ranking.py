@@ -0,0 +1,124 @@
+"""
+Ranking over every option a Google Flights search returns.
+
+SERP splits options into best_flights and other_flights. Both lists are
+merged, duplicate itineraries (same flights at the same times) collapse to
+their cheapest fare, and options are ordered by a weighted cost over price,
+duration and stops. Options on the Pareto frontier (no other option is at
+least as good on all three and better on one) come first, so the top-K shows
+the real trade-offs - cheapest, fastest, non-stop - before near-duplicates of
+the leader.
+
+For non-negative weights a dominated option never costs less than the option
+that dominates it, so frontier-first ordering only changes which dominated
+options are pushed out of the top-K, never the order among undominated ones.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+from agents.flight_results import FlightOption
+
+DEFAULT_WEIGHTS = {"price": 0.6, "duration": 0.3, "stops": 0.1}
+
+_CRITERIA = ("price", "duration", "stops")
+
+
+def itinerary_key(option: FlightOption) -> Tuple:
+    """Identity of the flown itinerary: each leg's flight number (or airline), route and departure time."""
+    return tuple(
+        (leg.flight_number or leg.airline, leg.departure_code, leg.arrival_code, leg.departure_time)
+        for leg in option.legs
+    )
+
+
+def _values(option: FlightOption) -> Tuple[float, float, float]:
+    """(price, duration, stops) with unknown price/duration treated as worst."""
+    return (
+        float(option.price) if option.price is not None else math.inf,
+        float(option.total_duration) if option.total_duration else math.inf,
+        float(option.stops),
+    )
+
+
+def dedupe_options(options: Sequence[FlightOption]) -> List[FlightOption]:
+    """Keep the cheapest fare per itinerary, preserving first-seen order; options without legs are kept."""
+    best: Dict[Tuple, int] = {}
+    unique: List[FlightOption] = []
+    for option in options:
+        key = itinerary_key(option)
+        if not key:
+            unique.append(option)
+            continue
+        index = best.get(key)
+        if index is None:
+            best[key] = len(unique)
+            unique.append(option)
+        elif _values(option)[0] < _values(unique[index])[0]:
+            unique[index] = option
+    return unique
+
+
+def pareto_frontier(options: Sequence[FlightOption]) -> List[int]:
+    """
+    Indices of options not dominated on (price, duration, stops).
+
+    Options are scanned in (price, duration, stops) order, so each one only
+    needs comparing with the frontier found so far: nothing later can dominate
+    it. Of several options with identical values only the first is kept.
+    """
+    values = [_values(option) for option in options]
+    frontier: List[int] = []
+    for i in sorted(range(len(options)), key=lambda i: (values[i], i)):
+        price, duration, stops = values[i]
+        if not any(
+            values[j][0] <= price and values[j][1] <= duration and values[j][2] <= stops
+            for j in frontier
+        ):
+            frontier.append(i)
+    return sorted(frontier)
+
+
+def _normalized(column: List[float]) -> List[float]:
+    """Scale to [0, 1] over the known values; unknown (inf) becomes 1, the worst."""
+    known = [value for value in column if math.isfinite(value)]
+    low, high = (min(known), max(known)) if known else (0.0, 0.0)
+    return [
+        1.0 if not math.isfinite(value) else (0.0 if high == low else (value - low) / (high - low))
+        for value in column
+    ]
+
+
+def rank_flight_options(
+    options: Sequence[FlightOption],
+    weights: Optional[Dict[str, float]] = None,
+    limit: Optional[int] = None,
+) -> List[FlightOption]:
+    """
+    Deduplicate and rank flight options.
+
+    Args:
+        options: Parsed options from best_flights and other_flights
+        weights: Relative importance of "price", "duration" and "stops" (missing keys keep their DEFAULT_WEIGHTS value)
+        limit: Keep only the top `limit` options
+
+    Returns:
+        Options ordered best first: Pareto-optimal ones by weighted cost, then the rest
+    """
+    weights = {**DEFAULT_WEIGHTS, **weights} if weights else DEFAULT_WEIGHTS
+    if any(weights.get(name, 0) < 0 for name in _CRITERIA):
+        raise ValueError("Flight ranking weights must not be negative")
+
+    unique = dedupe_options(options)
+    if not unique:
+        return []
+
+    columns = list(zip(*(_values(option) for option in unique)))
+    normalized = [_normalized(list(column)) for column in columns]
+    cost = [
+        sum(weights.get(name, 0) * normalized[c][i] for c, name in enumerate(_CRITERIA))
+        for i in range(len(unique))
+    ]
+    frontier = set(pareto_frontier(unique))
+
+    order = sorted(range(len(unique)), key=lambda i: (i not in frontier, cost[i], i))
+    return [unique[i] for i in order[:limit]]
@@ -0,0 +1,340 @@
+"""Structured flight search results, a fast text renderer and a markdown renderer."""
+
+from dataclasses import dataclass, field
+from string import Template
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class FlightLeg:
+    """A single flown segment of a flight option."""
+
+    airline: str
+    departure_airport: str
+    departure_code: str
+    departure_time: str
+    arrival_airport: str
+    arrival_code: str
+    arrival_time: str
+    duration: Optional[int] = None
+    flight_number: str = ""
+    layovers: int = 0
+
+    def to_dict(self) -> dict:
+        """Compact dictionary for tool responses; empty fields are dropped."""
+        data = {
+            "airline": self.airline,
+            "from": self.departure_code or self.departure_airport,
+            "to": self.arrival_code or self.arrival_airport,
+            "dep": self.departure_time,
+            "arr": self.arrival_time,
+            "min": self.duration,
+            "no": self.flight_number,
+        }
+        return {key: value for key, value in data.items() if value not in (None, "", "N/A")}
+
+
+@dataclass(slots=True)
+class FlightOption:
+    """One bookable itinerary from a one-way search (one or more legs)."""
+
+    price: Optional[int]
+    legs: List[FlightLeg] = field(default_factory=list)
+    total_duration: Optional[int] = None
+    stops: int = 0
+    extensions: List[str] = field(default_factory=list)
+    price_label: str = "N/A"
+
+    def to_dict(self) -> dict:
+        """Compact dictionary for tool responses; empty fields are dropped."""
+        data = {
+            "price": self.price if self.price is not None else self.price_label,
+            "min": self.total_duration,
+            "stops": self.stops,
+            "legs": [leg.to_dict() for leg in self.legs],
+        }
+        return {key: value for key, value in data.items() if value is not None}
+
+
+def _airport_code(airport: dict) -> str:
+    """Extract the most likely IATA/airport code from the SERP response."""
+    for key in ("code", "iata", "iata_code", "id"):
+        if airport.get(key):
+            return str(airport[key]).upper()
+    return ""
+
+
+def parse_flight_leg(raw: dict) -> FlightLeg:
+    """Build a FlightLeg from one entry of a SERP option's "flights" list."""
+    departure = raw.get("departure_airport") or {}
+    arrival = raw.get("arrival_airport") or {}
+    duration = raw.get("duration")
+
+    return FlightLeg(
+        airline=raw.get("airline", "Unknown"),
+        departure_airport=departure.get("name", "Unknown"),
+        departure_code=_airport_code(departure),
+        departure_time=departure.get("time", "N/A"),
+        arrival_airport=arrival.get("name", "Unknown"),
+        arrival_code=_airport_code(arrival),
+        arrival_time=arrival.get("time", "N/A"),
+        duration=duration if isinstance(duration, int) else None,
+        flight_number=raw.get("flight_number") or "",
+        layovers=len(raw.get("layovers") or []),
+    )
+
+
+def parse_flight_option(raw: dict) -> FlightOption:
+    """Build a FlightOption from one SERP best_flights/other_flights entry."""
+    legs = [parse_flight_leg(leg) for leg in raw.get("flights") or []]
+    price = raw.get("price", "N/A")
+    total_duration = raw.get("total_duration")
+    if not isinstance(total_duration, int):
+        total_duration = sum(leg.duration for leg in legs if leg.duration) or None
+
+    return FlightOption(
+        price=price if isinstance(price, int) else None,
+        legs=legs,
+        total_duration=total_duration,
+        stops=max(0, len(legs) - 1) if legs else len(raw.get("layovers") or []),
+        extensions=list(raw.get("extensions") or []),
+        price_label=str(price),
+    )
+
+
+def parse_flight_options(flights: Optional[list]) -> List[FlightOption]:
+    """Parse a list of raw SERP flight options."""
+    return [parse_flight_option(flight) for flight in flights or []]
+
+
+def _render_legs(parts: List[str], label: str, legs: List[FlightLeg]) -> None:
+    if not legs:
+        return
+
+    if label:
+        parts.append(f"  {label}:\n")
+    indent = "     " if label else "  "
+
+    for leg in legs:
+        stops_info = f"{leg.layovers} stop(s)" if leg.layovers else "Direct"
+        duration = leg.duration if leg.duration is not None else "N/A"
+        parts.append(
+            f"{indent}✈️  {leg.airline}\n"
+            f"{indent}   {leg.departure_airport} ({leg.departure_time}) → {leg.arrival_airport} ({leg.arrival_time})\n"
+            f"{indent}   Duration: {duration} min | {stops_info}\n"
+        )
+
+    parts.append("\n")
+
+
+def _split_round_trip(legs: List[FlightLeg], origin: str, destination: str) -> tuple:
+    """Split legs into (outbound, return) based on airport codes."""
+    outbound_legs = []
+    return_legs = []
+    on_return = False
+
+    for leg in legs:
+        if leg.departure_code == destination and leg.arrival_code == origin:
+            on_return = True
+            return_legs.append(leg)
+        elif leg.departure_code == origin and leg.arrival_code == destination:
+            (return_legs if on_return else outbound_legs).append(leg)
+        elif on_return or leg.departure_code == destination:
+            on_return = True
+            return_legs.append(leg)
+        else:
+            outbound_legs.append(leg)
+
+    return outbound_legs, return_legs
+
+
+def render_flight_results(
+    options: List[FlightOption],
+    departure: str,
+    arrival: str,
+    outbound_date: str,
+    return_date: str = None,
+    limit: int = 5
+) -> str:
+    """
+    Render parsed flight options as the plain-text block used in tool responses.
+
+    Args:
+        options: Parsed flight options
+        departure: Departure airport code
+        arrival: Arrival airport code
+        outbound_date: Outbound date
+        return_date: Optional return date
+        limit: Maximum number of options to show
+
+    Returns:
+        Formatted string with flight details
+    """
+    if not options:
+        return "No flights available"
+
+    origin_code = (departure or "").upper()
+    destination_code = (arrival or "").upper()
+    separator = "=" * 60
+
+    parts = [
+        f"\n{separator}\n",
+        f"Flight Search Results: {departure} → {arrival}\n",
+        f"Type: {'Round Trip' if return_date else 'One Way'} | Outbound: {outbound_date}",
+        f" | Return: {return_date}" if return_date else "",
+        f"\n{separator}\n\n",
+    ]
+
+    for i, option in enumerate(options[:limit], 1):
+        parts.append(f"Option {i}:\n")
+        if option.price is not None:
+            parts.append(f"  💰 Price: ₹{option.price:,} INR\n")
+        else:
+            parts.append(f"  💰 Price: {option.price_label}\n")
+
+        if return_date:
+            outbound_legs, return_legs = _split_round_trip(option.legs, origin_code, destination_code)
+            _render_legs(parts, "Outbound", outbound_legs)
+            _render_legs(parts, "Return", return_legs)
+            if not return_legs:
+                parts.append("  ⚠️ Return segments not found in SERP response; showing available segments.\n\n")
+        else:
+            _render_legs(parts, "", option.legs)
+
+        if option.extensions:
+            parts.append(f"  📋 {', '.join(option.extensions)}\n")
+
+        parts.append("\n")
+
+    return "".join(parts)
+
+
+# Markdown layout the flight agent's instruction asks the model for, rendered in code instead.
+MARKDOWN_SEPARATOR = "━" * 60
+
+_MARKDOWN_HEADER = Template("""$separator
+## ✈️ FLIGHT SEARCH RESULTS
+$separator
+
+**Route:** $origin → $destination
+**Date:** $outbound_date$return_part
+**Trip Type:** $trip_type
+
+---
+""")
+
+_MARKDOWN_SECTION = Template("""
+#### $label: $origin → $destination ($travel_date)
+""")
+
+_MARKDOWN_OPTION = Template("""
+### Option $index: $airline
+- **Price:** $price
+- **Departure:** $departure_time from $departure_airport
+- **Arrival:** $arrival_time at $arrival_airport
+- **Duration:** $duration
+- **Stops:** $stops
+""")
+
+
+def _markdown_price(option: FlightOption) -> str:
+    return f"₹{option.price:,}" if option.price is not None else option.price_label
+
+
+def _markdown_duration(minutes: Optional[int]) -> str:
+    if not minutes:
+        return "N/A"
+    hours, mins = divmod(minutes, 60)
+    return f"{hours} hr {mins} min" if hours else f"{mins} min"
+
+
+def _render_markdown_options(parts: List[str], options: List[FlightOption], limit: int) -> Optional[FlightOption]:
+    """Append option blocks and return the cheapest priced option shown."""
+    shown = options[:limit]
+    for i, option in enumerate(shown, 1):
+        first = option.legs[0] if option.legs else None
+        last = option.legs[-1] if option.legs else None
+        airlines = list(dict.fromkeys(leg.airline for leg in option.legs)) or ["Unknown"]
+        parts.append(_MARKDOWN_OPTION.substitute(
+            index=i,
+            airline=" / ".join(airlines),
+            price=_markdown_price(option),
+            departure_time=first.departure_time if first else "N/A",
+            departure_airport=first.departure_airport if first else "Unknown",
+            arrival_time=last.arrival_time if last else "N/A",
+            arrival_airport=last.arrival_airport if last else "Unknown",
+            duration=_markdown_duration(option.total_duration),
+            stops=f"{option.stops} stop(s)" if option.stops else "Direct",
+        ))
+
+    priced = [option for option in shown if option.price is not None]
+    return min(priced, key=lambda option: option.price) if priced else None
+
+
+def _recommendation(option: FlightOption) -> str:
+    airlines = " / ".join(dict.fromkeys(leg.airline for leg in option.legs)) or "Unknown"
+    return f"{airlines} ({_markdown_price(option)})"
+
+
+def render_flight_markdown(
+    departure: str,
+    arrival: str,
+    outbound_date: str,
+    outbound_options: List[FlightOption],
+    outbound_error: Optional[str] = None,
+    return_date: str = None,
+    return_options: Optional[List[FlightOption]] = None,
+    return_error: Optional[str] = None,
+    limit: int = 5
+) -> str:
+    """
+    Render search results in the flight agent's markdown format without an LLM call.
+
+    Round trips get one section per direction, since each is a separate one-way search.
+
+    Args:
+        departure: Departure airport code
+        arrival: Arrival airport code
+        outbound_date: Outbound date
+        outbound_options: Parsed outbound options
+        outbound_error: Error message if the outbound search failed
+        return_date: Optional return date
+        return_options: Parsed return options for round trips
+        return_error: Error message if the return search failed
+        limit: Maximum number of options per direction
+
+    Returns:
+        Markdown string
+    """
+    parts = [_MARKDOWN_HEADER.substitute(
+        separator=MARKDOWN_SEPARATOR,
+        origin=departure,
+        destination=arrival,
+        outbound_date=outbound_date,
+        return_part=f" | **Return:** {return_date}" if return_date else "",
+        trip_type="Round Trip" if return_date else "One Way",
+    )]
+
+    sections = [("Outbound", departure, arrival, outbound_date, outbound_options, outbound_error)]
+    if return_date:
+        sections.append(("Return", arrival, departure, return_date, return_options or [], return_error))
+
+    recommendations = []
+    for label, origin, destination, travel_date, options, error in sections:
+        if return_date:
+            parts.append(_MARKDOWN_SECTION.substitute(
+                label=label, origin=origin, destination=destination, travel_date=travel_date
+            ))
+        if error or not options:
+            parts.append(f"\nNo flights found for this date ({error or 'no options returned'}). Try nearby dates.\n")
+            continue
+        cheapest = _render_markdown_options(parts, options, limit)
+        if cheapest is not None:
+            prefix = f"{label}: " if return_date else ""
+            recommendations.append(prefix + _recommendation(cheapest))
+
+    parts.append("\n---\n")
+    if recommendations:
+        parts.append(f"\n**💡 Recommended:** {'; '.join(recommendations)} - Best value!\n")
+    parts.append(f"\n{MARKDOWN_SEPARATOR}\n")
+    return "".join(parts)
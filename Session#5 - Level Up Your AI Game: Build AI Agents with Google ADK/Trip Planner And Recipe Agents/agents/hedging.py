@@ -0,0 +1,96 @@
+"""Latency tracking and budgets for hedged SERP requests."""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of request latencies per engine, used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, engine: str, seconds: float) -> None:
+        """Add one observed latency for engine."""
+        with self._lock:
+            samples = self._samples.get(engine)
+            if samples is None:
+                samples = self._samples[engine] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, engine: str, percentile: float) -> Optional[float]:
+        """Return the given latency percentile, or None until min_samples are recorded."""
+        with self._lock:
+            samples = sorted(self._samples.get(engine) or ())
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def stats(self) -> dict:
+        """Return sample counts and p50/p95 per engine."""
+        with self._lock:
+            engines = {engine: sorted(samples) for engine, samples in self._samples.items()}
+        return {
+            engine: {
+                "samples": len(samples),
+                "p50": samples[len(samples) // 2] if samples else None,
+                "p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))] if samples else None,
+            }
+            for engine, samples in engines.items()
+        }
+
+
+class HedgeBudget:
+    """
+    Caps hedges to a fraction of primary requests so quota spend stays bounded.
+
+    Every primary request earns `ratio` credit (up to `max_credit`); each hedge
+    spends one credit. With ratio=0.1, at most ~10% of calls are duplicated.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_credit: float = 5.0):
+        self.ratio = ratio
+        self.max_credit = max_credit
+        # Start with one hedge available so a slow first call after startup can still be rescued.
+        self._credit = min(1.0, max_credit) if ratio > 0 else 0.0
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedges_denied = 0
+        self.hedges_won = 0
+
+    def earn(self) -> None:
+        """Credit one primary request."""
+        with self._lock:
+            # Rounded so ratio=0.1 earns a whole credit after exactly 10 calls, not 0.9999...
+            self._credit = min(self.max_credit, round(self._credit + self.ratio, 9))
+
+    def try_spend(self) -> bool:
+        """Spend one credit for a hedge; False if the budget is exhausted."""
+        with self._lock:
+            if self._credit >= 1:
+                self._credit -= 1
+                self.hedges_sent += 1
+                return True
+            self.hedges_denied += 1
+            return False
+
+    def record_win(self) -> None:
+        """Count a hedge that answered before its primary."""
+        with self._lock:
+            self.hedges_won += 1
+
+    def stats(self) -> dict:
+        """Return remaining credit and hedge counters."""
+        with self._lock:
+            return {
+                "ratio": self.ratio,
+                "credit": round(self._credit, 3),
+                "hedges_sent": self.hedges_sent,
+                "hedges_denied": self.hedges_denied,
+                "hedges_won": self.hedges_won,
+            }
@@ -1,29 +1,93 @@
+import asyncio
+import logging
 import os
+import threading
+import httpx
 import requests
-from datetime import datetime
+from pathlib import Path
+from string import Template
 from typing import List, Optional, Tuple
 from dotenv import load_dotenv
+from opentelemetry import trace
 from google.adk.agents.llm_agent import Agent
+from google.adk.tools.tool_context import ToolContext
+from agents.airport_index import canonical_city
+from agents.cache import DiskCache
+from agents.circuit_breaker import CircuitOpenError
+from agents.hotel_ranking import SORT_KEYS, hotel_price_value, rank_hotels
+from agents.model_router import routed_model
+from agents.prompt_cache import dated_instruction, record_prompt_cache_usage
+from agents.serp_client import serp_get, serp_get_async
+from agents.serp_decode import HOTEL_PROJECTION, decode_serp
+from agents.singleflight import AsyncSingleFlight, SingleFlight
+from agents.tracing import get_tracer
 
 # Load environment variables
 load_dotenv(override=True)
 
-
-def _fetch_hotels(
+# Hotel prices move slowly, so results persist on disk across worker restarts (in the user's
+# cache directory by default, not the package). Fresh entries are served as-is; stale ones
+# are served immediately and refreshed in the background.
+DEFAULT_HOTEL_CACHE_PATH = str(
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "trip-planner" / "hotel_cache.sqlite3"
+)
+hotel_cache = DiskCache(
+    path=os.getenv("HOTEL_CACHE_PATH") or DEFAULT_HOTEL_CACHE_PATH,
+    fresh_seconds=float(os.getenv("HOTEL_CACHE_FRESH_SECONDS", str(6 * 3600))),
+    stale_seconds=float(os.getenv("HOTEL_CACHE_STALE_SECONDS", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("HOTEL_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+# Keep references to background refresh tasks so they aren't garbage collected mid-flight.
+_refresh_tasks = set()
+# Concurrent identical searches (including background refreshes) share one upstream SERP call.
+hotel_singleflight = SingleFlight()
+hotel_singleflight_async = AsyncSingleFlight()
+_tracer = get_tracer(__name__)
+logger = logging.getLogger(__name__)
+
+HotelResult = Tuple[Optional[List[dict]], Optional[str]]
+
+# Render the final markdown in code and write it straight to hotel_results, ending the
+# agent's turn after the tool call instead of spending a second LLM call on formatting.
+DIRECT_RENDER = os.getenv("HOTEL_DIRECT_RENDER", "false").lower() in ("1", "true", "yes")
+MARKDOWN_LIMIT = 5
+MARKDOWN_SEPARATOR = "━" * 60
+
+# Models tried in order (primary first; see agents/model_router.py) and the time-to-first-response
+# SLO past which calls move to the next tier.
+MODEL_TIERS = os.getenv("HOTEL_MODEL_TIERS", "gemini-3-pro-preview,gemini-2.5-flash")
+MODEL_SLO_SECONDS = float(os.getenv("HOTEL_MODEL_SLO_SECONDS", "20"))
+
+_MARKDOWN_HEADER = Template("""$separator
+## 🏨 HOTEL SEARCH RESULTS
+$separator
+
+**Location:** $city
+**Check-in:** $check_in_date | **Check-out:** $check_out_date
+**Guests:** $adults | **Rooms:** $rooms
+
+---
+""")
+
+_MARKDOWN_HOTEL = Template("""
+### $index. $name
+- **Price:** $price /night
+- **Rating:** $rating
+$details""")
+
+
+def _hotel_search_params(
     city: str,
     check_in_date: str,
     check_out_date: str,
     api_key: str,
-    adults: int = 2,
-    rooms: int = 1,
-) -> Tuple[Optional[List[dict]], Optional[str]]:
-    """
-    Fetch hotels for a city using SERP API Google Hotels.
-
-    Returns:
-        (hotels, error_message)
-    """
-    params = {
+    adults: int,
+    rooms: int,
+) -> dict:
+    """Build SERP API query parameters for a Google Hotels search."""
+    return {
         "engine": "google_hotels",
         "q": city,
         "check_in_date": check_in_date,
@@ -36,24 +100,232 @@ def _fetch_hotels(
         "api_key": api_key,
     }
 
+
+def _parse_hotels(data: dict) -> HotelResult:
+    """Pull hotel properties out of a Google Hotels response."""
+    hotels = data.get("properties") or data.get("results") or data.get("hotels_results") or []
+
+    if not hotels:
+        return None, "No hotels found for this city and dates"
+
+    return hotels, None
+
+
+def _fetch_hotels(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    api_key: str,
+    adults: int = 2,
+    rooms: int = 1,
+    hedge: Optional[bool] = None,
+) -> HotelResult:
+    """
+    Fetch hotels for a city using SERP API Google Hotels.
+
+    hedge overrides SERP_HEDGE_ENABLED for this call (see serp_client.serp_get).
+
+    Returns:
+        (hotels, error_message)
+    """
+    params = _hotel_search_params(city, check_in_date, check_out_date, api_key, adults, rooms)
+
     try:
-        response = requests.get("https://serpapi.com/search", params=params, timeout=30)
+        response = serp_get(params, timeout=30, hedge=hedge)
         response.raise_for_status()
 
-        data = response.json()
-        hotels = data.get("properties") or data.get("results") or data.get("hotels_results") or []
+        return _parse_hotels(decode_serp(response.content, HOTEL_PROJECTION, params["engine"]))
 
-        if not hotels:
-            return None, "No hotels found for this city and dates"
+    except CircuitOpenError as e:
+        return None, str(e)
+    except requests.exceptions.RequestException as e:
+        return None, f"API request failed: {str(e)}"
+    except Exception as e:
+        return None, f"Error searching hotels: {str(e)}"
 
-        return hotels, None
 
-    except requests.exceptions.RequestException as e:
+async def _fetch_hotels_async(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    api_key: str,
+    adults: int = 2,
+    rooms: int = 1,
+    hedge: Optional[bool] = None,
+) -> HotelResult:
+    """
+    Non-blocking version of _fetch_hotels.
+
+    Returns:
+        (hotels, error_message)
+    """
+    params = _hotel_search_params(city, check_in_date, check_out_date, api_key, adults, rooms)
+
+    try:
+        response = await serp_get_async(params, timeout=30, hedge=hedge)
+        response.raise_for_status()
+
+        return _parse_hotels(decode_serp(response.content, HOTEL_PROJECTION, params["engine"]))
+
+    except CircuitOpenError as e:
+        return None, str(e)
+    except httpx.HTTPError as e:
         return None, f"API request failed: {str(e)}"
     except Exception as e:
         return None, f"Error searching hotels: {str(e)}"
 
 
+def _hotel_cache_key(city: str, check_in_date: str, check_out_date: str, adults: int, rooms: int) -> tuple:
+    return ((city or "").strip().lower(), check_in_date, check_out_date, int(adults), int(rooms))
+
+
+def _cache_get(key: tuple) -> Optional[Tuple[List[dict], bool]]:
+    try:
+        return hotel_cache.get(key)
+    except Exception as e:
+        # A broken cache file must never take hotel search down with it.
+        logger.warning("Hotel cache read failed for %s: %s", key, e)
+        return None
+
+
+def _cache_set(key: tuple, hotels: List[dict]) -> None:
+    try:
+        hotel_cache.set(key, hotels)
+    except Exception as e:
+        logger.warning("Hotel cache write failed for %s: %s", key, e)
+
+
+def _claim_refresh(key: tuple) -> bool:
+    """Return True if the caller should start a background refresh for key."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+        return True
+
+
+def _release_refresh(key: tuple) -> None:
+    with _refreshing_lock:
+        _refreshing.discard(key)
+
+
+def _fetch_and_store_hotels(
+    key: tuple, city: str, check_in_date: str, check_out_date: str, api_key: str, adults: int, rooms: int
+) -> HotelResult:
+    """Fetch hotels once per key among concurrent callers and cache successful results."""
+
+    def fetch_and_store() -> HotelResult:
+        hotels, error = _fetch_hotels(city, check_in_date, check_out_date, api_key, adults, rooms)
+        if not error:
+            _cache_set(key, hotels)
+        return hotels, error
+
+    result, shared = hotel_singleflight.do(key, fetch_and_store)
+    trace.get_current_span().set_attribute("singleflight.shared", shared)
+    return result
+
+
+async def _fetch_and_store_hotels_async(
+    key: tuple, city: str, check_in_date: str, check_out_date: str, api_key: str, adults: int, rooms: int
+) -> HotelResult:
+    """Non-blocking version of _fetch_and_store_hotels; the SQLite write runs off the event loop."""
+
+    async def fetch_and_store() -> HotelResult:
+        hotels, error = await _fetch_hotels_async(city, check_in_date, check_out_date, api_key, adults, rooms)
+        if not error:
+            await asyncio.to_thread(_cache_set, key, hotels)
+        return hotels, error
+
+    result, shared = await hotel_singleflight_async.do(key, fetch_and_store)
+    trace.get_current_span().set_attribute("singleflight.shared", shared)
+    return result
+
+
+def _refresh_hotels(key: tuple, city: str, check_in_date: str, check_out_date: str, api_key: str, adults: int, rooms: int) -> None:
+    """Re-fetch a stale cache entry; runs on a background thread."""
+    try:
+        _fetch_and_store_hotels(key, city, check_in_date, check_out_date, api_key, adults, rooms)
+    finally:
+        _release_refresh(key)
+
+
+async def _refresh_hotels_async(key: tuple, city: str, check_in_date: str, check_out_date: str, api_key: str, adults: int, rooms: int) -> None:
+    """Re-fetch a stale cache entry; runs as a background task."""
+    try:
+        await _fetch_and_store_hotels_async(key, city, check_in_date, check_out_date, api_key, adults, rooms)
+    finally:
+        _release_refresh(key)
+
+
+def _cached_fetch_hotels(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    api_key: str,
+    adults: int = 2,
+    rooms: int = 1,
+) -> HotelResult:
+    """
+    Fetch hotels through the persistent cache (stale-while-revalidate).
+
+    Returns:
+        (hotels, error_message)
+    """
+    key = _hotel_cache_key(city, check_in_date, check_out_date, adults, rooms)
+
+    with _tracer.start_as_current_span("hotel_search.cache", attributes={"hotel.city": key[0]}) as span:
+        cached = _cache_get(key)
+        span.set_attribute("cache.hit", cached is not None)
+
+        if cached is not None:
+            hotels, is_stale = cached
+            span.set_attribute("cache.stale", is_stale)
+            if is_stale and _claim_refresh(key):
+                threading.Thread(
+                    target=_refresh_hotels,
+                    args=(key, city, check_in_date, check_out_date, api_key, adults, rooms),
+                    name="hotel-cache-refresh",
+                    daemon=True,
+                ).start()
+            return hotels, None
+
+        return _fetch_and_store_hotels(key, city, check_in_date, check_out_date, api_key, adults, rooms)
+
+
+async def _cached_fetch_hotels_async(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    api_key: str,
+    adults: int = 2,
+    rooms: int = 1,
+) -> HotelResult:
+    """
+    Non-blocking version of _cached_fetch_hotels.
+
+    Returns:
+        (hotels, error_message)
+    """
+    key = _hotel_cache_key(city, check_in_date, check_out_date, adults, rooms)
+
+    with _tracer.start_as_current_span("hotel_search.cache", attributes={"hotel.city": key[0]}) as span:
+        cached = await asyncio.to_thread(_cache_get, key)
+        span.set_attribute("cache.hit", cached is not None)
+
+        if cached is not None:
+            hotels, is_stale = cached
+            span.set_attribute("cache.stale", is_stale)
+            if is_stale and _claim_refresh(key):
+                task = asyncio.create_task(
+                    _refresh_hotels_async(key, city, check_in_date, check_out_date, api_key, adults, rooms)
+                )
+                _refresh_tasks.add(task)
+                task.add_done_callback(_refresh_tasks.discard)
+            return hotels, None
+
+        return await _fetch_and_store_hotels_async(key, city, check_in_date, check_out_date, api_key, adults, rooms)
+
+
 def _extract_price(hotel: dict, currency_symbol: str = "₹") -> str:
     """Return a human-friendly nightly rate if available."""
     rate_per_night = hotel.get("rate_per_night") or {}
@@ -82,6 +354,18 @@ def _extract_price(hotel: dict, currency_symbol: str = "₹") -> str:
     return "N/A"
 
 
+def _hotel_summary(hotel: dict) -> dict:
+    """Compact, JSON-friendly view of one property; empty fields are dropped."""
+    data = {
+        "name": hotel.get("name", "Unknown property"),
+        "price": hotel_price_value(hotel),
+        "rating": hotel.get("overall_rating") or hotel.get("rating"),
+        "reviews": hotel.get("total_reviews") or hotel.get("reviews"),
+        "area": hotel.get("neighborhood") or hotel.get("area"),
+    }
+    return {key: value for key, value in data.items() if value not in (None, "")}
+
+
 def format_hotel_results(
     hotels: list,
     city: str,
@@ -142,42 +426,133 @@ def format_hotel_results(
     return result
 
 
-def search_hotels(
+def format_hotel_markdown(
+    hotels: Optional[list],
     city: str,
     check_in_date: str,
     check_out_date: str,
-    adults: int = 2,
-    rooms: int = 1,
-) -> dict:
+    adults: int,
+    rooms: int,
+    error: Optional[str] = None,
+) -> str:
     """
-    Search for hotels using SERP API Google Hotels.
+    Render hotel results in the hotel agent's markdown format without an LLM call.
 
     Args:
-        city: City to search hotels in
-        check_in_date: Check-in date in YYYY-MM-DD format
-        check_out_date: Check-out date in YYYY-MM-DD format
+        hotels: List of hotel options from SERP API
+        city: City name used for the search
+        check_in_date: Check-in date
+        check_out_date: Check-out date
         adults: Number of adults
         rooms: Number of rooms
+        error: Error message if the search failed
 
     Returns:
-        Dictionary containing hotel search results
+        Markdown string
+    """
+    parts = [_MARKDOWN_HEADER.substitute(
+        separator=MARKDOWN_SEPARATOR,
+        city=city,
+        check_in_date=check_in_date,
+        check_out_date=check_out_date,
+        adults=adults,
+        rooms=rooms,
+    )]
+
+    shown = (hotels or [])[:MARKDOWN_LIMIT]
+    if error or not shown:
+        parts.append(f"\nNo hotels found for these dates ({error or 'no properties returned'}). Try nearby dates or areas.\n")
+
+    for i, hotel in enumerate(shown, 1):
+        rating = hotel.get("overall_rating") or hotel.get("rating")
+        reviews = hotel.get("total_reviews") or hotel.get("reviews")
+        area = hotel.get("neighborhood") or hotel.get("area")
+        address = hotel.get("address") or hotel.get("full_address")
+        amenities = hotel.get("amenities") or []
+
+        details = []
+        if area:
+            details.append(f"- **Area:** {area}\n")
+        if address:
+            details.append(f"- **Address:** {address}\n")
+        if amenities:
+            details.append(f"- **Amenities:** {', '.join(amenities[:5])}\n")
+
+        parts.append(_MARKDOWN_HOTEL.substitute(
+            index=i,
+            name=hotel.get("name", "Unknown property"),
+            price=_extract_price(hotel),
+            rating=f"⭐ {rating} ({reviews or 'few'} reviews)" if rating else "N/A",
+            details="".join(details),
+        ))
+
+    parts.append("\n---\n")
+    rated = [hotel for hotel in shown if isinstance(hotel.get("overall_rating") or hotel.get("rating"), (int, float))]
+    if rated:
+        best = max(rated, key=lambda hotel: hotel.get("overall_rating") or hotel.get("rating"))
+        parts.append(f"\n**⭐ Recommended:** {best.get('name', 'Unknown property')} - Best overall rating!\n")
+    parts.append(f"\n{MARKDOWN_SEPARATOR}\n")
+    return "".join(parts)
+
+
+def _rank_results(
+    hotels: Optional[List[dict]],
+    error: Optional[str],
+    sort_by: str = "score",
+    max_price: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    amenities: Optional[List[str]] = None,
+) -> HotelResult:
+    """
+    Filter and order the full result list before anything is rendered.
+
+    Returns:
+        (ranked_hotels, error_message)
+    """
+    if error or not hotels:
+        return hotels, error
+    if sort_by not in SORT_KEYS:
+        return None, f"sort_by must be one of: {', '.join(SORT_KEYS)}"
+
+    ranked = rank_hotels(hotels, sort_by, max_price=max_price, min_rating=min_rating, amenities=amenities)
+    if not ranked:
+        return None, f"None of the {len(hotels)} hotels found match the requested price, rating or amenities"
+    return ranked, None
+
+
+def _validate_hotel_search(city: str, check_in_date: str, check_out_date: str) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Check the SERP key and required fields shared by both search_hotels variants.
+
+    Returns:
+        (api_key, error_response) - exactly one of them is set
     """
     api_key = os.getenv("SERP_API_KEY")
 
     if not api_key or api_key == "your_serp_api_key_here":
-        return {
+        return None, {
             "status": "error",
             "message": "SERP_API_KEY not configured. Please add your SERP API key to .env file",
         }
 
     if not city or not check_in_date or not check_out_date:
-        return {
+        return None, {
             "status": "error",
             "message": "Missing required fields: city, check_in_date, check_out_date",
         }
 
-    hotels, error = _fetch_hotels(city, check_in_date, check_out_date, api_key, adults, rooms)
+    return api_key, None
+
 
+def _build_hotel_response(
+    hotels: Optional[List[dict]],
+    error: Optional[str],
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    adults: int,
+    rooms: int,
+) -> dict:
     if error:
         return {"status": "error", "message": error}
 
@@ -189,37 +564,166 @@ def search_hotels(
     }
 
 
-# Create hotel search agent with dynamic date context
-current_date = datetime.now()
-today_str = current_date.strftime("%Y-%m-%d")
-current_year = current_date.year
-current_month_num = current_date.month
+def search_hotels(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    adults: int = 2,
+    rooms: int = 1,
+    max_price: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    amenities: Optional[List[str]] = None,
+    sort_by: str = "score",
+) -> dict:
+    """
+    Search for hotels using SERP API Google Hotels.
 
+    Args:
+        city: City to search hotels in
+        check_in_date: Check-in date in YYYY-MM-DD format
+        check_out_date: Check-out date in YYYY-MM-DD format
+        adults: Number of adults
+        rooms: Number of rooms
+        max_price: Optional maximum nightly price in INR
+        min_rating: Optional minimum overall rating (0-5)
+        amenities: Optional amenities every hotel must have (e.g. ["pool", "wi-fi"])
+        sort_by: "score" (rating, price and review count combined), "price", "rating", "reviews" or "relevance"
+
+    Returns:
+        Dictionary containing hotel search results
+    """
+    city = canonical_city(city)
+    api_key, error_response = _validate_hotel_search(city, check_in_date, check_out_date)
+    if error_response:
+        return error_response
+
+    hotels, error = _cached_fetch_hotels(city, check_in_date, check_out_date, api_key, adults, rooms)
+    hotels, error = _rank_results(hotels, error, sort_by, max_price, min_rating, amenities)
+    return _build_hotel_response(hotels, error, city, check_in_date, check_out_date, adults, rooms)
+
+
+def _hotel_search_state(
+    hotels: Optional[List[dict]],
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    adults: int,
+    rooms: int
+) -> dict:
+    """Compact structured search output kept in session state for later pipeline stages."""
+    return {
+        "city": city,
+        "check_in_date": check_in_date,
+        "check_out_date": check_out_date,
+        "adults": adults,
+        "rooms": rooms,
+        "hotels": [_hotel_summary(hotel) for hotel in hotels or []],
+    }
+
+
+async def search_hotels_async(
+    city: str,
+    check_in_date: str,
+    check_out_date: str,
+    adults: int = 2,
+    rooms: int = 1,
+    max_price: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    amenities: Optional[List[str]] = None,
+    sort_by: str = "score",
+    tool_context: Optional[ToolContext] = None,
+) -> dict:
+    """
+    Search for hotels using SERP API Google Hotels without blocking the event loop.
+
+    Args:
+        city: City to search hotels in
+        check_in_date: Check-in date in YYYY-MM-DD format
+        check_out_date: Check-out date in YYYY-MM-DD format
+        adults: Number of adults
+        rooms: Number of rooms
+        max_price: Optional maximum nightly price in INR
+        min_rating: Optional minimum overall rating (0-5)
+        amenities: Optional amenities every hotel must have (e.g. ["pool", "wi-fi"])
+        sort_by: "score" (rating, price and review count combined), "price", "rating", "reviews" or "relevance"
+
+    Returns:
+        Dictionary containing hotel search results. With HOTEL_DIRECT_RENDER, the markdown
+        is written to the hotel_results state key and only a status is returned.
+    """
+    city = canonical_city(city)
+    api_key, error_response = _validate_hotel_search(city, check_in_date, check_out_date)
+    if error_response:
+        return error_response
+
+    hotels, error = await _cached_fetch_hotels_async(city, check_in_date, check_out_date, api_key, adults, rooms)
+    hotels, error = _rank_results(hotels, error, sort_by, max_price, min_rating, amenities)
+
+    if tool_context is not None:
+        tool_context.state["hotel_search"] = _hotel_search_state(hotels, city, check_in_date, check_out_date, adults, rooms)
+
+        if DIRECT_RENDER:
+            tool_context.state["hotel_results"] = format_hotel_markdown(
+                hotels, city, check_in_date, check_out_date, adults, rooms, error
+            )
+            tool_context.actions.skip_summarization = True
+            return {"status": "error" if error else "success", "rendered_to": "hotel_results"}
+
+    return _build_hotel_response(hotels, error, city, check_in_date, check_out_date, adults, rooms)
+
+
+async def search_hotels_from_params(trip_params: dict) -> dict:
+    """
+    Run the hotel search for the extracted trip parameters, without an LLM turn.
+
+    Args:
+        trip_params: Normalized parameters written by trip_params_agent
+
+    Returns:
+        State delta with hotel_search and the rendered hotel_results markdown
+    """
+    city = trip_params["city"]
+    check_in_date, check_out_date = trip_params["outbound_date"], trip_params["return_date"]
+    adults, rooms = int(trip_params.get("adults") or 2), int(trip_params.get("rooms") or 1)
+
+    city = canonical_city(city)
+    api_key, error_response = _validate_hotel_search(city, check_in_date, check_out_date)
+    if error_response:
+        return {"hotel_results": error_response["message"]}
+
+    hotels, error = await _cached_fetch_hotels_async(city, check_in_date, check_out_date, api_key, adults, rooms)
+    hotels, error = _rank_results(hotels, error)
+    return {
+        "hotel_search": _hotel_search_state(hotels, city, check_in_date, check_out_date, adults, rooms),
+        "hotel_results": format_hotel_markdown(hotels, city, check_in_date, check_out_date, adults, rooms, error),
+    }
+
+
+# Create hotel search agent: static instruction (implicitly cached prefix on Gemini) + per-request date context
 hotel_agent = Agent(
-    model='gemini-3-pro-preview',
+    model=routed_model('hotel_search_agent', MODEL_TIERS, MODEL_SLO_SECONDS),
     name='hotel_search_agent',
     description="Searches for hotels and returns formatted hotel options in markdown",
-    instruction=f"""
+    static_instruction="""
     You are a hotel search agent. Your job is to IMMEDIATELY search for hotels when given dates and a destination.
-
-    CURRENT DATE CONTEXT:
-    - Today's date: {today_str}
-    - Current year: {current_year}
-    - Current month: {current_month_num}
+    Today's date is given in the CURRENT DATE CONTEXT that follows these instructions.
 
     CRITICAL RULES - FOLLOW THESE EXACTLY:
-    1. When a user provides dates and a destination city, IMMEDIATELY call search_hotels. DO NOT ask clarifying questions.    
+    1. When a user provides dates and a destination city, IMMEDIATELY call search_hotels_async. DO NOT ask clarifying questions.    
     2. Only ask for clarification if dates OR destination are completely missing.
     3. Default to 2 adults and 1 room if not specified.
 
     WORKFLOW:
     1. Extract: city, check_in_date (YYYY-MM-DD), check_out_date (YYYY-MM-DD), adults, rooms
-    2. IMMEDIATELY call search_hotels with these parameters - no questions, just search!
-    3. Format the results in beautiful markdown for the user.
+       and any preferences: budget (max_price per night), min_rating, amenities, or sort_by
+       ("price" for cheapest, "rating" for best rated; default "score" balances both)
+    2. IMMEDIATELY call search_hotels_async with these parameters - no questions, just search!
+    3. Format the results in beautiful markdown for the user, keeping the order they are returned in
+       (they are already filtered and ranked over the full result list).
 
     DATE HANDLING:
     - Convert dates like "15 Dec 2025" to "2025-12-15"
-    - If year not specified, use {current_year} (or next year if month has passed)
+    - If year not specified, use the current year (or next year if month has passed)
     - Ensure check_in_date is not in the past
 
     MARKDOWN FORMAT:
@@ -258,6 +762,8 @@ hotel_agent = Agent(
     - If no hotels found, show a friendly message
     - Keep formatting clean and scannable
     """,
-    tools=[search_hotels],
+    instruction=dated_instruction(),
+    tools=[search_hotels_async],
     output_key="hotel_results",
+    after_model_callback=record_prompt_cache_usage,
 )
@@ -0,0 +1,259 @@
+"""
+Ranking and filtering over a full Google Hotels result list.
+
+HotelTable parses every property once into columns (stdlib arrays for price,
+rating, review count and hotel class; an amenity bitmask per property), then
+filters and sorts operate column-wise over all of them instead of the first
+ten in SERP order. Picking the top-K is a heap selection, so ranking a few
+hundred properties takes around a millisecond and the agent no longer has to
+reason over the raw list to find the best one.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from itertools import compress, repeat
+from operator import ge, le
+from typing import Dict, Iterable, List, Optional, Sequence
+
+SORT_KEYS = ("score", "price", "rating", "reviews", "relevance")
+
+# Weighted score components, each normalized to [0, 1] within the filtered set.
+DEFAULT_WEIGHTS = {"rating": 0.5, "price": 0.3, "reviews": 0.2}
+
+# Ratings are shrunk towards the set's mean as if each property had this many
+# extra average reviews, so a 5.0 from 3 reviews doesn't beat a 4.6 from 2,000.
+RATING_PRIOR_REVIEWS = 20
+
+_MISSING = math.nan
+_CLASS_RE = re.compile(r"(\d)")
+
+
+def hotel_price_value(hotel: dict) -> Optional[int]:
+    """Return the nightly rate as a number (INR) if available, for sorting and cost maths."""
+    rate_per_night = hotel.get("rate_per_night") or {}
+    if isinstance(rate_per_night, dict):
+        lowest = rate_per_night.get("lowest")
+        if isinstance(lowest, dict) and lowest.get("price"):
+            try:
+                return int(float(lowest["price"]))
+            except (TypeError, ValueError):
+                pass
+
+        extracted = (
+            rate_per_night.get("extracted_lowest")
+            or rate_per_night.get("extracted_average")
+            or rate_per_night.get("extracted_highest")
+        )
+        if extracted:
+            return int(float(extracted))
+
+    total_rate = hotel.get("total_rate")
+    if isinstance(total_rate, dict) and total_rate.get("extracted_price"):
+        return int(float(total_rate["extracted_price"]))
+
+    return None
+
+
+def _number(value) -> float:
+    try:
+        return float(value) if value not in (None, "") else _MISSING
+    except (TypeError, ValueError):
+        return _MISSING
+
+
+def _hotel_class(hotel: dict) -> float:
+    extracted = hotel.get("extracted_hotel_class")
+    if extracted is not None:
+        return _number(extracted)
+    match = _CLASS_RE.search(str(hotel.get("hotel_class") or ""))
+    return float(match.group(1)) if match else _MISSING
+
+
+def _terms(value) -> List[str]:
+    """A single string is one term, not a sequence of characters."""
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _sort_value(value: float) -> tuple:
+    """Ascending sort key that puts missing (NaN) values last."""
+    return (True, 0.0) if math.isnan(value) else (False, value)
+
+
+class HotelTable:
+    """
+    Columnar view of one hotel result list, parsed once.
+
+    Missing numbers are NaN, which fails every bound check, so a property with
+    no price is excluded by a price filter but kept when there is none.
+    """
+
+    def __init__(self, hotels: Sequence[dict]):
+        self.hotels = list(hotels or [])
+        self.price = array("d", (_number(hotel_price_value(hotel)) for hotel in self.hotels))
+        self.rating = array("d", (_number(hotel.get("overall_rating") or hotel.get("rating")) for hotel in self.hotels))
+        self.reviews = array("d", (_number(hotel.get("reviews") or hotel.get("total_reviews")) for hotel in self.hotels))
+        self.hotel_class = array("d", map(_hotel_class, self.hotels))
+
+        # Amenity name -> bit; each property's amenities become one integer bitmask.
+        self.amenity_bits: Dict[str, int] = {}
+        self.amenities: List[int] = []
+        for hotel in self.hotels:
+            bits = 0
+            for amenity in _terms(hotel.get("amenities")):
+                name = str(amenity).casefold()
+                bit = self.amenity_bits.setdefault(name, 1 << len(self.amenity_bits))
+                bits |= bit
+            self.amenities.append(bits)
+
+    def __len__(self) -> int:
+        return len(self.hotels)
+
+    def _amenity_mask(self, term: str) -> int:
+        """Bits of every known amenity containing term ("pool" matches "Outdoor pool")."""
+        term = term.casefold().strip()
+        mask = 0
+        for name, bit in self.amenity_bits.items():
+            if term in name:
+                mask |= bit
+        return mask
+
+    def filter(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        min_reviews: Optional[int] = None,
+        min_class: Optional[int] = None,
+        amenities: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """
+        Indices of properties matching every given bound (None means no bound).
+
+        amenities: every term must match at least one of the property's amenities
+            (a single string is one term)
+        """
+        masks = []
+        if min_price is not None:
+            masks.append(map(ge, self.price, repeat(float(min_price))))
+        if max_price is not None:
+            masks.append(map(le, self.price, repeat(float(max_price))))
+        if min_rating is not None:
+            masks.append(map(ge, self.rating, repeat(float(min_rating))))
+        if min_reviews is not None:
+            masks.append(map(ge, self.reviews, repeat(float(min_reviews))))
+        if min_class is not None:
+            masks.append(map(ge, self.hotel_class, repeat(float(min_class))))
+        for term in _terms(amenities):
+            if term and term.strip():
+                required = self._amenity_mask(term)
+                masks.append(map(bool, map(int.__and__, self.amenities, repeat(required))))
+
+        if not masks:
+            return list(range(len(self.hotels)))
+        return list(compress(range(len(self.hotels)), map(all, zip(*masks))))
+
+    def scores(self, indices: Sequence[int], weights: Optional[Dict[str, float]] = None) -> Dict[int, float]:
+        """
+        Weighted score per index: review-adjusted rating, cheapness within the
+        set and review volume (log scale), each normalized to [0, 1].
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        prices = [self.price[i] for i in indices if not math.isnan(self.price[i])]
+        ratings = [self.rating[i] for i in indices if not math.isnan(self.rating[i])]
+        low, high = (min(prices), max(prices)) if prices else (0.0, 0.0)
+        mean_rating = sum(ratings) / len(ratings) if ratings else 0.0
+        max_log_reviews = max((math.log1p(self.reviews[i]) for i in indices if not math.isnan(self.reviews[i])), default=0.0)
+
+        scores = {}
+        for i in indices:
+            price, rating, reviews = self.price[i], self.rating[i], self.reviews[i]
+            reviews = 0.0 if math.isnan(reviews) else reviews
+
+            rating_score = 0.0
+            if not math.isnan(rating):
+                adjusted = (rating * reviews + mean_rating * RATING_PRIOR_REVIEWS) / (reviews + RATING_PRIOR_REVIEWS)
+                rating_score = adjusted / 5
+            price_score = 0.0
+            if not math.isnan(price):
+                price_score = 1.0 if high == low else (high - price) / (high - low)
+            review_score = math.log1p(reviews) / max_log_reviews if max_log_reviews else 0.0
+
+            scores[i] = (
+                weights.get("rating", 0) * rating_score
+                + weights.get("price", 0) * price_score
+                + weights.get("reviews", 0) * review_score
+            )
+        return scores
+
+    def rank(
+        self,
+        indices: Sequence[int],
+        sort_by: str = "score",
+        limit: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[int]:
+        """
+        Order indices by sort_by ("score", "price" ascending, "rating", "reviews",
+        or "relevance" for SERP order); properties missing the sort field go last.
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+
+        if sort_by == "relevance":
+            return list(indices[:limit] if limit is not None else indices)
+
+        if sort_by == "score":
+            scores = self.scores(indices, weights)
+
+            def key(i):
+                return -scores[i], i
+        elif sort_by == "price":
+            def key(i):
+                return _sort_value(self.price[i]), i
+        else:
+            column = self.rating if sort_by == "rating" else self.reviews
+
+            def key(i):
+                return _sort_value(-column[i]), _sort_value(-self.reviews[i]), i
+
+        if limit is not None and limit < len(indices):
+            return heapq.nsmallest(limit, indices, key=key)
+        return sorted(indices, key=key)
+
+
+def rank_hotels(
+    hotels: Optional[Sequence[dict]],
+    sort_by: str = "score",
+    limit: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    min_reviews: Optional[int] = None,
+    min_class: Optional[int] = None,
+    amenities: Optional[Iterable[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[dict]:
+    """
+    Filter and rank a full hotel result list.
+
+    Args:
+        hotels: properties from a Google Hotels response
+        sort_by: "score" (weighted), "price", "rating", "reviews" or "relevance" (SERP order)
+        limit: Keep only the top `limit` properties
+        min_price / max_price: Nightly price band in INR
+        min_rating: Minimum overall rating (0-5)
+        min_reviews: Minimum number of reviews
+        min_class: Minimum star class
+        amenities: Terms that must all match an amenity (e.g. ["pool", "wi-fi"])
+        weights: Score weights for "rating", "price" and "reviews"
+
+    Returns:
+        The matching hotel dicts, best first
+    """
+    table = HotelTable(hotels or [])
+    indices = table.filter(min_price, max_price, min_rating, min_reviews, min_class, amenities)
+    return [table.hotels[i] for i in table.rank(indices, sort_by, limit, weights)]
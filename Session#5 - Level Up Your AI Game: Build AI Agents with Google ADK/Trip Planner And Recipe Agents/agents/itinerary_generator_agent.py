@@ -1,13 +1,31 @@
 import os
 from datetime import datetime
-from typing import Optional
+from typing import AsyncGenerator, List, Optional
 from dotenv import load_dotenv
+from google.adk.agents import BaseAgent, InvocationContext
 from google.adk.agents.llm_agent import Agent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.events import Event, EventActions
+from agents.model_router import routed_model
+from agents.prompt_cache import dated_instruction, record_prompt_cache_usage
+from agents.trip_params import DEFAULT_ADULTS, DEFAULT_ROOMS
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Models tried in order (primary first; see agents/model_router.py) and the time-to-first-response
+# SLO past which calls move to the next tier. Without streaming the first response is the whole itinerary.
+MODEL_TIERS = os.getenv("ITINERARY_MODEL_TIERS", "gpt-5.1,gemini-2.5-flash")
+MODEL_SLO_SECONDS = float(os.getenv("ITINERARY_MODEL_SLO_SECONDS", "60"))
+
+
+def _trip_nights(start_date: Optional[str], end_date: Optional[str]) -> Optional[int]:
+    """Nights between two YYYY-MM-DD dates, or None if either is missing or invalid."""
+    try:
+        nights = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days
+    except (TypeError, ValueError):
+        return None
+    return nights if nights >= 0 else None
+
 
 def generate_itinerary(
     flight_results: str,
@@ -40,12 +58,8 @@ def generate_itinerary(
         }
 
     # Calculate trip duration
-    try:
-        from datetime import datetime as dt
-        outbound = dt.strptime(outbound_date, "%Y-%m-%d")
-        return_dt = dt.strptime(return_date, "%Y-%m-%d")
-        duration_nights = (return_dt - outbound).days
-    except Exception:
+    duration_nights = _trip_nights(outbound_date, return_date)
+    if duration_nights is None:
         duration_nights = "N/A"
 
     # The agent will handle parsing and formatting via its instruction
@@ -67,34 +81,180 @@ def generate_itinerary(
     }
 
 
-# Create itinerary generator agent with dynamic date context
-current_date = datetime.now()
-today_str = current_date.strftime("%Y-%m-%d")
+def _cheapest_option(options: List[dict]) -> Optional[dict]:
+    priced = [option for option in options or [] if isinstance(option.get("price"), int)]
+    return min(priced, key=lambda option: option["price"]) if priced else None
+
+
+def _top_rated_hotel(hotels: List[dict]) -> Optional[dict]:
+    """Highest rating wins; more reviews, then a lower price, break ties (hotels without a price lose them)."""
+    rated = [hotel for hotel in hotels or [] if isinstance(hotel.get("rating"), (int, float))]
+    if not rated:
+        return None
+
+    def key(hotel: dict):
+        price = hotel.get("price")
+        priced = isinstance(price, (int, float))
+        return hotel["rating"], hotel.get("reviews") or 0, priced, -price if priced else 0
+
+    return max(rated, key=key)
+
+
+def _inr(amount: Optional[int]) -> str:
+    return f"₹{amount:,}" if isinstance(amount, int) else "N/A"
+
+
+def _describe_flight(option: dict) -> str:
+    legs = option.get("legs") or []
+    airlines = ", ".join(dict.fromkeys(leg.get("airline", "Unknown") for leg in legs)) or "Unknown airline"
+    first, last = (legs[0], legs[-1]) if legs else ({}, {})
+    stops = option.get("stops", 0)
+    return (
+        f"{airlines} - {_inr(option.get('price'))}/person - "
+        f"departs {first.get('dep', 'N/A')} from {first.get('from', '?')}, "
+        f"arrives {last.get('arr', 'N/A')} at {last.get('to', '?')} - "
+        f"{option.get('min', 'N/A')} min, {'Direct' if not stops else f'{stops} stop(s)'}"
+    )
+
+
+def build_trip_summary(
+    flight_search: Optional[dict],
+    hotel_search: Optional[dict],
+    trip_params: Optional[dict] = None
+) -> Optional[str]:
+    """
+    Pick the cheapest flights and the top-rated hotel and compute the cost breakdown.
+
+    Args:
+        flight_search: Structured flight output recorded by search_flights_async
+        hotel_search: Structured hotel output recorded by search_hotels_async
+        trip_params: Extracted trip parameters; supply adults/rooms when there is no hotel search
+
+    Returns:
+        Compact markdown summary for the itinerary prompt, or None if there is nothing usable
+    """
+    if not flight_search and not hotel_search:
+        return None
 
+    flight_search = flight_search or {}
+    hotel_search = hotel_search or {}
+    trip_params = trip_params or {}
+
+    origin = flight_search.get("departure_id") or "N/A"
+    destination = flight_search.get("arrival_id") or hotel_search.get("city") or "N/A"
+    start_date = flight_search.get("outbound_date") or hotel_search.get("check_in_date")
+    end_date = flight_search.get("return_date") or hotel_search.get("check_out_date")
+    travelers = int(
+        hotel_search.get("adults") or trip_params.get("adults") or flight_search.get("adults") or DEFAULT_ADULTS
+    )
+    rooms = int(hotel_search.get("rooms") or trip_params.get("rooms") or DEFAULT_ROOMS)
+    hotel_nights = _trip_nights(hotel_search.get("check_in_date"), hotel_search.get("check_out_date"))
+    nights = hotel_nights if hotel_nights is not None else _trip_nights(start_date, end_date)
+
+    outbound = _cheapest_option(flight_search.get("outbound"))
+    inbound = _cheapest_option(flight_search.get("return"))
+    hotel = _top_rated_hotel(hotel_search.get("hotels"))
+
+    lines = [
+        "| Detail | Value |",
+        "|--------|-------|",
+        f"| Route | {origin} → {destination} |",
+        f"| Dates | {start_date or 'N/A'} to {end_date or 'N/A'} |",
+        f"| Duration | {nights if nights is not None else 'N/A'} nights |",
+        f"| Travelers | {travelers} |",
+        "",
+        f"Selected outbound flight: {_describe_flight(outbound) if outbound else 'none found'}",
+    ]
+    if flight_search.get("return_date"):
+        lines.append(f"Selected return flight: {_describe_flight(inbound) if inbound else 'none found'}")
+
+    if hotel:
+        lines.append(
+            f"Selected hotel: {hotel['name']} - {_inr(hotel.get('price'))}/night - "
+            f"rating {hotel['rating']} ({hotel.get('reviews') or 'few'} reviews)"
+            + (f" - {hotel['area']}" if hotel.get("area") else "")
+        )
+    else:
+        lines.append("Selected hotel: none found")
+
+    flight_per_person = sum(option["price"] for option in (outbound, inbound) if option)
+    flight_total = flight_per_person * travelers if flight_per_person else None
+    hotel_total = None
+    if hotel and isinstance(hotel.get("price"), int) and nights is not None:
+        hotel_total = hotel["price"] * nights * rooms
+    grand_total = sum(cost for cost in (flight_total, hotel_total) if cost) or None
+
+    lines += [
+        "",
+        "| Item | Cost |",
+        "|------|------|",
+        f"| Flights ({travelers} pax) | {_inr(flight_total)} |",
+        f"| Hotel ({nights if nights is not None else 'N/A'} nights, {rooms} room(s)) | {_inr(hotel_total)} |",
+        f"| **Total** | **{_inr(grand_total)}** |",
+    ]
+    return "\n".join(lines)
+
+
+class TripSummaryAgent(BaseAgent):
+    """
+    Deterministic stage between the searches and the itinerary LLM.
+
+    Reads the structured flight_search/hotel_search state written by the search
+    tools and stores a compact trip_summary, so the itinerary model no longer has
+    to re-read both result documents to find prices and totals.
+    """
+
+    def __init__(self, name="trip_summary_agent"):
+        super().__init__(
+            name=name,
+            description="Selects the cheapest flight and top-rated hotel and computes the trip cost breakdown",
+        )
+
+    async def _run_async_impl(
+        self,
+        ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        summary = build_trip_summary(state.get("flight_search"), state.get("hotel_search"), state.get("trip_params"))
+
+        if summary is None:
+            # Searches ran without structured output; fall back to the rendered results.
+            summary = (
+                f"{state.get('flight_results', 'No flight results.')}\n\n"
+                f"{state.get('hotel_results', 'No hotel results.')}"
+            )
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"trip_summary": summary}),
+        )
+
+
+trip_summary_agent = TripSummaryAgent()
+
+
+# Create itinerary generator agent: static instruction (cached prefix) + per-request date and trip summary
 itinerary_generator_agent = Agent(
-    model=LiteLlm(model='gpt-5.1', api_key=os.getenv("OPENAI_API_KEY")),
+    model=routed_model('itinerary_generator_agent', MODEL_TIERS, MODEL_SLO_SECONDS),
     name='itinerary_generator_agent',
     description="Generates complete trip itinerary with day-wise activities, cost breakdown, and travel tips",
-    instruction=f"""
+    static_instruction="""
     You are an expert trip itinerary generator with global destination knowledge.
-    Today's date: {today_str}.
 
     The user has already seen flight and hotel search results. Your job is to create a COMPLETE TRIP ITINERARY that ties everything together.
 
-    You have access to the following data (already shown to user in markdown format):
-    - {{flight_results}} → formatted flight search results
-    - {{hotel_results}} → formatted hotel search results
+    The flight and hotel have already been selected and all costs computed in code. Today's date and
+    the trip summary are given after these instructions.
 
     ------------------------------------
     YOUR TASK
     ------------------------------------
-    1. Extract key info from the formatted results:
-       - Cheapest flight option (price, times, airline)
-       - Highest-rated hotel (price per night, name, location)
-       - Trip dates, origin, destination
-    2. Generate a COMPLETE itinerary including:
-       - Trip summary with selected flight & hotel
-       - Total cost breakdown
+    1. Use the trip summary as-is:
+       - Copy the trip details table and the cost table exactly (same numbers)
+       - Describe the selected flight(s) and hotel from the summary
+    2. Generate the rest of the itinerary:
        - Day-by-day activity plan
        - Practical travel tips
 
@@ -162,13 +322,15 @@ itinerary_generator_agent = Agent(
     CRITICAL RULES
     ------------------------------------
     - DO NOT call any tools.
-    - Extract prices ONLY from the provided flight/hotel results.
+    - Take prices, nights and totals ONLY from the trip summary; never recompute them.
     - DO NOT invent or guess pricing data.
     - DO generate SPECIFIC, REAL activities for the destination.
     - Use tables for cost breakdowns.
     - Keep formatting clean and professional.
-
-    Generate the complete itinerary now.
     """,
+    instruction=dated_instruction(
+        "TRIP SUMMARY:\n{trip_summary}\n\nGenerate the complete itinerary now."
+    ),
     tools=[],
+    after_model_callback=record_prompt_cache_usage,
 )
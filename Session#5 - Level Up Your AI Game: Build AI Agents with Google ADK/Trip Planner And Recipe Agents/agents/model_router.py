@@ -0,0 +1,475 @@
+"""
+Latency-aware model routing with fallback tiers for the trip agents.
+
+Each agent gets an ordered list of model tiers: its primary model first, then
+faster (ideally other-provider) fallbacks. RoutedLlm keeps a rolling window of
+time-to-first-response and errors per tier and sends each call to the first
+tier that is within the agent's SLO:
+
+- a tier whose latency percentile exceeds the SLO, or whose error rate exceeds
+  MODEL_ROUTER_MAX_ERROR_RATE, is routed around for MODEL_ROUTER_COOLDOWN_SECONDS;
+  then a single call probes it, and a fast, successful probe brings it back
+  (with a fresh window) while a slow or failed one starts another cool-down
+- a call that fails with a retriable status (429/5xx, dropped connection) or
+  gets no first response within timeout_seconds moves on to the next tier, so
+  a hung provider costs at most the timeout rather than the whole trip
+- once a tier has yielded its first response the turn belongs to it: a later
+  failure propagates rather than splicing two models into one answer
+
+Models edit the request in place before sending it, so it is snapshotted
+before each attempt that could still fall back and restored afterwards, as
+ADK's own FallbackModel does. Per-router counters are exposed through
+get_model_router_stats and the chosen tier is set on the current span.
+
+routed_model wraps every tier in a LazyLlm, so building the agents imports no
+provider SDK (ADK's LiteLLM wrapper alone adds most of a second to a cold
+start) and creates no client until a tier is first called.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Sequence, Tuple, Union
+from dotenv import load_dotenv
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.adk.utils.context_utils import Aclosing
+from google.genai.errors import APIError
+from opentelemetry import trace
+from pydantic import Field, PrivateAttr, model_validator
+from agents.circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+from agents.prompt_cache import cached_lite_llm
+from agents.rate_limiter import RETRYABLE_STATUS_CODES
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Set MODEL_ROUTER_ENABLED=false to pin every agent to its first (primary) tier.
+MODEL_ROUTER_ENABLED = os.getenv("MODEL_ROUTER_ENABLED", "true").lower() not in ("0", "false", "no")
+# Rolling window per tier, and the samples needed before it can be judged.
+MODEL_ROUTER_WINDOW = int(os.getenv("MODEL_ROUTER_WINDOW", "50"))
+MODEL_ROUTER_MIN_SAMPLES = int(os.getenv("MODEL_ROUTER_MIN_SAMPLES", "5"))
+# A tier breaches its SLO when this latency percentile exceeds the agent's SLO seconds...
+MODEL_ROUTER_PERCENTILE = float(os.getenv("MODEL_ROUTER_PERCENTILE", "90"))
+# ...or when more than this share of its recent calls failed.
+MODEL_ROUTER_MAX_ERROR_RATE = float(os.getenv("MODEL_ROUTER_MAX_ERROR_RATE", "0.25"))
+# How long a breaching tier is routed around before one call probes it again.
+MODEL_ROUTER_COOLDOWN_SECONDS = float(os.getenv("MODEL_ROUTER_COOLDOWN_SECONDS", "60"))
+# Abandon a tier with no first response after SLO x factor and try the next one (0 disables).
+MODEL_ROUTER_TIMEOUT_FACTOR = float(os.getenv("MODEL_ROUTER_TIMEOUT_FACTOR", "2"))
+
+logger = logging.getLogger(__name__)
+
+_routers_lock = threading.Lock()
+_routers: Dict[str, "RoutedLlm"] = {}
+
+
+class FirstResponseTimeout(TimeoutError):
+    """Raised when a tier produces no first response within the router's timeout."""
+
+    def __init__(self, model: str, timeout: float):
+        self.model = model
+        self.timeout = timeout
+        super().__init__(f"{model} returned nothing within {timeout:g}s")
+
+
+class ModelHealth:
+    """
+    Rolling time-to-first-response and error window for one model tier.
+
+    The breaker (failure_threshold=1) holds the routing decision: it is opened
+    when the window breaches the SLO, stays open for the cool-down and then
+    lets one probe through.
+    """
+
+    def __init__(self, model: str, window: int = 50, min_samples: int = 5, cooldown_seconds: float = 60):
+        self.model = model
+        self.min_samples = min_samples
+        self.breaker = CircuitBreaker(model, failure_threshold=1, recovery_seconds=cooldown_seconds)
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def admit(self) -> Optional[bool]:
+        """None if calls are being routed around this tier; otherwise whether this call is a recovery probe."""
+        probe = self.breaker.state == HALF_OPEN
+        if not self.breaker.allow():
+            return None
+        return probe
+
+    def record(self, seconds: float, ok: bool, timed_out: bool = False) -> None:
+        """Add one call: seconds to the first response (or to the failure)."""
+        with self._lock:
+            self._samples.append((seconds, ok))
+            self.calls += 1
+            self.errors += not ok
+            self.timeouts += timed_out
+
+    def reset(self) -> None:
+        """Forget the window, e.g. once a probe shows the degradation it describes is over."""
+        with self._lock:
+            self._samples.clear()
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile over successful calls, or None until min_samples are recorded."""
+        with self._lock:
+            latencies = sorted(seconds for seconds, ok in self._samples if ok)
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def error_rate(self) -> Optional[float]:
+        """Share of failed calls in the window, or None until min_samples are recorded."""
+        with self._lock:
+            outcomes = [ok for _, ok in self._samples]
+        if len(outcomes) < self.min_samples:
+            return None
+        return outcomes.count(False) / len(outcomes)
+
+    def breached(self, slo_seconds: float, percentile: float, max_error_rate: float) -> bool:
+        latency = self.percentile(percentile)
+        error_rate = self.error_rate()
+        return (latency is not None and latency > slo_seconds) or (error_rate is not None and error_rate > max_error_rate)
+
+    def stats(self, percentile: float) -> dict:
+        """Return the routing state, window and counters."""
+        latency = self.percentile(percentile)
+        error_rate = self.error_rate()
+        with self._lock:
+            samples = len(self._samples)
+        return {
+            "state": self.breaker.state,
+            "samples": samples,
+            f"p{percentile:g}_seconds": round(latency, 3) if latency is not None else None,
+            "error_rate": round(error_rate, 3) if error_rate is not None else None,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "routed_around": self.breaker.rejected,
+            "degraded_count": self.breaker.opened_count,
+        }
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a provider error: google-genai uses .code, LiteLLM/OpenAI/Anthropic .status_code."""
+    if isinstance(error, APIError):
+        return error.code
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _should_fall_back(error: BaseException) -> bool:
+    """Timeouts and the statuses the SERP client also retries on (LiteLLM reports dropped connections as 500)."""
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def _snapshot(llm_request: LlmRequest) -> Tuple[Any, Any, Dict[str, Any]]:
+    """
+    Copy what a model may edit before sending: contents, config and the private
+    instruction bookkeeping. tools_dict holds live tool objects and is left alone.
+    """
+    private = getattr(llm_request, "__pydantic_private__", None) or {}
+    return (
+        [content.model_copy(deep=True) for content in llm_request.contents],
+        llm_request.config.model_copy(deep=True) if llm_request.config is not None else None,
+        {name: list(value) if isinstance(value, list) else value for name, value in private.items()},
+    )
+
+
+def _restore(llm_request: LlmRequest, snapshot: Tuple[Any, Any, Dict[str, Any]]) -> None:
+    contents, config, private = snapshot
+    llm_request.contents = contents
+    llm_request.config = config
+    for name, value in private.items():
+        setattr(llm_request, name, value)
+
+
+async def _first_response(agen: AsyncGenerator[LlmResponse, None], model: str, timeout: Optional[float]) -> Optional[LlmResponse]:
+    """
+    Await the first response, giving up after timeout seconds.
+
+    The wait happens in the caller's task (asyncio.wait_for would step the
+    provider's generator in a separate task and context), so the timer cancels
+    this task and the cancellation is turned into FirstResponseTimeout.
+    """
+    if not timeout:
+        return await anext(agen, None)
+
+    task = asyncio.current_task()
+    timed_out = False
+
+    def expire():
+        nonlocal timed_out
+        timed_out = True
+        task.cancel()
+
+    handle = asyncio.get_running_loop().call_later(timeout, expire)
+    try:
+        return await anext(agen, None)
+    except asyncio.CancelledError:
+        if not timed_out:
+            raise
+        # Python 3.11+ counts cancellations; drop ours, keep any from the caller.
+        if hasattr(task, "uncancel") and task.uncancel() > 0:
+            raise
+        raise FirstResponseTimeout(model, timeout) from None
+    finally:
+        handle.cancel()
+
+
+class RoutedLlm(BaseLlm):
+    """
+    Routes each call to the first model tier within the SLO, falling back down
+    the tiers on retriable errors and first-response timeouts.
+
+    Usage:
+        Agent(model=RoutedLlm(name="flight_search_agent", tiers=[primary, fallback], slo_seconds=15), ...)
+    """
+
+    tiers: List[BaseLlm] = Field(min_length=1)
+    name: str = ""
+    slo_seconds: float = 15.0
+    timeout_seconds: Optional[float] = None
+    percentile: float = MODEL_ROUTER_PERCENTILE
+    max_error_rate: float = MODEL_ROUTER_MAX_ERROR_RATE
+    # Derived from the primary tier; ADK reads it for spans and LlmRequest.model.
+    model: str = ""
+
+    _health: List[ModelHealth] = PrivateAttr(default_factory=list)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "RoutedLlm":
+        self.model = self.tiers[0].model
+        self.name = self.name or self.model
+        if self.timeout_seconds is None:
+            self.timeout_seconds = self.slo_seconds * MODEL_ROUTER_TIMEOUT_FACTOR
+        self._health = [
+            ModelHealth(tier.model, MODEL_ROUTER_WINDOW, MODEL_ROUTER_MIN_SAMPLES, MODEL_ROUTER_COOLDOWN_SECONDS)
+            for tier in self.tiers
+        ]
+        with _routers_lock:
+            _routers[self.name] = self
+        return self
+
+    @property
+    def capabilities(self):
+        """The primary tier's: the request is built before it is known which tier will serve it."""
+        return self.tiers[0].capabilities
+
+    def _plan(self) -> List[Tuple[int, bool]]:
+        """(tier index, is_probe) to attempt in order; every tier, least degraded first, if all are routed around."""
+        plan = []
+        for index, health in enumerate(self._health):
+            probe = health.admit()
+            if probe is not None:
+                plan.append((index, probe))
+        if plan:
+            return plan
+
+        def degradation(index: int):
+            health = self._health[index]
+            return (health.error_rate() or 0.0, health.percentile(self.percentile) or 0.0, index)
+
+        return [(index, False) for index in sorted(range(len(self.tiers)), key=degradation)]
+
+    def _record(self, index: int, probe: bool, seconds: float, ok: bool, timed_out: bool = False) -> None:
+        health = self._health[index]
+        health.record(seconds, ok, timed_out)
+        if probe:
+            if ok and seconds <= self.slo_seconds:
+                health.reset()
+                health.breaker.record_success()
+                logger.info("%s: %s is back within its SLO", self.name, health.model)
+            else:
+                health.breaker.record_failure()
+        elif health.breaker.state == CLOSED and health.breached(self.slo_seconds, self.percentile, self.max_error_rate):
+            latency, error_rate = health.percentile(self.percentile), health.error_rate()
+            logger.warning(
+                "%s: %s breached its SLO (p%g %s, error rate %s); routing to the next tier for %gs",
+                self.name, health.model, self.percentile,
+                f"{latency:.2f}s" if latency is not None else "n/a",
+                f"{error_rate:.0%}" if error_rate is not None else "n/a",
+                health.breaker.recovery_seconds,
+            )
+            health.breaker.record_failure()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Generate content with the first healthy tier, falling back down the plan.
+
+        Raises:
+            Exception: A non-retriable error, an error after the first response,
+                or the last tier's error when every tier failed
+        """
+        plan = self._plan()
+        loop = asyncio.get_running_loop()
+        position = -1
+        try:
+            for position, (index, probe) in enumerate(plan):
+                delegate = self.tiers[index]
+                last = position == len(plan) - 1
+                pristine = None if last else _snapshot(llm_request)
+                # Models read the name off the request, which the flow filled in from this router.
+                llm_request.model = delegate.model
+
+                span = trace.get_current_span()
+                if span.is_recording():
+                    span.set_attributes({
+                        "llm.router.name": self.name,
+                        "llm.router.model": delegate.model,
+                        "llm.router.tier": index,
+                        "llm.router.probe": probe,
+                    })
+
+                started = loop.time()
+                outcome_recorded = False
+                try:
+                    async with Aclosing(delegate.generate_content_async(llm_request, stream)) as agen:
+                        first = await _first_response(agen, delegate.model, None if last else self.timeout_seconds)
+                        self._record(index, probe, loop.time() - started, ok=True)
+                        outcome_recorded = True
+                        if first is not None:
+                            yield first
+                            async for llm_response in agen:
+                                yield llm_response
+                    return
+                except Exception as error:  # every provider SDK raises its own type; narrowed below
+                    if outcome_recorded or not _should_fall_back(error):
+                        raise
+                    self._record(
+                        index, probe, loop.time() - started, ok=False,
+                        timed_out=isinstance(error, FirstResponseTimeout),
+                    )
+                    outcome_recorded = True
+                    if last:
+                        raise
+                    logger.warning("%s: %s failed (%s); falling back to the next tier", self.name, delegate.model, error)
+                    _restore(llm_request, pristine)
+                finally:
+                    # Cancelled, or a non-retriable error: no verdict on the tier's health.
+                    if probe and not outcome_recorded:
+                        self._health[index].breaker.release()
+        finally:
+            # Probe slots reserved by _plan for tiers this call never reached.
+            for index, probe in plan[position + 1:]:
+                if probe:
+                    self._health[index].breaker.release()
+
+
+class LazyLlm(BaseLlm):
+    """
+    A model tier by name; the wrapper build_model picks for it (and the provider
+    SDK it imports) is created on the first call and reused after that.
+
+    Usage:
+        Agent(model=LazyLlm(model="gpt-5.1", agent_name="itinerary_generator_agent"), ...)
+    """
+
+    agent_name: str = ""
+
+    _delegate: Optional[BaseLlm] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def delegate(self) -> BaseLlm:
+        """The model wrapper, built on first access."""
+        if self._delegate is None:
+            with self._lock:
+                if self._delegate is None:
+                    self._delegate = build_model(self.model, self.agent_name)
+        return self._delegate
+
+    @property
+    def capabilities(self):
+        return self.delegate.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async with Aclosing(self.delegate.generate_content_async(llm_request, stream)) as agen:
+            async for llm_response in agen:
+                yield llm_response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.delegate.connect(llm_request)
+
+
+def build_model(name: str, agent_name: str = "") -> BaseLlm:
+    """
+    Model wrapper for a tier name: Gemini names through ADK's registry, anything
+    else through LiteLLM with the provider key and prompt-cache markers.
+
+    Args:
+        name: Model name, e.g. "gemini-2.5-flash", "claude-sonnet-4-5-20250929", "gpt-5.1"
+        agent_name: Used as the OpenAI prompt_cache_key
+
+    Returns:
+        The model wrapper
+    """
+    if name.startswith("gemini") and "/" not in name:
+        return LLMRegistry.new_llm(name)
+    lowered = name.lower()
+    if "claude" in lowered or lowered.startswith("anthropic/"):
+        return cached_lite_llm(name, api_key=os.getenv("ANTHROPIC_API_KEY"))
+    if "gpt" in lowered or lowered.startswith(("openai/", "o1", "o3", "o4")):
+        return cached_lite_llm(name, prompt_cache_key=agent_name or None, api_key=os.getenv("OPENAI_API_KEY"))
+    return cached_lite_llm(name)
+
+
+def routed_model(agent_name: str, tiers: Union[str, Sequence[str]], slo_seconds: float) -> BaseLlm:
+    """
+    Model for an agent: a RoutedLlm over its tiers, or just the primary when
+    there is one tier or MODEL_ROUTER_ENABLED is false. Tiers are LazyLlm, so
+    no model client is built until the agent first calls it.
+
+    Args:
+        agent_name: Name the router's stats are reported under
+        tiers: Model names, primary first (a comma-separated string or a list)
+        slo_seconds: Time-to-first-response SLO for the agent's model calls
+
+    Returns:
+        The model to pass to Agent(model=...)
+    """
+    names = [name.strip() for name in (tiers.split(",") if isinstance(tiers, str) else tiers) if name and name.strip()]
+    if not names:
+        raise ValueError(f"{agent_name}: no model tiers configured")
+    if not MODEL_ROUTER_ENABLED or len(names) == 1:
+        return LazyLlm(model=names[0], agent_name=agent_name)
+    return RoutedLlm(
+        name=agent_name,
+        tiers=[LazyLlm(model=name, agent_name=agent_name) for name in names],
+        slo_seconds=slo_seconds,
+    )
+
+
+def get_model_router_stats() -> dict:
+    """
+    Per-router tiers, SLO and per-tier routing state since start-up.
+
+    Returns:
+        Dictionary of router (agent) name -> SLO settings and, per tier, state,
+        window percentile and error rate, call/error/timeout counts and how
+        many calls were routed around it
+    """
+    with _routers_lock:
+        routers = dict(_routers)
+    return {
+        name: {
+            "slo_seconds": router.slo_seconds,
+            "timeout_seconds": router.timeout_seconds,
+            "tiers": {health.model: health.stats(router.percentile) for health in router._health},
+        }
+        for name, router in routers.items()
+    }
@@ -0,0 +1,144 @@
+"""
+Provider prompt caching for the agents' long, static instructions.
+
+Each LLM agent's instruction is split in two:
+- static_instruction: the role, workflow, rules and markdown template. It never
+  changes, so it is sent first as the system prompt and forms a stable prefix
+  (after the tool definitions) that providers can cache.
+- instruction: a small dynamic suffix built per call by dated_instruction(),
+  i.e. today's date (computed per request, so a long-running worker no longer
+  serves the date it was started on) plus any session state such as
+  {trip_summary}. ADK sends it as content after the static prefix.
+
+Anthropic only caches prefixes marked with cache_control, so cached_lite_llm()
+asks LiteLLM to mark the system message. OpenAI and Gemini cache long prefixes
+automatically (LiteLLM strips the marker for them); for OpenAI a
+prompt_cache_key keeps requests that share a prefix on the same cache. Prefixes
+under the provider minimum (about 1,024 tokens) are simply not cached.
+
+record_prompt_cache_usage (an after_model_callback) reports cache-hit tokens per
+agent: see get_prompt_cache_stats.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Optional
+from dotenv import load_dotenv
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.models.llm_response import LlmResponse
+from google.adk.utils.instructions_utils import InstructionProvider, inject_session_state
+from opentelemetry import trace
+
+if TYPE_CHECKING:
+    from google.adk.models.lite_llm import LiteLlm
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Set PROMPT_CACHE_ENABLED=false to send requests without cache markers.
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+# Anthropic cache lifetime: "5m" (default) or "1h" (costs more to write, worth it for sparse traffic).
+PROMPT_CACHE_TTL = os.getenv("PROMPT_CACHE_TTL", "5m")
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def cached_lite_llm(model: str, prompt_cache_key: Optional[str] = None, **kwargs) -> "LiteLlm":
+    """
+    LiteLlm whose system prompt (the agent's static_instruction) is marked as a cacheable prefix.
+
+    Args:
+        model: LiteLLM model name
+        prompt_cache_key: OpenAI only - groups requests sharing a prefix onto the same cache
+        **kwargs: Passed to LiteLlm (api_key, ...)
+
+    Returns:
+        The model wrapper
+    """
+    # Imported here: ADK's LiteLLM module is slow to load (see model_router.LazyLlm).
+    from google.adk.models.lite_llm import LiteLlm
+
+    if PROMPT_CACHE_ENABLED:
+        control = {"type": "ephemeral"}
+        if PROMPT_CACHE_TTL == "1h":
+            control["ttl"] = "1h"
+        kwargs.setdefault("cache_control_injection_points", [{"location": "message", "role": "system", "control": control}])
+        if prompt_cache_key:
+            kwargs.setdefault("prompt_cache_key", prompt_cache_key)
+    return LiteLlm(model=model, **kwargs)
+
+
+def date_context(today: Optional[datetime] = None) -> str:
+    """The CURRENT DATE CONTEXT block the agents' instructions refer to."""
+    today = today or datetime.now()
+    return (
+        "CURRENT DATE CONTEXT:\n"
+        f"- Today's date: {today.strftime('%Y-%m-%d')}\n"
+        f"- Current year: {today.year}\n"
+        f"- Current month: {today.month}"
+    )
+
+
+def dated_instruction(template: str = "") -> InstructionProvider:
+    """
+    Dynamic instruction suffix: the current date context followed by template,
+    with {state_key} placeholders filled from session state as ADK would.
+
+    Args:
+        template: Per-request part of the instruction (e.g. "{trip_summary}")
+
+    Returns:
+        An InstructionProvider for LlmAgent.instruction
+    """
+    async def instruction(ctx: ReadonlyContext) -> str:
+        text = date_context()
+        if template:
+            text += "\n\n" + await inject_session_state(template, ctx)
+        return text
+
+    return instruction
+
+
+def record_prompt_cache_usage(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback that records prompt and cache-hit tokens per agent."""
+    usage = llm_response.usage_metadata
+    if usage is None or not usage.prompt_token_count:
+        return None
+
+    prompt_tokens = usage.prompt_token_count or 0
+    cached_tokens = usage.cached_content_token_count or 0
+    with _stats_lock:
+        stats = _stats.setdefault(callback_context.agent_name, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached_tokens
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({"llm.prompt_tokens": prompt_tokens, "llm.prompt_cache.cached_tokens": cached_tokens})
+    logger.debug("%s: %d/%d prompt tokens served from cache", callback_context.agent_name, cached_tokens, prompt_tokens)
+    return None
+
+
+def get_prompt_cache_stats() -> dict:
+    """
+    Prompt cache hits per agent since start-up.
+
+    Returns:
+        Dictionary of agent name -> calls, prompt_tokens, cached_tokens and hit_ratio
+        (share of prompt tokens read from the provider cache)
+    """
+    with _stats_lock:
+        return {
+            agent: {
+                **stats,
+                "hit_ratio": round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else 0.0,
+            }
+            for agent, stats in _stats.items()
+        }
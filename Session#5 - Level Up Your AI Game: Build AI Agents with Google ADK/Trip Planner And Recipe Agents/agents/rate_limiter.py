@@ -0,0 +1,85 @@
+"""Client-side rate limiting and retry backoff for SERP API calls."""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+# Upstream responses worth retrying: throttling and transient server errors.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by sync and async callers.
+
+    Tokens refill at `rate` per second up to `burst`. Each request takes one
+    token; when none are left the caller is given a wait time and the token is
+    borrowed, so waiters are released in arrival order at exactly `rate`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            if wait:
+                self.waits += 1
+                self.waited_seconds += wait
+            return wait
+
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a token is available."""
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def drain(self) -> None:
+        """Drop any saved-up burst, e.g. after the upstream answered 429."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(headers: Mapping[str, str], cap: float) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date), capped at `cap`."""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    return max(0.0, min(cap, seconds))
@@ -0,0 +1,496 @@
+"""Shared, connection-pooled HTTP client for SERP API searches."""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from opentelemetry import trace
+from agents.circuit_breaker import BreakerRegistry, CircuitBreaker, CircuitOpenError
+from agents.hedging import HedgeBudget, LatencyTracker
+from agents.rate_limiter import RETRYABLE_STATUS_CODES, TokenBucket, backoff_delay, retry_after_seconds
+from agents.serp_decode import get_decode_stats
+from agents.tracing import get_tracer
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Point at a local stand-in (python -m agents.serp_replay) to run offline against recorded fixtures.
+SERP_API_URL = os.getenv("SERP_API_URL", "https://serpapi.com/search")
+# When set, every successful SERP response is saved here as a replayable fixture.
+SERP_RECORD_DIR = os.getenv("SERP_RECORD_DIR") or None
+
+# Number of distinct hosts to keep pools for, and open connections kept per host.
+SERP_POOL_CONNECTIONS = int(os.getenv("SERP_POOL_CONNECTIONS", "4"))
+SERP_POOL_MAXSIZE = int(os.getenv("SERP_POOL_MAXSIZE", "16"))
+# When true, callers wait for a free connection instead of opening extra ones past the limit.
+SERP_POOL_BLOCK = os.getenv("SERP_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+
+# Client-side throttling to stay inside the SERP plan quota (SERP_QPS=0 disables the bucket).
+SERP_QPS = float(os.getenv("SERP_QPS", "5"))
+SERP_BURST = int(os.getenv("SERP_BURST", "5"))
+# Upper bound on SERP requests in flight per process (per event loop for async callers).
+SERP_MAX_CONCURRENCY = int(os.getenv("SERP_MAX_CONCURRENCY", "8"))
+# 429 and 5xx responses (and dropped connections) are retried with jittered exponential backoff.
+SERP_MAX_RETRIES = int(os.getenv("SERP_MAX_RETRIES", "3"))
+SERP_BACKOFF_BASE_SECONDS = float(os.getenv("SERP_BACKOFF_BASE_SECONDS", "0.5"))
+SERP_BACKOFF_MAX_SECONDS = float(os.getenv("SERP_BACKOFF_MAX_SECONDS", "8"))
+
+# Hedging: if a call is still running after the engine's recent SERP_HEDGE_PERCENTILE latency,
+# send one duplicate and take whichever answers first. Off by default; callers can opt in per call.
+SERP_HEDGE_ENABLED = os.getenv("SERP_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+SERP_HEDGE_PERCENTILE = float(os.getenv("SERP_HEDGE_PERCENTILE", "95"))
+# Delay used until enough latency samples exist, and bounds on the computed delay.
+SERP_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("SERP_HEDGE_DEFAULT_DELAY_SECONDS", "5"))
+SERP_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("SERP_HEDGE_MIN_DELAY_SECONDS", "0.5"))
+# At most this fraction of calls may be hedged, so quota spend grows by at most the same fraction.
+SERP_HEDGE_BUDGET_RATIO = float(os.getenv("SERP_HEDGE_BUDGET_RATIO", "0.1"))
+
+# Per-engine circuit breaker: after SERP_BREAKER_FAILURES consecutive failed calls (5xx or
+# transport errors, after retries) the engine fails fast for SERP_BREAKER_RECOVERY_SECONDS,
+# then SERP_BREAKER_HALF_OPEN_CALLS probe calls decide whether to close it again.
+SERP_BREAKER_FAILURES = int(os.getenv("SERP_BREAKER_FAILURES", "5"))
+SERP_BREAKER_RECOVERY_SECONDS = float(os.getenv("SERP_BREAKER_RECOVERY_SECONDS", "30"))
+SERP_BREAKER_HALF_OPEN_CALLS = int(os.getenv("SERP_BREAKER_HALF_OPEN_CALLS", "1"))
+
+serp_breakers = BreakerRegistry(
+    failure_threshold=SERP_BREAKER_FAILURES,
+    recovery_seconds=SERP_BREAKER_RECOVERY_SECONDS,
+    half_open_max_calls=SERP_BREAKER_HALF_OPEN_CALLS,
+)
+_tracer = get_tracer(__name__)
+serp_rate_limiter = TokenBucket(rate=SERP_QPS, burst=SERP_BURST)
+serp_latency = LatencyTracker()
+serp_hedge_budget = HedgeBudget(ratio=SERP_HEDGE_BUDGET_RATIO)
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_concurrency = threading.BoundedSemaphore(SERP_MAX_CONCURRENCY)
+_retry_stats = {"retries": 0, "throttled": 0, "server_errors": 0, "connection_errors": 0}
+
+_session: Optional[requests.Session] = None
+_adapter: Optional[HTTPAdapter] = None
+_session_lock = threading.Lock()
+_request_count = 0
+
+
+class _AsyncPool(NamedTuple):
+    client: httpx.AsyncClient
+    concurrency: asyncio.Semaphore
+
+
+# One client and in-flight cap per event loop: httpx connections and asyncio
+# semaphores are bound to the loop that created them. Entries go with their loop.
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncPool]" = weakref.WeakKeyDictionary()
+_async_request_count = 0
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session, _adapter
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=SERP_POOL_CONNECTIONS,
+                    pool_maxsize=SERP_POOL_MAXSIZE,
+                    pool_block=SERP_POOL_BLOCK,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept-Encoding": "gzip, deflate",
+                    "Connection": "keep-alive",
+                })
+                _adapter = adapter
+                _session = session
+
+    return _session
+
+
+def _retry_delay(attempt: int, status_code: Optional[int], headers=None) -> float:
+    """Record a retryable outcome and return how long to back off before the next attempt."""
+    if status_code == 429:
+        # Upstream says we're too fast: drop any saved-up burst so every caller slows down.
+        serp_rate_limiter.drain()
+
+    outcome = "throttled" if status_code == 429 else "connection_errors" if status_code is None else "server_errors"
+    with _session_lock:
+        _retry_stats[outcome] += 1
+        _retry_stats["retries"] += 1
+
+    delay = retry_after_seconds(headers, SERP_BACKOFF_MAX_SECONDS) if headers is not None else None
+    if delay is None:
+        delay = backoff_delay(attempt, SERP_BACKOFF_BASE_SECONDS, SERP_BACKOFF_MAX_SECONDS)
+    return delay
+
+
+def _annotate_request(span, response, queued_seconds: float) -> None:
+    """Attach the outcome of one HTTP attempt to its serp.request span."""
+    if span.is_recording():
+        span.set_attributes({
+            "http.status_code": response.status_code,
+            "http.response.body.size": len(response.content),
+            # Time spent waiting on the token bucket and the concurrency cap before sending.
+            "serp.queued_ms": round(queued_seconds * 1000, 3),
+        })
+
+
+def _record(params: dict, response) -> None:
+    """Save a successful response as a replay fixture when SERP_RECORD_DIR is set."""
+    # Imported lazily so `python -m agents.serp_replay` doesn't find itself pre-imported.
+    from agents.serp_replay import save_fixture
+
+    save_fixture(SERP_RECORD_DIR, params, response.status_code, response.text)
+
+
+def _serp_get_once(params: dict, timeout: float) -> requests.Response:
+    """One logical request: paced, concurrency-capped, retried on 429/5xx."""
+    global _request_count
+
+    engine = params.get("engine", "")
+    attempt = 0
+    while True:
+        with _tracer.start_as_current_span("serp.request", attributes={"serp.engine": engine, "serp.attempt": attempt}) as span:
+            queued = time.monotonic()
+            serp_rate_limiter.acquire()
+            with _session_lock:
+                _request_count += 1
+
+            try:
+                with _concurrency:
+                    started = time.monotonic()
+                    response = get_session().get(SERP_API_URL, params=params, timeout=timeout)
+                    serp_latency.record(engine, time.monotonic() - started)
+            except requests.exceptions.ConnectionError as e:
+                span.record_exception(e)
+                if attempt >= SERP_MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt, None)
+            else:
+                _annotate_request(span, response, started - queued)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= SERP_MAX_RETRIES:
+                    if SERP_RECORD_DIR and response.status_code == 200:
+                        _record(params, response)
+                    return response
+                delay = _retry_delay(attempt, response.status_code, response.headers)
+                response.close()
+
+        attempt += 1
+        time.sleep(delay)
+
+
+def _hedge_delay(engine: str) -> float:
+    delay = serp_latency.percentile(engine, SERP_HEDGE_PERCENTILE)
+    if delay is None:
+        return SERP_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(SERP_HEDGE_MIN_DELAY_SECONDS, delay)
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+
+    if _hedge_executor is None:
+        with _session_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=SERP_MAX_CONCURRENCY * 2, thread_name_prefix="serp-hedge"
+                )
+    return _hedge_executor
+
+
+def _discard_response(future) -> None:
+    """Release the connection held by a losing hedge once it finishes."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _allow(engine: str) -> Tuple[CircuitBreaker, int]:
+    """Return the engine's breaker and the generation the call was admitted in, raising CircuitOpenError if it is open."""
+    breaker = serp_breakers.get(engine)
+    generation = breaker.admit()
+    if generation is None:
+        raise CircuitOpenError(engine, breaker.retry_in())
+    return breaker, generation
+
+
+def _record_outcome(breaker: CircuitBreaker, generation: int, status_code: int) -> None:
+    # 4xx (bad key, bad query) and 429 throttling are not upstream outages.
+    # Outcomes only count for the breaker generation the call was admitted in.
+    if status_code >= 500:
+        breaker.record_failure(generation)
+    else:
+        breaker.record_success(generation)
+
+
+def serp_get(params: dict, timeout: float = 30, hedge: Optional[bool] = None) -> requests.Response:
+    """
+    Issue a GET against the SERP API search endpoint over the shared pool.
+
+    Requests are paced by the shared token bucket, capped at SERP_MAX_CONCURRENCY
+    in flight, and 429/5xx responses are retried with jittered backoff. With
+    hedging, one duplicate is sent if the call outlives the engine's recent
+    tail latency and the hedge budget allows it; the first answer wins. While
+    the engine's circuit breaker is open, calls fail fast without touching the network.
+
+    Args:
+        params: Query parameters, including engine and api_key
+        timeout: Request timeout in seconds
+        hedge: Enable hedging for this call; defaults to SERP_HEDGE_ENABLED
+
+    Returns:
+        The raw response; raises requests exceptions like requests.get would,
+        or CircuitOpenError while the engine's breaker is open
+    """
+    engine = params.get("engine", "")
+    with _tracer.start_as_current_span("serp.search", attributes={"serp.engine": engine}) as span:
+        breaker, generation = _allow(engine)
+        try:
+            response = _serp_get_hedged(params, timeout, hedge)
+        except Exception:
+            breaker.record_failure(generation)
+            raise
+        _record_outcome(breaker, generation, response.status_code)
+        span.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+def _serp_get_hedged(params: dict, timeout: float, hedge: Optional[bool]) -> requests.Response:
+    if not (SERP_HEDGE_ENABLED if hedge is None else hedge):
+        return _serp_get_once(params, timeout)
+
+    serp_hedge_budget.earn()
+    executor = _get_hedge_executor()
+    # Run in a copy of the caller's context so the attempts' spans stay in the same trace.
+    primary = executor.submit(contextvars.copy_context().run, _serp_get_once, params, timeout)
+    done, _ = wait([primary], timeout=_hedge_delay(params.get("engine", "")))
+    if done or not serp_hedge_budget.try_spend():
+        return primary.result()
+
+    trace.get_current_span().set_attribute("serp.hedged", True)
+    backup = executor.submit(contextvars.copy_context().run, _serp_get_once, params, timeout)
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            for loser in pending:
+                # Threads can't be interrupted; cancel if not started, otherwise free the socket when it lands.
+                if not loser.cancel():
+                    loser.add_done_callback(_discard_response)
+            if future is backup:
+                serp_hedge_budget.record_win()
+            return future.result()
+
+    raise error
+
+
+def _async_pool() -> _AsyncPool:
+    """
+    Return the pooled client and concurrency cap of the running event loop.
+
+    httpx connections and asyncio semaphores are tied to the loop that created
+    them, so each loop (e.g. each asyncio.run call, or a worker thread running
+    its own loop) gets its own pair; other loops keep theirs while they run.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None or pool.client.is_closed:
+        # Pools of loops that have since closed can't be awaited any more; drop them so
+        # their sockets are released with the transports.
+        for stale in [other for other in list(_async_pools) if other.is_closed()]:
+            _async_pools.pop(stale, None)
+        pool = _async_pools[loop] = _AsyncPool(
+            client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=SERP_POOL_MAXSIZE,
+                    max_keepalive_connections=SERP_POOL_MAXSIZE,
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            ),
+            concurrency=pool.concurrency if pool is not None else asyncio.Semaphore(SERP_MAX_CONCURRENCY),
+        )
+    return pool
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the non-blocking pooled client for the running event loop."""
+    return _async_pool().client
+
+
+async def _serp_get_once_async(params: dict, timeout: float) -> httpx.Response:
+    """Async counterpart of _serp_get_once."""
+    global _async_request_count
+
+    engine = params.get("engine", "")
+    attempt = 0
+    while True:
+        with _tracer.start_as_current_span("serp.request", attributes={"serp.engine": engine, "serp.attempt": attempt}) as span:
+            queued = time.monotonic()
+            await serp_rate_limiter.acquire_async()
+            pool = _async_pool()
+            _async_request_count += 1
+
+            try:
+                async with pool.concurrency:
+                    started = time.monotonic()
+                    response = await pool.client.get(SERP_API_URL, params=params, timeout=timeout)
+                    serp_latency.record(engine, time.monotonic() - started)
+            except (httpx.ConnectError, httpx.RemoteProtocolError) as e:
+                span.record_exception(e)
+                if attempt >= SERP_MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt, None)
+            else:
+                _annotate_request(span, response, started - queued)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= SERP_MAX_RETRIES:
+                    if SERP_RECORD_DIR and response.status_code == 200:
+                        await asyncio.to_thread(_record, params, response)
+                    return response
+                delay = _retry_delay(attempt, response.status_code, response.headers)
+
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def serp_get_async(params: dict, timeout: float = 30, hedge: Optional[bool] = None) -> httpx.Response:
+    """
+    Non-blocking counterpart of serp_get for async tools, with the same pacing,
+    retries, hedging and circuit breaking; the losing hedge is cancelled.
+
+    Args:
+        params: Query parameters, including engine and api_key
+        timeout: Request timeout in seconds
+        hedge: Enable hedging for this call; defaults to SERP_HEDGE_ENABLED
+
+    Returns:
+        The raw response; raises httpx exceptions on transport errors,
+        or CircuitOpenError while the engine's breaker is open
+    """
+    engine = params.get("engine", "")
+    with _tracer.start_as_current_span("serp.search", attributes={"serp.engine": engine}) as span:
+        breaker, generation = _allow(engine)
+        try:
+            response = await _serp_get_hedged_async(params, timeout, hedge)
+        except asyncio.CancelledError:
+            # The caller gave up (deadline or losing hedge); that says nothing about upstream health.
+            breaker.release(generation)
+            raise
+        except Exception:
+            breaker.record_failure(generation)
+            raise
+        _record_outcome(breaker, generation, response.status_code)
+        span.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+async def _serp_get_hedged_async(params: dict, timeout: float, hedge: Optional[bool]) -> httpx.Response:
+    if not (SERP_HEDGE_ENABLED if hedge is None else hedge):
+        return await _serp_get_once_async(params, timeout)
+
+    serp_hedge_budget.earn()
+    primary = asyncio.ensure_future(_serp_get_once_async(params, timeout))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait([primary], timeout=_hedge_delay(params.get("engine", "")))
+        if done or not serp_hedge_budget.try_spend():
+            return await primary
+
+        trace.get_current_span().set_attribute("serp.hedged", True)
+        backup = asyncio.ensure_future(_serp_get_once_async(params, timeout))
+        tasks.append(backup)
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if task is backup:
+                    serp_hedge_budget.record_win()
+                return task.result()
+        raise error
+    finally:
+        # Covers the losing hedge and a caller cancelled mid-wait: no attempt outlives this call.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def get_pool_metrics() -> dict:
+    """
+    Report connection reuse for the shared pool, rate limiter and breaker activity.
+
+    Returns:
+        Dictionary with request totals, per-host connection counts, throttling/retry
+        counters, per-engine circuit breaker state and response decode stats
+    """
+    hosts = {}
+    if _adapter is not None:
+        for key in list(_adapter.poolmanager.pools.keys()):
+            pool = _adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests_sent": pool.num_requests,
+                # The idle queue is pre-filled with None placeholders; count only live connections.
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn) if pool.pool else 0,
+                "max_connections": pool.pool.maxsize if pool.pool else SERP_POOL_MAXSIZE,
+            }
+
+    opened = sum(host["connections_opened"] for host in hosts.values())
+    return {
+        "requests": _request_count,
+        "connections_opened": opened,
+        "connections_reused": max(0, _request_count - opened),
+        "pool_maxsize": SERP_POOL_MAXSIZE,
+        "hosts": hosts,
+        "async_requests": _async_request_count,
+        "rate_limit": {
+            "qps": SERP_QPS,
+            "burst": SERP_BURST,
+            "max_concurrency": SERP_MAX_CONCURRENCY,
+            "waits": serp_rate_limiter.waits,
+            "waited_seconds": round(serp_rate_limiter.waited_seconds, 3),
+            **_retry_stats,
+        },
+        "hedging": {
+            "enabled": SERP_HEDGE_ENABLED,
+            "percentile": SERP_HEDGE_PERCENTILE,
+            **serp_hedge_budget.stats(),
+            "latency": serp_latency.stats(),
+        },
+        "circuit_breakers": serp_breakers.stats(),
+        "decode": get_decode_stats(),
+    }
+
+
+def close_session() -> None:
+    """Close pooled connections, e.g. on worker shutdown."""
+    global _session, _adapter
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _adapter = None
+
+
+async def close_async_client() -> None:
+    """Close the running event loop's async client and its pooled connections."""
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.client.aclose()
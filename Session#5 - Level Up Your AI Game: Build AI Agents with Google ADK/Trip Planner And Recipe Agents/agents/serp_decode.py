@@ -0,0 +1,187 @@
+"""
+Lean decoding of SERP API responses.
+
+Google Flights and Hotels responses carry images, booking tokens, carbon data,
+GPS points and descriptions the tools never read. decode_serp parses the raw
+body bytes (with orjson when it is installed, otherwise the stdlib json module,
+without first building a str copy of the body) and projects the result down to
+the fields the parsers, rankers and renderers use. Only the projection is kept,
+so the flight/hotel caches, the SQLite hotel cache rows and session state hold
+roughly half the memory of a full flights response; with orjson the decode plus
+projection costs no more CPU than response.json() did.
+
+Every call records the body size and decode time per engine (see
+get_decode_stats; also part of serp_client.get_pool_metrics). Allocation counts
+come from sys.getallocatedblocks(), which walks the allocator's arenas (tens of
+microseconds in a loaded process), so they are sampled on every
+SERP_DECODE_ALLOC_SAMPLE_EVERY-th call only. The count is process-wide, so
+samples taken while other threads allocate are approximate.
+"""
+
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+from opentelemetry import trace
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson for faster decoding
+    orjson = None
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Set SERP_LEAN_DECODE=false to keep whole responses (e.g. while adding a field to a renderer).
+SERP_LEAN_DECODE = os.getenv("SERP_LEAN_DECODE", "true").lower() not in ("0", "false", "no")
+# Count allocated/retained blocks on one call in N (0 disables the counting).
+SERP_DECODE_ALLOC_SAMPLE_EVERY = int(os.getenv("SERP_DECODE_ALLOC_SAMPLE_EVERY", "10"))
+
+Projection = Callable[[Any], Any]
+
+
+def compile_projection(spec: Optional[dict]) -> Optional[Projection]:
+    """
+    Build a function that copies a decoded value keeping only the fields in spec.
+
+    spec maps each kept key to None (keep the value as is) or to a nested spec
+    (project the value too); a projection applied to a list projects each element.
+    Specs are compiled once into closures rather than walked on every call.
+    """
+    if spec is None:
+        return None
+    kept = tuple(key for key, sub in spec.items() if sub is None)
+    nested = tuple((key, compile_projection(sub)) for key, sub in spec.items() if sub is not None)
+
+    def projection(value):
+        if isinstance(value, list):
+            return [projection(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {key: value[key] for key in kept if key in value}
+        for key, sub in nested:
+            if key in value:
+                result[key] = sub(value[key])
+        return result
+
+    return projection
+
+
+# Only what flight_results, flight_ranking and _cheapest_price read. Airport dicts are
+# small and fully used, so they are kept as decoded rather than copied.
+_FLIGHT_OPTION_FIELDS = {
+    **dict.fromkeys(("price", "total_duration", "extensions", "layovers")),
+    "flights": dict.fromkeys((
+        "airline", "flight_number", "duration", "layovers", "departure_airport", "arrival_airport",
+    )),
+}
+FLIGHT_PROJECTION = compile_projection({
+    "best_flights": _FLIGHT_OPTION_FIELDS,
+    "other_flights": _FLIGHT_OPTION_FIELDS,
+    "error": None,
+})
+
+# Only what hotel_ranking, the hotel renderers and the summaries read.
+_HOTEL_FIELDS = dict.fromkeys((
+    "name", "rate_per_night", "total_rate", "price",
+    "overall_rating", "rating", "reviews", "total_reviews",
+    "extracted_hotel_class", "hotel_class", "amenities",
+    "neighborhood", "area", "address", "full_address",
+    "link", "maps_url", "share_url",
+))
+HOTEL_PROJECTION = compile_projection({
+    "properties": _HOTEL_FIELDS,
+    "results": _HOTEL_FIELDS,
+    "hotels_results": _HOTEL_FIELDS,
+    "error": None,
+})
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+_calls = itertools.count()
+
+
+def _loads(content: bytes):
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def _record(engine: str, size: int, seconds: float, allocated: Optional[int], retained: Optional[int]) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(engine, {
+            "calls": 0, "bytes": 0, "decode_ms": 0.0, "alloc_samples": 0, "allocated_blocks": 0, "retained_blocks": 0,
+        })
+        stats["calls"] += 1
+        stats["bytes"] += size
+        stats["decode_ms"] += seconds * 1000
+        if allocated is not None:
+            stats["alloc_samples"] += 1
+            stats["allocated_blocks"] += allocated
+            stats["retained_blocks"] += retained
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        attributes = {"serp.response.bytes": size, "serp.decode_ms": round(seconds * 1000, 3)}
+        if allocated is not None:
+            attributes["serp.decode.allocated_blocks"] = allocated
+            attributes["serp.decode.retained_blocks"] = retained
+        span.set_attributes(attributes)
+
+
+def decode_serp(content: bytes, projection: Optional[Projection], engine: str = "") -> dict:
+    """
+    Decode a SERP response body, keeping only the fields the projection selects.
+
+    Args:
+        content: Raw response body (response.content)
+        projection: FLIGHT_PROJECTION, HOTEL_PROJECTION or None to keep everything
+        engine: SERP engine name the stats are recorded under
+
+    Returns:
+        The decoded (and projected) JSON object
+    """
+    sample = SERP_DECODE_ALLOC_SAMPLE_EVERY > 0 and next(_calls) % SERP_DECODE_ALLOC_SAMPLE_EVERY == 0
+    blocks = sys.getallocatedblocks() if sample else 0
+    started = time.perf_counter()
+
+    data = _loads(content)
+    allocated = sys.getallocatedblocks() - blocks if sample else None
+    if SERP_LEAN_DECODE and projection is not None and isinstance(data, dict):
+        # Rebinding drops the full tree; only the projected objects stay alive.
+        data = projection(data)
+
+    seconds = time.perf_counter() - started
+    retained = sys.getallocatedblocks() - blocks if sample else None
+    _record(engine, len(content), seconds, allocated, retained)
+    return data
+
+
+def get_decode_stats() -> dict:
+    """
+    Per-engine decode totals and per-call averages.
+
+    Returns:
+        Dictionary with the JSON backend, whether projection is on, and for each engine the
+        call count plus total and average body bytes and decode time, and allocated/retained
+        blocks averaged over the sampled calls
+    """
+    engines = {}
+    with _stats_lock:
+        for engine, stats in _stats.items():
+            calls = stats["calls"] or 1
+            samples = stats["alloc_samples"] or 1
+            engines[engine or "unknown"] = {
+                **{key: round(value, 3) for key, value in stats.items()},
+                "avg_bytes": round(stats["bytes"] / calls),
+                "avg_decode_ms": round(stats["decode_ms"] / calls, 3),
+                "avg_allocated_blocks": round(stats["allocated_blocks"] / samples),
+                "avg_retained_blocks": round(stats["retained_blocks"] / samples),
+            }
+    return {
+        "backend": "orjson" if orjson is not None else "json",
+        "lean": SERP_LEAN_DECODE,
+        "engines": engines,
+    }
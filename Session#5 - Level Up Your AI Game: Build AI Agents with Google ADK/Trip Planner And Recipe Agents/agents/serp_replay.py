@@ -0,0 +1,241 @@
+"""
+Record/replay support for SERP API responses.
+
+Record: set SERP_RECORD_DIR and every successful SERP response is written to
+a fixture file (api_key scrubbed) under <dir>/<engine>/<hash>.json.
+
+Replay: ReplayServer serves those fixtures over local HTTP with injected
+latency, so the agents run unchanged against it by pointing SERP_API_URL (or
+serp_client.SERP_API_URL) at the server. Run it standalone with:
+
+    python -m agents.serp_replay --fixtures agents/data/serp_fixtures --port 8765 --latency 0.4 --jitter 0.2
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+DEFAULT_FIXTURES_DIR = str(Path(__file__).parent / "data" / "serp_fixtures")
+
+# Parameters that identify the caller rather than the search; ignored when matching fixtures.
+_IGNORED_PARAMS = {"api_key"}
+
+
+def fixture_key(params: dict) -> str:
+    """Stable hash of the search parameters (api_key excluded)."""
+    search = {str(k): str(v) for k, v in params.items() if k not in _IGNORED_PARAMS}
+    return hashlib.sha1(json.dumps(search, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def save_fixture(directory: str, params: dict, status_code: int, body: str) -> Path:
+    """
+    Write one captured response to <directory>/<engine>/<key>.json.
+
+    Args:
+        directory: Fixture root directory
+        params: Query parameters the response was fetched with
+        status_code: HTTP status of the response
+        body: Raw response body
+
+    Returns:
+        Path of the written fixture
+    """
+    api_key = params.get("api_key")
+    if api_key:
+        body = body.replace(str(api_key), "REDACTED")
+
+    engine = str(params.get("engine") or "unknown")
+    path = Path(directory) / engine / f"{fixture_key(params)}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fixture = {
+        "params": {k: v for k, v in params.items() if k not in _IGNORED_PARAMS},
+        "status": status_code,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "body": body,
+    }
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+class FixtureStore:
+    """
+    In-memory index of recorded fixtures.
+
+    Lookups match on the exact parameters first. Unless strict, a miss falls
+    back to a recorded response for the same engine, so load tests can vary
+    routes and dates without recording every combination.
+    """
+
+    def __init__(self, directory: str, strict: bool = False):
+        self.directory = Path(directory)
+        self.strict = strict
+        self._by_key: Dict[str, Tuple[int, bytes]] = {}
+        self._by_engine: Dict[str, List[Tuple[int, bytes]]] = {}
+        self.exact_hits = 0
+        self.fallback_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """(Re)read every fixture under the directory."""
+        by_key, by_engine = {}, {}
+        for path in sorted(self.directory.glob("*/*.json")):
+            fixture = json.loads(path.read_text(encoding="utf-8"))
+            entry = (int(fixture.get("status", 200)), fixture["body"].encode("utf-8"))
+            by_key[fixture_key(fixture["params"])] = entry
+            by_engine.setdefault(path.parent.name, []).append(entry)
+        self._by_key, self._by_engine = by_key, by_engine
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def lookup(self, params: dict) -> Optional[Tuple[int, bytes]]:
+        """Return (status, body) for the request, or None if nothing matches."""
+        entry = self._by_key.get(fixture_key(params))
+        with self._lock:
+            if entry is not None:
+                self.exact_hits += 1
+                return entry
+
+            candidates = self._by_engine.get(str(params.get("engine"))) if not self.strict else None
+            if not candidates:
+                self.misses += 1
+                return None
+
+            self.fallback_hits += 1
+            # Deterministic choice so repeated runs replay the same payloads.
+            return candidates[int(fixture_key(params), 16) % len(candidates)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "fixtures": len(self._by_key),
+                "exact_hits": self.exact_hits,
+                "fallback_hits": self.fallback_hits,
+                "misses": self.misses,
+            }
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_ReplayHTTPServer"
+
+    def do_GET(self):
+        replay = self.server.replay
+        params = dict(parse_qsl(urlparse(self.path).query))
+        time.sleep(replay.sample_latency())
+
+        if replay.error_rate and replay.random.random() < replay.error_rate:
+            status, body = 503, b'{"error": "Injected failure"}'
+        else:
+            entry = replay.store.lookup(params)
+            if entry is None:
+                status, body = 404, b'{"error": "No recorded fixture for this search"}'
+            else:
+                status, body = entry
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    replay: "ReplayServer"
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in for the SERP API that serves recorded fixtures.
+
+    Each request sleeps for latency_seconds plus uniform jitter in
+    [0, jitter_seconds] before answering; error_rate injects 503s.
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: str = DEFAULT_FIXTURES_DIR,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        strict: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.store = FixtureStore(fixtures_dir, strict=strict)
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self._httpd = _ReplayHTTPServer((host, port), _ReplayHandler)
+        self._httpd.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def sample_latency(self) -> float:
+        return self.latency_seconds + (self.random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0)
+
+    def start(self) -> "ReplayServer":
+        """Serve on a background thread and return self."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="serp-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded SERP API fixtures over local HTTP.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Fixture directory (from SERP_RECORD_DIR)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--strict", action="store_true", help="Only serve exact parameter matches")
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        args.fixtures, args.latency, args.jitter, args.error_rate, args.strict, args.host, args.port
+    )
+    print(f"Replaying {len(server.store)} fixtures at {server.url} (set SERP_API_URL to this)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Streaming helpers for the trip workflow.
+
+Run a trip request from the command line and watch the itinerary arrive as it
+is generated:
+
+    python -m agents.streaming "Plan a trip from Delhi (DEL) to Goa (GOI) from 2025-12-25 to 2025-12-30"
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import AsyncGenerator, Optional
+from dotenv import load_dotenv
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import InMemoryRunner, Runner
+from google.genai import types
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Stream model output token-by-token (SSE) instead of waiting for each full response.
+TRIP_STREAMING = os.getenv("TRIP_STREAMING", "true").lower() not in ("0", "false", "no")
+
+# Session state keys that mark the end of a workflow stage, in the order they usually arrive.
+STAGE_KEYS = {
+    "trip_params": "parameters",
+    "flight_results": "flights",
+    "hotel_results": "hotels",
+    "trip_summary": "summary",
+}
+
+
+def trip_run_config(streaming: Optional[bool] = None) -> RunConfig:
+    """
+    Build the RunConfig for trip requests.
+
+    Args:
+        streaming: Override TRIP_STREAMING for this call
+
+    Returns:
+        RunConfig with SSE streaming enabled when requested
+    """
+    enabled = TRIP_STREAMING if streaming is None else streaming
+    return RunConfig(streaming_mode=StreamingMode.SSE if enabled else StreamingMode.NONE)
+
+
+def _event_text(event) -> str:
+    if event.content and event.content.parts:
+        return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+    return ""
+
+
+async def stream_trip_plan(
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    message: str,
+    streaming: Optional[bool] = None,
+) -> AsyncGenerator[dict, None]:
+    """
+    Run the trip workflow and yield client-ready updates as they happen.
+
+    Yields dictionaries of three kinds:
+    - {"type": "stage", "stage": ...} when a stage's results land in session state
+    - {"type": "delta", "author": ..., "text": ...} for each streamed chunk of model text
+    - {"type": "final", "author": ..., "text": ...} for each agent's complete response
+
+    The itinerary arrives as "delta" chunks from itinerary_generator_agent while it
+    is still being generated, so clients can render it progressively.
+
+    Args:
+        runner: Runner wrapping root_agent
+        user_id: User the session belongs to
+        session_id: Existing session id
+        message: The user's trip request
+        streaming: Override TRIP_STREAMING for this call
+    """
+    new_message = types.Content(role="user", parts=[types.Part(text=message)])
+
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=new_message,
+        run_config=trip_run_config(streaming),
+    ):
+        state_delta = event.actions.state_delta if event.actions else None
+        for key in state_delta or {}:
+            if key in STAGE_KEYS:
+                yield {"type": "stage", "stage": STAGE_KEYS[key], "author": event.author}
+
+        text = _event_text(event)
+        if not text:
+            continue
+
+        if event.partial:
+            yield {"type": "delta", "author": event.author, "text": text}
+        elif event.is_final_response():
+            yield {"type": "final", "author": event.author, "text": text}
+
+
+async def _print_trip_plan(message: str, streaming: Optional[bool]) -> None:
+    from agents.agent import root_agent
+
+    runner = InMemoryRunner(agent=root_agent, app_name="trip_planner")
+    session = await runner.session_service.create_session(app_name="trip_planner", user_id="user")
+    streamed = set()
+
+    async for update in stream_trip_plan(runner, "user", session.id, message, streaming):
+        if update["type"] == "stage":
+            print(f"[{update['stage']} ready]", file=sys.stderr, flush=True)
+        elif update["author"] == "itinerary_generator_agent":
+            # With streaming the final response repeats the text already printed as deltas.
+            if update["type"] == "delta":
+                streamed.add(update["author"])
+                print(update["text"], end="", flush=True)
+            elif update["author"] not in streamed:
+                print(update["text"], end="", flush=True)
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan a trip and print the itinerary as it streams in.")
+    parser.add_argument("message", help="Trip request, e.g. \"Plan a trip from Delhi to Goa from 2025-12-25 to 2025-12-30\"")
+    parser.add_argument("--no-stream", action="store_true", help="Wait for each full response (ignores TRIP_STREAMING)")
+    args = parser.parse_args()
+
+    asyncio.run(_print_trip_plan(args.message, False if args.no_stream else None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+OpenTelemetry setup for the trip workflow.
+
+ADK already opens spans for every agent run (invoke_agent), LLM call
+(call_llm, with gen_ai.usage.* token counts) and tool call (execute_tool).
+This module adds the exporters, and the SERP/cache spans are opened in
+serp_client, flight_agent and hotel_agent under the same trace, so one trip
+request shows its full critical path:
+
+    invoke_agent trip_workflow_agent
+      invoke_agent trip_params_agent
+      invoke_agent parallel_search_agent
+        invoke_agent flight_search_stage
+          flight_search.leg (cache.hit, ...)
+            serp.search -> serp.request (http.status_code, serp.attempt, ...)
+        invoke_agent hotel_search_stage ...
+      invoke_agent trip_summary_agent
+      invoke_agent itinerary_generator_agent
+
+Exporters:
+- TRIP_TRACE_FILE: append finished spans as JSON lines to this file
+- OTEL_EXPORTER_OTLP_ENDPOINT / OTEL_EXPORTER_OTLP_TRACES_ENDPOINT: send spans
+  to an OTLP/HTTP collector (handled by ADK's provider setup)
+"""
+
+import json
+import os
+import threading
+from typing import Optional, Sequence
+
+from dotenv import load_dotenv
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+# Load environment variables
+load_dotenv(override=True)
+
+TRIP_TRACE_FILE = os.getenv("TRIP_TRACE_FILE") or None
+
+_configured = False
+_setup_lock = threading.Lock()
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends each finished span to a file as one compact JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = []
+        for span in spans:
+            context = span.get_span_context()
+            lines.append(json.dumps({
+                "name": span.name,
+                "trace_id": format(context.trace_id, "032x"),
+                "span_id": format(context.span_id, "016x"),
+                "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+                "start_ns": span.start_time,
+                "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+                "status": span.status.status_code.name,
+                "attributes": dict(span.attributes or {}),
+            }, default=str))
+
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def setup_tracing(trace_file: Optional[str] = None) -> None:
+    """
+    Install span exporters once per process.
+
+    If a TracerProvider is already configured (e.g. by `adk web` with OTLP env
+    vars set), the file exporter is added to it; otherwise ADK's provider setup
+    is used, which also wires OTLP from the standard OTEL_* env vars.
+
+    Args:
+        trace_file: Override TRIP_TRACE_FILE
+    """
+    global _configured
+
+    path = trace_file or TRIP_TRACE_FILE
+    with _setup_lock:
+        if _configured:
+            return
+        _configured = True
+
+        processors = [BatchSpanProcessor(JsonlSpanExporter(path))] if path else []
+        provider = trace.get_tracer_provider()
+        if isinstance(provider, TracerProvider):
+            for processor in processors:
+                provider.add_span_processor(processor)
+        else:
+            # Imported here so modules that only need get_tracer don't load google.adk.
+            from google.adk.telemetry.setup import OTelHooks, maybe_set_otel_providers
+
+            maybe_set_otel_providers(otel_hooks_to_setup=[OTelHooks(span_processors=processors)])
+
+
+def get_tracer(name: str) -> trace.Tracer:
+    """Tracer for trip planner spans; a no-op until an exporter is configured."""
+    return trace.get_tracer(name)
@@ -0,0 +1,352 @@
+"""
+Trip parameter extraction, run once ahead of the parallel search.
+
+trip_params_agent reads the user's message and writes normalized parameters to
+the trip_params state key:
+
+    {"departure_id": "DEL", "arrival_id": "GOI", "city": "Goa",
+     "outbound_date": "2025-12-25", "return_date": "2025-12-30",
+     "adults": 2, "rooms": 1}
+
+A deterministic parser handles the common phrasings (airport codes, city names
+resolved through the bundled airport index, ISO or "25 Dec 2025" style dates,
+"for 5 nights", traveler and room counts).
+Only when it cannot find a route and dates does a small, fast model extract
+them instead. DirectSearchAgent then runs each search straight from that state,
+so neither branch spends an LLM turn re-reading the request.
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from google.adk.agents import BaseAgent, InvocationContext
+from google.adk.agents.llm_agent import Agent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import BaseModel, Field
+from agents.airport_index import METRO_CODES, canonical_city, get_airport_index, metro_code, resolve_airport_code
+from agents.model_router import routed_model
+from agents.prompt_cache import dated_instruction, record_prompt_cache_usage
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Model tiers (comma-separated, primary first) used only when the deterministic parser can't read
+# the request; set TRIP_PARAMS_LLM_FALLBACK=false to leave those requests to the search agents.
+TRIP_PARAMS_MODEL = os.getenv("TRIP_PARAMS_MODEL", "gemini-2.5-flash")
+TRIP_PARAMS_MODEL_SLO_SECONDS = float(os.getenv("TRIP_PARAMS_MODEL_SLO_SECONDS", "5"))
+LLM_FALLBACK = os.getenv("TRIP_PARAMS_LLM_FALLBACK", "true").lower() not in ("0", "false", "no")
+
+DEFAULT_ADULTS = 2
+DEFAULT_ROOMS = 1
+
+FLIGHT_PARAMS = ("departure_id", "arrival_id", "outbound_date")
+HOTEL_PARAMS = ("city", "outbound_date", "return_date")
+
+_MONTHS = {
+    name: index
+    for index, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+         ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+         ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+_WEEKDAYS = {"mon", "monday", "tue", "tuesday", "wed", "wednesday", "thu", "thursday", "fri", "friday", "sat", "saturday", "sun", "sunday"}
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+_MONTH = r"(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_ORDINAL = r"(?:st|nd|rd|th)?"
+_DATE_PATTERNS = [
+    re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b"),
+    re.compile(r"\b(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})\b"),
+    re.compile(rf"\b(?P<day>\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?{_MONTH}(?:,?\s+(?P<year>\d{{4}}))?\b", re.IGNORECASE),
+    re.compile(rf"\b{_MONTH}\s+(?P<day>\d{{1,2}}){_ORDINAL}(?:,?\s+(?P<year>\d{{4}}))?\b", re.IGNORECASE),
+]
+_COUNT = r"(?P<count>\d+|" + "|".join(_NUMBER_WORDS) + r")"
+_DURATION_RE = re.compile(rf"\b{_COUNT}[\s-]+(?P<unit>nights?|days?)\b", re.IGNORECASE)
+_ADULTS_RE = re.compile(
+    rf"\b{_COUNT}\s+(?:adults?|passengers?|people|persons?|travell?ers?|guests?|pax)\b"
+    r"|\b(?:adults?|passengers?|travell?ers?|guests?|pax)\s*[:=]?\s*(?P<after>\d+)\b",
+    re.IGNORECASE,
+)
+_ROOMS_RE = re.compile(rf"\b{_COUNT}\s+rooms?\b|\brooms?\s*[:=]?\s*(?P<after>\d+)\b", re.IGNORECASE)
+
+# "Delhi (DEL)", "Goa", "New York (JFK)" or a bare "DEL".
+_PLACE = r"(?P<{0}>[A-Z][A-Za-z.'-]*(?:\s+[A-Z][A-Za-z.'-]*)*)?\s*(?:\((?P<{0}_code>[A-Za-z]{{3}})\))?"
+_ROUTE_RE = re.compile(
+    r"(?:\bfrom\s+)?" + _PLACE.format("origin") + r"\s*(?:\bto\b|→|->|–|—)\s*" + _PLACE.format("destination")
+)
+
+
+def _count(match: Optional[re.Match]) -> Optional[int]:
+    if not match:
+        return None
+    value = (match.group("count") or match.group("after") or "").lower()
+    return int(value) if value.isdigit() else _NUMBER_WORDS.get(value)
+
+
+def _resolve_date(year: Optional[str], month: str, day: str, after: date) -> Optional[date]:
+    """Build a date; without a year, pick the first occurrence on or after `after`."""
+    month_number = int(month) if month.isdigit() else _MONTHS.get(month.lower().rstrip("."))
+    try:
+        if year:
+            return date(int(year), month_number, int(day))
+        candidate = date(after.year, month_number, int(day))
+        return candidate if candidate >= after else date(after.year + 1, month_number, int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def _find_dates(text: str, today: date) -> List[date]:
+    """Dates in the order they appear; later yearless dates roll forward past earlier ones."""
+    matches = sorted(
+        (match for pattern in _DATE_PATTERNS for match in pattern.finditer(text)),
+        key=lambda match: match.start(),
+    )
+    dates, last_end = [], -1
+    for match in matches:
+        if match.start() < last_end:
+            continue
+        resolved = _resolve_date(match.group("year"), match.group("month"), match.group("day"), dates[-1] if dates else today)
+        if resolved:
+            dates.append(resolved)
+            last_end = match.end()
+    return dates
+
+
+def _strip_place(name: Optional[str]) -> Optional[str]:
+    """Drop month/weekday words a capitalised date can leave on the end of a place name."""
+    words = (name or "").split()
+    while words and words[-1].lower().rstrip(".,") in _MONTHS.keys() | _WEEKDAYS:
+        words.pop()
+    return " ".join(words) or None
+
+
+def _airport(name: Optional[str], code: Optional[str], origin: bool) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (IATA code, place name) for a route endpoint given as a city, a code or both.
+
+    Capitalised words next to the place ("Trip Delhi", "Goa Beach") are tolerated by
+    trying the words closest to "to" first: the last ones for the origin, the first
+    ones for the destination. The place name is the user's own words (hotels are
+    searched there: "Manali", not its airport's city "Kullu"); only a bare code is
+    turned into its airport's city, and one missing from the index keeps no city.
+    Multi-airport cities get their metro code ("New York" -> NYC).
+    """
+    index = get_airport_index()
+    if code:
+        code = code.upper()
+        resolved, _ = resolve_airport_code(code)
+        airport = index.get(code)
+        return resolved or code, name or (airport.city if airport else METRO_CODES.get(code))
+    if not name:
+        return None, None
+    if len(name) == 3 and name.isupper():
+        resolved, _ = resolve_airport_code(name)
+        city = canonical_city(name)
+        return resolved, city if city != name else None
+
+    words = name.split()
+    for size in range(len(words), 0, -1):
+        place = " ".join(words[-size:] if origin else words[:size])
+        matches = index.lookup(place)
+        resolved = metro_code(place) or (matches[0].code if matches else None)
+        if resolved:
+            return resolved, place
+    return None, None
+
+
+def _find_route(text: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """(departure_id, arrival_id, destination city) from "X to Y" style phrasing."""
+    for match in _ROUTE_RE.finditer(text):
+        origin_name = _strip_place(match.group("origin"))
+        destination_name = _strip_place(match.group("destination"))
+        departure_id, _ = _airport(origin_name, match.group("origin_code"), origin=True)
+        arrival_id, city = _airport(destination_name, match.group("destination_code"), origin=False)
+        if departure_id and arrival_id and departure_id != arrival_id:
+            return departure_id, arrival_id, city
+    return None
+
+
+def parse_trip_request(text: str, today: Optional[date] = None) -> Optional[dict]:
+    """
+    Extract normalized trip parameters from a free-text request without an LLM.
+
+    Args:
+        text: The user's message
+        today: Reference date for yearless dates (defaults to today)
+
+    Returns:
+        trip_params dict, or None if the route or outbound date can't be determined
+        or the dates are in the past
+    """
+    today = today or datetime.now().date()
+    route = _find_route(text or "")
+    dates = _find_dates(text or "", today)
+    if not route or not dates:
+        return None
+
+    outbound = dates[0]
+    return_date = dates[1] if len(dates) > 1 else None
+    duration = _DURATION_RE.search(text)
+    if return_date is None and duration:
+        length = _count(duration)
+        if length:
+            nights = length if duration.group("unit").lower().startswith("night") else max(1, length - 1)
+            return_date = outbound + timedelta(days=nights)
+
+    if outbound < today or (return_date and return_date < outbound):
+        return None
+
+    departure_id, arrival_id, city = route
+    return {
+        "departure_id": departure_id,
+        "arrival_id": arrival_id,
+        "city": city,
+        "outbound_date": outbound.isoformat(),
+        "return_date": return_date.isoformat() if return_date else None,
+        "adults": _count(_ADULTS_RE.search(text)) or DEFAULT_ADULTS,
+        "rooms": _count(_ROOMS_RE.search(text)) or DEFAULT_ROOMS,
+    }
+
+
+def has_trip_params(trip_params: Optional[dict], required: Sequence[str]) -> bool:
+    """True if every required key is present and non-empty."""
+    return bool(trip_params) and all(trip_params.get(key) for key in required)
+
+
+def _user_text(content: Optional[types.Content]) -> str:
+    return "\n".join(part.text for part in (content.parts if content else None) or [] if part.text)
+
+
+class TripParameters(BaseModel):
+    """Schema the fallback model fills in; mirrors parse_trip_request's output."""
+
+    departure_id: Optional[str] = Field(None, description="IATA code of the departure airport, e.g. DEL")
+    arrival_id: Optional[str] = Field(None, description="IATA code of the arrival airport, e.g. GOI")
+    city: Optional[str] = Field(None, description="Destination city to search hotels in")
+    outbound_date: Optional[str] = Field(None, description="Departure / check-in date, YYYY-MM-DD")
+    return_date: Optional[str] = Field(None, description="Return / check-out date, YYYY-MM-DD, if any")
+    adults: int = Field(DEFAULT_ADULTS, description="Number of travelers")
+    rooms: int = Field(DEFAULT_ROOMS, description="Number of hotel rooms")
+
+
+def _extractor_agent() -> Agent:
+    # Static rules (cached prefix) + per-request date context, as the other LLM agents do.
+    return Agent(
+        model=routed_model('trip_params_extractor', TRIP_PARAMS_MODEL, TRIP_PARAMS_MODEL_SLO_SECONDS),
+        name='trip_params_extractor',
+        description="Extracts trip parameters from requests the deterministic parser could not read",
+        static_instruction=f"""
+        Extract the trip parameters from the user's request. Today's date is given in the
+        CURRENT DATE CONTEXT that follows these instructions.
+
+        - Use IATA airport codes for departure_id and arrival_id (e.g. "Delhi" -> DEL, "Goa" -> GOI).
+        - city is the destination city for the hotel search.
+        - Dates are YYYY-MM-DD and never in the past; a date without a year is the next such date.
+        - If the user gives a trip length instead of a return date, derive return_date from it.
+        - Leave a field empty if the request does not say it; default to {DEFAULT_ADULTS} adults and {DEFAULT_ROOMS} room.
+        """,
+        instruction=dated_instruction(),
+        output_schema=TripParameters,
+        output_key="trip_params",
+        after_model_callback=record_prompt_cache_usage,
+    )
+
+
+class TripParamsAgent(BaseAgent):
+    """
+    First stage of the trip workflow: writes normalized trip_params to state.
+
+    The deterministic parser answers most requests in microseconds; the
+    optional extractor model only runs for the ones it cannot read.
+    """
+
+    def __init__(self, name="trip_params_agent", llm_fallback: bool = LLM_FALLBACK):
+        super().__init__(
+            name=name,
+            description="Extracts route, dates, travelers and rooms from the request once for both searches",
+            sub_agents=[_extractor_agent()] if llm_fallback else [],
+        )
+
+    async def _run_async_impl(
+        self,
+        ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        trip_params = parse_trip_request(_user_text(ctx.user_content))
+
+        # Always overwrite, so a follow-up message never reuses the previous turn's parameters.
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"trip_params": trip_params}),
+        )
+
+        if trip_params is None and self.sub_agents:
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+
+
+class DirectSearchAgent(BaseAgent):
+    """
+    Runs one search branch straight from state["trip_params"].
+
+    `search` takes the trip parameters and returns the state delta to write
+    (structured results plus the rendered markdown under output_key). The
+    markdown is also the event's content, so the user sees the results just as
+    they would from the LLM search agent. When the parameters it needs are
+    missing, the branch falls back to that agent.
+    """
+
+    search: Callable[[dict], Awaitable[Dict[str, object]]]
+    required: Tuple[str, ...]
+    output_key: str
+
+    def __init__(
+        self,
+        name: str,
+        search: Callable[[dict], Awaitable[dict]],
+        required: Sequence[str],
+        fallback_agent: BaseAgent,
+        output_key: str
+    ):
+        super().__init__(
+            name=name,
+            description=f"Runs {fallback_agent.name} from the extracted trip parameters",
+            sub_agents=[fallback_agent],
+            search=search,
+            required=tuple(required),
+            output_key=output_key,
+        )
+
+    async def _run_async_impl(
+        self,
+        ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        trip_params = ctx.session.state.get("trip_params")
+
+        if not has_trip_params(trip_params, self.required):
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+            return
+
+        state_delta = await self.search(trip_params)
+        markdown = state_delta.get(self.output_key)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=markdown)]) if markdown else None,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+trip_params_agent = TripParamsAgent()
@@ -0,0 +1,91 @@
+"""
+Cold-start import benchmark for the agents package.
+
+Each target is timed in a fresh interpreter (no warm module cache), repeated
+--runs times; the slowest modules of one extra `-X importtime` run are listed
+so regressions are easy to attribute.
+
+Usage (from the Trip Planner directory):
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+# (label, statement run in a fresh interpreter)
+TARGETS = [
+    ("import agents", "import agents"),
+    ("import agents.serp_client", "import agents.serp_client"),
+    ("agents.root_agent", "import agents; agents.root_agent"),
+]
+
+_TIMER = (
+    "import time; _t = time.perf_counter(); {statement}; "
+    "print(time.perf_counter() - _t)"
+)
+
+
+def _python_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    # Keep bytecode caches (as a deployed worker would) but never write new ones mid-benchmark.
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def time_statement(statement: str, runs: int) -> List[float]:
+    """Seconds taken by `statement` in `runs` fresh interpreters."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(statement=statement)],
+            capture_output=True, text=True, check=True, env=_python_env(),
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+
+def slowest_imports(statement: str, top: int) -> List[Tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) for the slowest top-level-ish imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True, env=_python_env(),
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return sorted(rows, key=lambda row: row[0], reverse=True)[:top]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the agents package.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list per target")
+    args = parser.parse_args(argv)
+
+    print(f"{'target':<28}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for label, statement in TARGETS:
+        samples = time_statement(statement, args.runs)
+        print(
+            f"{label:<28}{statistics.median(samples) * 1000:>12.1f}"
+            f"{min(samples) * 1000:>10.1f}{max(samples) * 1000:>10.1f}"
+        )
+
+    for label, statement in TARGETS:
+        print(f"\nSlowest imports for `{label}` (self time):")
+        for self_us, cumulative_us, module in slowest_imports(statement, args.top):
+            print(f"  {self_us / 1000:>8.1f} ms self {cumulative_us / 1000:>9.1f} ms cumulative  {module.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+End-to-end latency benchmark for the trip planner workflow.
+
+Drives root_agent through the ADK Runner with a stub LLM (fixed latency; calls
+an agent's search tool once if a branch falls back to its LLM) and the SERP replay server (fixed latency plus
+jitter), so runs are offline and reproducible. Reports, per concurrency level:
+
+- p50/p95/p99 latency per stage (parameter extraction, workflow, parallel
+  search, each branch, cost summary, itinerary generation)
+- branch overlap: (flight + hotel branch time) / parallel stage time; ~2.0
+  means the branches fully overlap, ~1.0 means they ran back to back
+- throughput in requests per second
+- CPU milliseconds per request and peak RSS (plus traced Python heap per
+  in-flight request with --memory)
+
+and, at the end, SERP response decoding per engine (body size, decode time,
+allocated vs retained blocks; see agents/serp_decode.py).
+
+With --degraded-llm-latency every agent's model is a RoutedLlm whose primary
+tier is a stub that slow and whose fallback is the normal stub, to show the
+model router bounding latency while a provider is degraded (see
+agents/model_router.py); per-tier routing counters are printed at the end.
+
+Usage (from the Trip Planner directory):
+
+    python -m benchmarks.trip_workflow
+    python -m benchmarks.trip_workflow --concurrency 1 10 100 --llm-latency 0.3 --serp-latency 0.5
+    python -m benchmarks.trip_workflow --fixtures agents/data/serp_fixtures --json results.json
+    python -m benchmarks.trip_workflow --concurrency 1 4 --degraded-llm-latency 2 --llm-slo 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+
+# Offline settings must be in place before the agents package loads its configuration.
+_BENCH_DIR = tempfile.mkdtemp(prefix="trip-bench-")
+os.environ.setdefault("SERP_API_KEY", "benchmark")
+os.environ.setdefault("SERP_QPS", "0")
+os.environ["HOTEL_CACHE_PATH"] = os.path.join(_BENCH_DIR, "hotel_cache.sqlite3")
+
+from google.adk.agents.llm_agent import LlmAgent  # noqa: E402
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.adk.models.llm_response import LlmResponse  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+import agents.flight_agent  # noqa: E402,F401  (module, not the agent re-exported by the package)
+import agents.serp_client as serp_client  # noqa: E402
+from agents.agent import root_agent  # noqa: E402
+from agents.model_router import RoutedLlm, get_model_router_stats  # noqa: E402
+from agents.serp_decode import get_decode_stats  # noqa: E402
+from agents.serp_replay import ReplayServer, save_fixture  # noqa: E402
+from agents.trip_params import parse_trip_request  # noqa: E402
+
+flight_module = sys.modules["agents.flight_agent"]
+hotel_module = sys.modules["agents.hotel_agent"]
+
+APP_NAME = "trip_planner_bench"
+PERCENTILES = (50, 95, 99)
+
+
+class StubLlm(BaseLlm):
+    """
+    Stand-in model: on the first turn of an agent with tools it calls the first
+    tool with the trip parameters from the user message; otherwise it answers
+    with a fixed block of text. Every call sleeps for `latency` seconds.
+    """
+
+    model: str = "benchmark-stub"
+    latency: float = 0.2
+    output_words: int = 400
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency)
+
+        contents = llm_request.contents or []
+        answered = any(part.function_response for content in contents for part in content.parts or [])
+        tools = list(llm_request.tools_dict)
+
+        if tools and not answered:
+            trip = _trip_from_request(contents)
+            name = tools[0]
+            if "hotel" in name:
+                args = {
+                    "city": trip["city"],
+                    "check_in_date": trip["outbound_date"],
+                    "check_out_date": trip["return_date"],
+                }
+            else:
+                args = {
+                    "departure_id": trip["departure_id"],
+                    "arrival_id": trip["arrival_id"],
+                    "outbound_date": trip["outbound_date"],
+                    "return_date": trip["return_date"],
+                }
+            part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+        else:
+            part = types.Part(text="itinerary " * self.output_words)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=0, candidates_token_count=0, total_token_count=0
+            ),
+        )
+
+
+def _trip_from_request(contents: List[types.Content]) -> dict:
+    for content in contents:
+        for part in content.parts or []:
+            trip = parse_trip_request(part.text) if part.text else None
+            if trip:
+                return trip
+    raise ValueError("Benchmark trip parameters not found in the request")
+
+
+def _trip(index: int) -> str:
+    """Distinct dates per request so the flight/hotel caches don't short-circuit the searches."""
+    outbound = date.today() + timedelta(days=30 + index)
+    return (
+        f"Plan a trip from Delhi (DEL) to Goa (GOI) from {outbound.isoformat()} "
+        f"to {(outbound + timedelta(days=4)).isoformat()} for 2 adults"
+    )
+
+
+def _write_synthetic_fixtures(directory: str) -> None:
+    """Create one realistic-sized flights and hotels response for the replay server."""
+    flights = [
+        {
+            "price": 4500 + 250 * i,
+            "total_duration": 150 + 10 * i,
+            "flights": [{
+                "departure_airport": {"name": "Indira Gandhi International Airport", "id": "DEL", "time": "2026-01-01 06:00"},
+                "arrival_airport": {"name": "Manohar International Airport", "id": "GOX", "time": "2026-01-01 08:30"},
+                "duration": 150 + 10 * i,
+                "airline": ["IndiGo", "Air India", "Akasa Air", "SpiceJet"][i % 4],
+                "flight_number": f"6E {100 + i}",
+                "airplane": "Airbus A320neo",
+                "travel_class": "Economy",
+                "legroom": "30 in",
+                "extensions": ["Average legroom (30 in)", "In-seat USB outlet"],
+            }],
+            "carbon_emissions": {"this_flight": 98000, "typical_for_this_route": 101000},
+            "type": "One way",
+            "booking_token": "x" * 200,
+        }
+        for i in range(12)
+    ]
+    hotels = [
+        {
+            "type": "hotel",
+            "name": f"Benchmark Resort {i}",
+            "description": "Beachfront property with pool and spa. " * 3,
+            "gps_coordinates": {"latitude": 15.5 + i / 100, "longitude": 73.8},
+            "hotel_class": f"{3 + i % 3}-star hotel",
+            "overall_rating": round(3.5 + (i % 15) / 10, 1),
+            "reviews": 150 * (i + 1),
+            "rate_per_night": {"lowest": f"₹{3000 + 200 * i:,}", "extracted_lowest": 3000 + 200 * i},
+            "amenities": ["Free Wi-Fi", "Pool", "Spa", "Restaurant", "Airport shuttle"][: 2 + i % 4],
+            "images": [{"thumbnail": f"https://example.com/{i}/{j}.jpg"} for j in range(5)],
+        }
+        for i in range(20)
+    ]
+    save_fixture(directory, {"engine": "google_flights"}, 200, json.dumps({"best_flights": flights[:4], "other_flights": flights[4:]}))
+    save_fixture(directory, {"engine": "google_hotels"}, 200, json.dumps({"properties": hotels}))
+
+
+class StageTimer:
+    """Agent and tool callbacks that record wall time per (invocation, stage)."""
+
+    def __init__(self):
+        self._started: Dict[tuple, float] = {}
+        self.durations: Dict[str, Dict[str, float]] = {}
+
+    def _start(self, invocation_id: str, stage: str) -> None:
+        self._started[(invocation_id, stage)] = time.perf_counter()
+
+    def _stop(self, invocation_id: str, stage: str) -> None:
+        started = self._started.pop((invocation_id, stage), None)
+        if started is not None:
+            self.durations.setdefault(invocation_id, {})[stage] = time.perf_counter() - started
+
+    def before_agent(self, callback_context):
+        self._start(callback_context.invocation_id, callback_context.agent_name)
+
+    def after_agent(self, callback_context):
+        self._stop(callback_context.invocation_id, callback_context.agent_name)
+
+    def before_tool(self, tool, args, tool_context):
+        self._start(tool_context.invocation_id, tool.name)
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        self._stop(tool_context.invocation_id, tool.name)
+
+
+def _walk(agent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def _chain(existing, callback):
+    if existing is None:
+        return callback
+    return [*existing, callback] if isinstance(existing, list) else [existing, callback]
+
+
+def instrument(agent, timer: StageTimer, make_model: Callable[[LlmAgent], BaseLlm]) -> None:
+    """Swap every LLM for a stub model and attach the stage timer callbacks."""
+    for node in _walk(agent):
+        node.before_agent_callback = _chain(node.before_agent_callback, timer.before_agent)
+        node.after_agent_callback = _chain(node.after_agent_callback, timer.after_agent)
+        if isinstance(node, LlmAgent):
+            node.model = make_model(node)
+            node.before_tool_callback = _chain(node.before_tool_callback, timer.before_tool)
+            node.after_tool_callback = _chain(node.after_tool_callback, timer.after_tool)
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest-rank percentile.
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run_one(runner: InMemoryRunner, index: int) -> str:
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=f"user-{index}")
+    message = types.Content(role="user", parts=[types.Part(text=_trip(index))])
+    invocation_id = ""
+    async for event in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=message):
+        invocation_id = event.invocation_id
+    return invocation_id
+
+
+async def run_level(runner: InMemoryRunner, timer: StageTimer, concurrency: int, requests: int, offset: int, trace_memory: bool) -> dict:
+    """Run `requests` workflows with at most `concurrency` in flight and summarize them."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> str:
+        async with semaphore:
+            return await _run_one(runner, index)
+
+    if trace_memory:
+        tracemalloc.start()
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+
+    invocation_ids = await asyncio.gather(*(bounded(offset + i) for i in range(requests)))
+
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    runs = [timer.durations.pop(invocation_id, {}) for invocation_id in invocation_ids]
+    stages = sorted({stage for run in runs for stage in run})
+    overlap = [
+        (run["flight_search_stage"] + run["hotel_search_stage"]) / run["parallel_search_agent"]
+        for run in runs
+        if {"flight_search_stage", "hotel_search_stage", "parallel_search_agent"} <= run.keys()
+    ]
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(requests / wall, 2),
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "traced_kb_per_inflight_request": round(traced_peak / 1024 / min(concurrency, requests), 1) if traced_peak else None,
+        "branch_overlap": round(sum(overlap) / len(overlap), 2) if overlap else None,
+        "stages": {
+            stage: {
+                f"p{p}": round(_percentile([run[stage] for run in runs if stage in run], p) * 1000, 1)
+                for p in PERCENTILES
+            }
+            for stage in stages
+        },
+    }
+
+
+def _print_level(result: dict) -> None:
+    print(
+        f"\nconcurrency={result['concurrency']} requests={result['requests']} "
+        f"throughput={result['throughput_rps']} req/s cpu={result['cpu_ms_per_request']} ms/req "
+        f"peak_rss={result['peak_rss_mb']} MB branch_overlap={result['branch_overlap']}"
+        + (f" traced={result['traced_kb_per_inflight_request']} KB/in-flight req" if result["traced_kb_per_inflight_request"] else "")
+    )
+    print(f"  {'stage':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, values in sorted(result["stages"].items(), key=lambda item: -item[1]["p50"]):
+        print(f"  {stage:<28}{values['p50']:>10}{values['p95']:>10}{values['p99']:>10}")
+
+
+def _print_decode_stats(stats: dict) -> None:
+    print(f"\nSERP decode ({stats['backend']}, lean={stats['lean']}):")
+    for engine, values in sorted(stats["engines"].items()):
+        print(
+            f"  {engine:<16} calls={values['calls']} body={values['avg_bytes'] / 1024:.1f} KB "
+            f"decode={values['avg_decode_ms']} ms blocks allocated={values['avg_allocated_blocks']} "
+            f"retained={values['avg_retained_blocks']}"
+        )
+
+
+def _print_router_stats(stats: dict) -> None:
+    print("\nModel routing (routers that served calls):")
+    for router, values in sorted(stats.items()):
+        if not any(tier["calls"] for tier in values["tiers"].values()):
+            continue
+        for model, tier in values["tiers"].items():
+            print(
+                f"  {router:<40}{model:<20} state={tier['state']} calls={tier['calls']} "
+                f"errors={tier['errors']} timeouts={tier['timeouts']} routed_around={tier['routed_around']}"
+            )
+
+
+async def main(args) -> List[dict]:
+    fixtures = args.fixtures
+    if fixtures is None:
+        fixtures = os.path.join(_BENCH_DIR, "fixtures")
+        _write_synthetic_fixtures(fixtures)
+
+    timer = StageTimer()
+    stub = StubLlm(latency=args.llm_latency)
+
+    def make_model(node: LlmAgent) -> BaseLlm:
+        if args.degraded_llm_latency is None:
+            return stub
+        degraded = StubLlm(model="benchmark-degraded", latency=args.degraded_llm_latency)
+        return RoutedLlm(name=f"benchmark:{node.name}", tiers=[degraded, stub], slo_seconds=args.llm_slo)
+
+    instrument(root_agent, timer, make_model)
+    runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+
+    results = []
+    with ReplayServer(fixtures, latency_seconds=args.serp_latency, jitter_seconds=args.serp_jitter, seed=args.seed) as server:
+        serp_client.SERP_API_URL = server.url
+        print(
+            f"Replaying {len(server.store)} SERP fixtures at {server.url} "
+            f"(latency {args.serp_latency}s + up to {args.serp_jitter}s jitter); stub LLM latency {args.llm_latency}s"
+            + (f" (primary tier degraded to {args.degraded_llm_latency}s, SLO {args.llm_slo}s)" if args.degraded_llm_latency is not None else "")
+        )
+
+        # One untimed request so imports, connection pools and sessions are warm.
+        await _run_one(runner, -1)
+        timer.durations.clear()
+
+        offset = 0
+        for concurrency in args.concurrency:
+            requests = max(args.min_requests, concurrency * args.rounds)
+            if not args.warm_cache:
+                flight_module.flight_cache.clear()
+                hotel_module.hotel_cache.clear()
+            result = await run_level(runner, timer, concurrency, requests, offset, args.memory)
+            offset += requests
+            results.append(result)
+            _print_level(result)
+
+    _print_decode_stats(get_decode_stats())
+    if args.degraded_llm_latency is not None:
+        _print_router_stats(get_model_router_stats())
+    await serp_client.close_async_client()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the trip planner workflow offline.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100], help="Concurrent sessions per level")
+    parser.add_argument("--rounds", type=int, default=3, help="Requests per level = concurrency x rounds")
+    parser.add_argument("--min-requests", type=int, default=20, help="Lower bound on requests per level")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM seconds per call")
+    parser.add_argument("--degraded-llm-latency", type=float, help="Route each agent between a stub this slow and the normal stub")
+    parser.add_argument("--llm-slo", type=float, default=0.5, help="Router SLO in seconds with --degraded-llm-latency")
+    parser.add_argument("--serp-latency", type=float, default=0.3, help="Replayed SERP base latency in seconds")
+    parser.add_argument("--serp-jitter", type=float, default=0.2, help="Extra uniform SERP latency in seconds")
+    parser.add_argument("--fixtures", help="Recorded fixture directory (default: synthetic fixtures)")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep flight/hotel caches between levels")
+    parser.add_argument("--memory", action="store_true", help="Trace Python heap usage (slows the run)")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for injected SERP latency")
+    parser.add_argument("--json", help="Write results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    level_results = asyncio.run(main(arguments))
+    if arguments.json:
+        with open(arguments.json, "w", encoding="utf-8") as file:
+            json.dump(level_results, file, indent=2)
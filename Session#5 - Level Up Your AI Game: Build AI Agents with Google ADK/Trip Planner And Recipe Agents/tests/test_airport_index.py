@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+
+import agents.airport_index as airport_index
+from agents.airport_index import canonical_city, resolve_airport_code
+from agents.trip_params import parse_trip_request
+
+
+@pytest.mark.parametrize("place", ["Bali", "Manali", "Darjeeling", "Delhi", "Bombay", "Baga Beach, Goa"])
+def test_hotel_city_keeps_the_place_the_user_named(place):
+    assert canonical_city(place) == place
+
+
+@pytest.mark.parametrize("value, city", [("BOM", "Mumbai"), ("DPS", "Denpasar"), ("mumbai", "Mumbai"), (" Goa ", "Goa")])
+def test_hotel_city_normalizes_codes_and_exact_city_names(value, city):
+    assert canonical_city(value) == city
+
+
+@pytest.mark.parametrize("place, code", [("Bali", "DPS"), ("Manali", "KUU"), ("Delhi", "DEL"), ("Bombay", "BOM")])
+def test_aliases_still_resolve_flight_codes(place, code):
+    assert resolve_airport_code(place) == (code, None)
+
+
+def test_trip_params_city_is_the_destination_as_written():
+    trip = parse_trip_request("Plan a trip from Delhi to Manali from 2030-05-01 to 2030-05-05", today=date(2030, 1, 1))
+    assert (trip["departure_id"], trip["arrival_id"], trip["city"]) == ("DEL", "KUU", "Manali")
+
+
+def test_trip_params_city_from_a_bare_code():
+    trip = parse_trip_request("Trip from DEL to BOM from 2030-05-01 to 2030-05-04", today=date(2030, 1, 1))
+    assert (trip["arrival_id"], trip["city"]) == ("BOM", "Mumbai")
+
+
+@pytest.mark.parametrize("code", ["AUS", "MSP", "PDX", "SAN", "DEL"])
+def test_codes_pass_through_unchanged(code):
+    assert resolve_airport_code(code) == (code, None)
+
+
+@pytest.mark.parametrize("value", ["NYC", "nyc", "New York", "new york"])
+def test_multi_airport_city_resolves_to_its_metro_code(value):
+    assert resolve_airport_code(value) == ("NYC", None)
+
+
+def test_named_airport_is_not_widened_to_its_metro_code():
+    assert resolve_airport_code("London") == ("LON", None)
+    assert resolve_airport_code("Heathrow") == ("LHR", None)
+
+
+def test_code_that_names_an_indexed_place_resolves_to_it():
+    assert resolve_airport_code("GOA") == ("GOI", None)
+
+
+def test_strict_codes_reject_codes_missing_from_the_index(monkeypatch):
+    monkeypatch.setattr(airport_index, "STRICT_CODES", True)
+    resolve_airport_code.cache_clear()
+    try:
+        code, error = resolve_airport_code("AUS")
+        assert code is None and "Unknown airport or city 'AUS'" in error
+        assert resolve_airport_code("NYC") == ("NYC", None)
+    finally:
+        resolve_airport_code.cache_clear()
+
+
+def test_trip_params_keep_unindexed_and_metro_codes():
+    trip = parse_trip_request("Trip from New York to AUS from 2030-05-01 to 2030-05-05", today=date(2030, 1, 1))
+    assert (trip["departure_id"], trip["arrival_id"], trip["city"]) == ("NYC", "AUS", None)
@@ -0,0 +1,119 @@
+import pytest
+
+from agents import cache
+from agents.cache import DiskCache, TTLCache
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(cache, "time", fake_clock)
+    return fake_clock
+
+
+def test_fresh_entry_is_returned_until_its_ttl(clock):
+    ttl_cache = TTLCache(ttl_seconds=60)
+    ttl_cache.set("DEL-GOI", ["flight"])
+
+    clock.advance(59)
+    assert ttl_cache.get("DEL-GOI") == ["flight"]
+
+    clock.advance(1)
+    assert ttl_cache.get("DEL-GOI") is None
+    assert ttl_cache.stats()["expirations"] == 1
+
+
+def test_expired_entry_is_served_stale_within_stale_seconds(clock):
+    ttl_cache = TTLCache(ttl_seconds=60, stale_seconds=300)
+    ttl_cache.set("DEL-GOI", ["flight"])
+
+    clock.advance(120)
+    assert ttl_cache.get("DEL-GOI") is None
+    assert ttl_cache.get_stale("DEL-GOI") == ["flight"]
+    assert ttl_cache.stats()["stale_hits"] == 1
+
+
+def test_entry_past_stale_seconds_is_dropped(clock):
+    ttl_cache = TTLCache(ttl_seconds=60, stale_seconds=300)
+    ttl_cache.set("DEL-GOI", ["flight"])
+
+    clock.advance(360)
+    assert ttl_cache.get_stale("DEL-GOI") is None
+    assert ttl_cache.stats()["size"] == 0
+
+
+def test_without_stale_seconds_expired_entries_are_dropped_on_lookup(clock):
+    ttl_cache = TTLCache(ttl_seconds=60)
+    ttl_cache.set("DEL-GOI", ["flight"])
+
+    clock.advance(61)
+    assert ttl_cache.get("DEL-GOI") is None
+    assert ttl_cache.get_stale("DEL-GOI") is None
+    assert ttl_cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(max_size=2, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert (ttl_cache.get("a"), ttl_cache.get("c")) == (1, 3)
+    assert ttl_cache.stats()["evictions"] == 1
+
+
+def test_set_refreshes_the_ttl(clock):
+    ttl_cache = TTLCache(ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    clock.advance(50)
+    ttl_cache.set("a", 2)
+    clock.advance(50)
+
+    assert ttl_cache.get("a") == 2
+
+
+@pytest.fixture
+def disk_cache(clock, tmp_path):
+    return DiskCache(str(tmp_path / "cache.sqlite3"), fresh_seconds=60, stale_seconds=600, max_bytes=10_000)
+
+
+def test_disk_entry_is_fresh_then_stale_then_gone(clock, disk_cache):
+    disk_cache.set(("goa", "2030-05-01"), [{"name": "Beach Resort"}])
+
+    clock.advance(30)
+    assert disk_cache.get(("goa", "2030-05-01")) == ([{"name": "Beach Resort"}], False)
+
+    clock.advance(60)
+    assert disk_cache.get(("goa", "2030-05-01")) == ([{"name": "Beach Resort"}], True)
+
+    clock.advance(600)
+    assert disk_cache.get(("goa", "2030-05-01")) is None
+    stats = disk_cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"], stats["entries"]) == (1, 1, 1, 0)
+
+
+def test_disk_entries_survive_a_new_connection(clock, disk_cache):
+    disk_cache.set("goa", [1, 2, 3])
+
+    reopened = DiskCache(str(disk_cache.path), fresh_seconds=60, stale_seconds=600)
+
+    assert reopened.get("goa") == ([1, 2, 3], False)
+
+
+def test_disk_eviction_drops_least_recently_read_entries_first(clock, tmp_path):
+    payload = "x" * 400
+    disk_cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    disk_cache.set("a", payload)
+    clock.advance(1)
+    disk_cache.set("b", payload)
+    clock.advance(1)
+    disk_cache.get("a")
+    clock.advance(1)
+
+    disk_cache.set("c", payload)
+
+    assert disk_cache.get("b") is None
+    assert disk_cache.get("a") is not None and disk_cache.get("c") is not None
+    assert disk_cache.stats()["evictions"] == 1
+    assert disk_cache.stats()["bytes"] <= 1000
@@ -0,0 +1,102 @@
+import pytest
+
+from agents import circuit_breaker
+from agents.circuit_breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitBreaker
+
+
+@pytest.fixture
+def breaker(fake_clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "time", fake_clock)
+    return CircuitBreaker("google_flights", failure_threshold=3, recovery_seconds=30)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened_count"] == 1
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(breaker, fake_clock):
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.retry_in() == 30
+    fake_clock.advance(30)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(breaker, fake_clock):
+    for _ in range(3):
+        breaker.record_failure()
+    fake_clock.advance(30)
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 30
+    assert breaker.stats()["opened_count"] == 2
+
+
+def test_release_returns_the_probe_slot(breaker, fake_clock):
+    for _ in range(3):
+        breaker.record_failure()
+    fake_clock.advance(30)
+    assert breaker.allow()
+    breaker.release()  # e.g. the probe was cancelled
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_late_success_from_before_the_trip_keeps_the_breaker_open(breaker):
+    slow_call = breaker.admit()
+    for _ in range(3):
+        breaker.record_failure(breaker.admit())
+
+    breaker.record_success(slow_call)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_late_outcomes_do_not_decide_the_half_open_probe(breaker, fake_clock):
+    slow_call = breaker.admit()
+    for _ in range(3):
+        breaker.record_failure()
+    fake_clock.advance(30)
+    probe = breaker.admit()
+    assert probe is not None and probe != slow_call
+
+    breaker.record_failure(slow_call)
+    breaker.release(slow_call)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # the probe still holds the only slot
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+
+
+def test_registry_shares_one_breaker_per_name():
+    registry = BreakerRegistry(failure_threshold=1)
+    assert registry.get("google_hotels") is registry.get("google_hotels")
+    registry.get("google_hotels").record_failure()
+    assert registry.stats()["google_hotels"]["state"] == OPEN
+    assert registry.get("google_flights").state == CLOSED
@@ -0,0 +1,79 @@
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+flight_module = importlib.import_module("agents.flight_agent")
+
+LIMIT = 3
+OUTBOUND_PRICES = {
+    "2030-05-01": 6000, "2030-05-02": 5000, "2030-05-03": 5500, "2030-05-04": 5200, "2030-05-05": "Price unavailable",
+}
+RETURN_PRICES = {
+    "2030-05-03": 3000, "2030-05-04": 4000, "2030-05-05": 2500, "2030-05-06": 4500, "2030-05-07": 3900,
+}
+
+
+@pytest.fixture
+def serp(monkeypatch):
+    """Stub serp_get_async with priced responses per (route, date), tracking calls in flight."""
+    monkeypatch.setenv("SERP_API_KEY", "test-key")
+    monkeypatch.setattr(flight_module, "FLEX_CONCURRENCY", LIMIT)
+    flight_module.flight_cache.clear()
+    calls = SimpleNamespace(searched=[], in_flight=0, max_in_flight=0)
+
+    async def serp_get_async(params, timeout=30, hedge=None):
+        calls.searched.append((params["departure_id"], params["outbound_date"]))
+        calls.in_flight += 1
+        calls.max_in_flight = max(calls.max_in_flight, calls.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            calls.in_flight -= 1
+        prices = OUTBOUND_PRICES if params["departure_id"] == "DEL" else RETURN_PRICES
+        body = {"best_flights": [{"price": prices[params["outbound_date"]], "flights": []}]}
+        return SimpleNamespace(content=json.dumps(body).encode(), raise_for_status=lambda: None)
+
+    monkeypatch.setattr(flight_module, "serp_get_async", serp_get_async)
+    yield calls
+    flight_module.flight_cache.clear()
+
+
+def test_round_trip_matrix_picks_the_cheapest_cell(serp):
+    result = asyncio.run(flight_module.search_flights_flexible("DEL", "GOI", "2030-05-03", "2030-05-05", flex_days=2))
+
+    assert result["status"] == "success"
+    assert result["outbound_dates"] == list(OUTBOUND_PRICES)
+    assert result["return_dates"] == list(RETURN_PRICES)
+    matrix = result["price_matrix"]
+    assert [len(row) for row in matrix] == [5] * 5
+    assert matrix[0] == [9000, 10000, 8500, 10500, 9900]
+    assert matrix[3] == [None, None, 7700, 9700, 9100]  # no return on or before the 05-04 departure
+    assert matrix[4] == [None] * 5  # unpriced outbound date
+    assert result["best"][0] == {
+        "outbound_date": "2030-05-02", "return_date": "2030-05-05",
+        "total_price": 7500, "outbound_price": 5000, "return_price": 2500,
+    }
+    assert [option["total_price"] for option in result["best"]] == [7500, 7700, 8000]
+
+
+def test_fan_out_searches_each_date_once_within_the_concurrency_limit(serp):
+    asyncio.run(flight_module.search_flights_flexible("DEL", "GOI", "2030-05-03", "2030-05-05", flex_days=2))
+
+    assert sorted(serp.searched) == sorted(
+        [("DEL", d) for d in OUTBOUND_PRICES] + [("GOI", d) for d in RETURN_PRICES]
+    )
+    assert serp.max_in_flight == LIMIT
+
+
+def test_one_way_returns_the_cheapest_dates(serp):
+    result = asyncio.run(flight_module.search_flights_flexible("DEL", "GOI", "2030-05-03", flex_days=2, top_n=2))
+
+    assert result["cheapest_by_date"]["2030-05-05"] is None
+    assert result["best"] == [
+        {"outbound_date": "2030-05-02", "total_price": 5000},
+        {"outbound_date": "2030-05-04", "total_price": 5200},
+    ]
+    assert serp.max_in_flight <= LIMIT
@@ -0,0 +1,65 @@
+import pytest
+
+from agents.flight_ranking import DEFAULT_WEIGHTS, dedupe_options, pareto_frontier, rank_flight_options
+from agents.flight_results import FlightLeg, FlightOption
+
+
+def option(price, duration, stops=0, number="6E 100", departs="2030-05-01 06:00"):
+    leg = FlightLeg("IndiGo", "Delhi", "DEL", departs, "Goa", "GOI", "2030-05-01 08:30", duration, number)
+    return FlightOption(price=price, legs=[leg], total_duration=duration, stops=stops)
+
+
+def test_duplicate_itineraries_collapse_to_the_cheapest_fare():
+    pricey, cheap, other = option(6000, 150), option(5000, 150), option(5500, 150, number="AI 200")
+
+    assert dedupe_options([pricey, cheap, other]) == [cheap, other]
+
+
+def test_options_without_legs_are_kept():
+    bare = FlightOption(price=4000)
+
+    assert dedupe_options([bare, FlightOption(price=4000)]) == [bare, FlightOption(price=4000)]
+
+
+def test_dominated_options_stay_off_the_frontier():
+    options = [
+        option(5000, 150, number="A"),           # cheapest
+        option(7000, 120, number="B"),           # fastest
+        option(7500, 160, number="C"),           # dominated by A
+        option(6000, 150, 1, number="D"),        # dominated by A
+        option(5000, 150, number="E"),           # identical values to A: only the first is kept
+    ]
+
+    assert pareto_frontier(options) == [0, 1]
+
+
+def test_frontier_comes_first_then_weighted_cost():
+    cheap, fast = option(5000, 300, number="A"), option(9000, 100, number="B")
+    dominated = option(9500, 310, 1, number="C")
+
+    assert rank_flight_options([dominated, fast, cheap]) == [cheap, fast, dominated]
+    assert rank_flight_options([dominated, fast, cheap], {"price": 0, "duration": 1}) == [fast, cheap, dominated]
+    assert rank_flight_options([dominated, fast, cheap], limit=1) == [cheap]
+
+
+def test_unpriced_options_rank_after_priced_ones():
+    unpriced, priced = option(None, 100, number="A"), option(8000, 200, number="B")
+
+    ranked = rank_flight_options([unpriced, priced])
+
+    assert ranked[0] is priced
+    assert dedupe_options([option(None, 100), option(7000, 100)])[0].price == 7000
+
+
+def test_missing_weight_keys_keep_their_defaults():
+    options = [option(5000, 400, number="A"), option(5100, 100, number="B"), option(4800, 410, 2, number="C")]
+
+    partial = rank_flight_options(options, {"price": DEFAULT_WEIGHTS["price"]})
+
+    assert partial == rank_flight_options(options)
+    assert partial != rank_flight_options(options, {"price": 0.6, "duration": 0, "stops": 0})
+
+
+def test_negative_weights_are_rejected():
+    with pytest.raises(ValueError):
+        rank_flight_options([option(5000, 150)], {"price": -1})
@@ -0,0 +1,46 @@
+from agents.hedging import HedgeBudget, LatencyTracker
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=5)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        tracker.record("google_flights", seconds)
+    assert tracker.percentile("google_flights", 95) is None
+    tracker.record("google_flights", 0.5)
+    assert tracker.percentile("google_flights", 95) == 0.5
+    assert tracker.percentile("google_flights", 50) == 0.3
+    assert tracker.percentile("google_hotels", 50) is None
+
+
+def test_window_keeps_only_recent_samples():
+    tracker = LatencyTracker(window=3, min_samples=1)
+    for seconds in (9.0, 9.0, 0.1, 0.2, 0.3):
+        tracker.record("google_hotels", seconds)
+    assert tracker.percentile("google_hotels", 100) == 0.3
+    assert tracker.stats()["google_hotels"]["samples"] == 3
+
+
+def test_budget_limits_hedges_to_the_ratio():
+    budget = HedgeBudget(ratio=0.1, max_credit=5)
+    assert budget.try_spend()  # one hedge available from the start
+    assert not budget.try_spend()
+
+    for _ in range(10):
+        budget.earn()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    stats = budget.stats()
+    assert (stats["hedges_sent"], stats["hedges_denied"]) == (2, 2)
+
+
+def test_budget_credit_is_capped():
+    budget = HedgeBudget(ratio=1, max_credit=2)
+    for _ in range(10):
+        budget.earn()
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_zero_ratio_never_hedges():
+    budget = HedgeBudget(ratio=0)
+    budget.earn()
+    assert not budget.try_spend()
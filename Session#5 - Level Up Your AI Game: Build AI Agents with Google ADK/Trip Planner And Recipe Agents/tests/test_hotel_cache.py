@@ -0,0 +1,63 @@
+import asyncio
+import importlib
+
+import pytest
+
+from agents import cache
+from agents.cache import DiskCache
+
+hotel_module = importlib.import_module("agents.hotel_agent")
+
+ARGS = ("Goa", "2030-05-01", "2030-05-05", "key", 2, 1)
+KEY = hotel_module._hotel_cache_key("Goa", "2030-05-01", "2030-05-05", 2, 1)
+
+
+@pytest.fixture
+def hotel_cache(fake_clock, monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "time", fake_clock)
+    disk_cache = DiskCache(str(tmp_path / "hotels.sqlite3"), fresh_seconds=60, stale_seconds=600)
+    monkeypatch.setattr(hotel_module, "hotel_cache", disk_cache)
+    return disk_cache
+
+
+def test_stale_entry_is_served_then_refreshed_in_the_background(fake_clock, hotel_cache, monkeypatch):
+    fetched = []
+
+    async def fetch(city, check_in_date, check_out_date, api_key, adults, rooms):
+        fetched.append(city)
+        return [{"name": "New Resort"}], None
+
+    monkeypatch.setattr(hotel_module, "_fetch_hotels_async", fetch)
+    hotel_cache.set(KEY, [{"name": "Old Resort"}])
+    fake_clock.advance(120)
+
+    async def run():
+        served = await hotel_module._cached_fetch_hotels_async(*ARGS)
+        await asyncio.gather(*hotel_module._refresh_tasks)
+        return served
+
+    assert asyncio.run(run()) == ([{"name": "Old Resort"}], None)
+    assert fetched == ["Goa"]
+    assert hotel_cache.get(KEY) == ([{"name": "New Resort"}], False)
+
+
+def test_fresh_entry_is_served_without_a_search(hotel_cache, monkeypatch):
+    async def fetch(*args):
+        raise AssertionError("searched despite a fresh cache entry")
+
+    monkeypatch.setattr(hotel_module, "_fetch_hotels_async", fetch)
+    hotel_cache.set(KEY, [{"name": "Old Resort"}])
+
+    assert asyncio.run(hotel_module._cached_fetch_hotels_async(*ARGS)) == ([{"name": "Old Resort"}], None)
+
+
+def test_cache_write_failure_is_logged_not_raised(monkeypatch, caplog):
+    class BrokenCache:
+        def set(self, key, value):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(hotel_module, "hotel_cache", BrokenCache())
+
+    hotel_module._cache_set(KEY, [])
+
+    assert "Hotel cache write failed" in caplog.text and "disk full" in caplog.text
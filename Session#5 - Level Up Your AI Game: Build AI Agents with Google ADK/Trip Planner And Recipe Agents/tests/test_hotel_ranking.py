@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from agents.hotel_ranking import HotelTable, rank_hotels
+
+
+def hotel(name, price=None, rating=None, reviews=None, amenities=(), stars=None):
+    data = {"name": name, "amenities": list(amenities)}
+    if price is not None:
+        data["rate_per_night"] = {"extracted_lowest": price}
+    if rating is not None:
+        data["overall_rating"] = rating
+    if reviews is not None:
+        data["reviews"] = reviews
+    if stars is not None:
+        data["extracted_hotel_class"] = stars
+    return data
+
+
+HOTELS = [
+    hotel("Beach Resort", 8000, 4.6, 2000, ["Outdoor pool", "Free Wi-Fi", "Spa"], 5),
+    hotel("City Inn", 3000, 4.1, 500, ["Free Wi-Fi", "Breakfast"], 3),
+    hotel("Pool Villa", 12000, 4.8, 150, ["Private pool"], 4),
+    hotel("No Price Lodge", None, 4.0, 80, ["Free Wi-Fi"]),
+]
+
+
+def names(hotels):
+    return [hotel["name"] for hotel in hotels]
+
+
+def test_amenity_terms_match_substrings_and_must_all_match():
+    assert names(rank_hotels(HOTELS, "relevance", amenities=["pool"])) == ["Beach Resort", "Pool Villa"]
+    assert names(rank_hotels(HOTELS, "relevance", amenities=["pool", "wi-fi"])) == ["Beach Resort"]
+    assert rank_hotels(HOTELS, "relevance", amenities=["sauna"]) == []
+
+
+def test_amenities_given_as_a_string_are_one_term():
+    hotels = [hotel("Fitness Hotel", amenities=["Gym"]), hotel("Wellness Hotel", amenities=["Yoga", "Massage"])]
+
+    # Character by character, "gym" would also match "Yoga" + "Massage" (g, y and m each appear).
+    assert names(rank_hotels(hotels, "relevance", amenities="gym")) == ["Fitness Hotel"]
+    assert names(rank_hotels(HOTELS, "relevance", amenities="pool")) == ["Beach Resort", "Pool Villa"]
+
+
+def test_amenity_bitmask_per_property():
+    table = HotelTable(HOTELS)
+
+    wifi = table._amenity_mask("wi-fi")
+    assert [bool(bits & wifi) for bits in table.amenities] == [True, True, False, True]
+    assert table._amenity_mask("nothing like this") == 0
+
+
+def test_bounds_exclude_missing_values():
+    table = HotelTable(HOTELS)
+
+    assert table.filter(max_price=9000) == [0, 1]
+    assert table.filter(min_rating=4.5, min_class=5) == [0]
+    assert table.filter() == [0, 1, 2, 3]
+
+
+def test_rating_is_shrunk_towards_the_mean_by_review_count():
+    table = HotelTable([
+        hotel("Few reviews", 5000, 5.0, 3),
+        hotel("Many reviews", 5000, 4.6, 2000),
+        hotel("Average", 5000, 3.0, 500),
+    ])
+
+    ranked = table.rank(table.filter(), "score", weights={"rating": 1})
+
+    assert ranked[0] == 1
+
+
+def test_price_sort_puts_unpriced_last():
+    assert names(rank_hotels(HOTELS, "price")) == ["City Inn", "Beach Resort", "Pool Villa", "No Price Lodge"]
+
+
+def test_unknown_sort_key_is_rejected():
+    with pytest.raises(ValueError):
+        rank_hotels(HOTELS, "stars")
+
+
+@pytest.mark.parametrize("sort_by", ["score", "price", "rating", "reviews"])
+def test_heap_top_k_matches_a_full_sort(sort_by):
+    rng = random.Random(7)
+    hotels = [
+        hotel(
+            f"Hotel {i}",
+            rng.choice([None, rng.randrange(1500, 20000, 500)]),
+            rng.choice([None, round(rng.uniform(3, 5), 1)]),
+            rng.choice([None, rng.randrange(0, 3000, 10)]),
+        )
+        for i in range(300)
+    ]
+
+    full = rank_hotels(hotels, sort_by)
+
+    for limit in (1, 5, 50):
+        assert rank_hotels(hotels, sort_by, limit=limit) == full[:limit]
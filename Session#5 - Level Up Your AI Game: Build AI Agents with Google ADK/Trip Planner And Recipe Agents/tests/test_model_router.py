@@ -0,0 +1,59 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+import agents.model_router as model_router
+
+
+class EchoLlm(BaseLlm):
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.model)]))
+
+
+def _recording_build_model(monkeypatch):
+    built = []
+
+    def build_model(name, agent_name=""):
+        built.append((name, agent_name))
+        return EchoLlm(model=name)
+
+    monkeypatch.setattr(model_router, "build_model", build_model)
+    return built
+
+
+def _generate(llm):
+    async def run():
+        return [response async for response in llm.generate_content_async(LlmRequest(), stream=False)]
+
+    return asyncio.run(run())
+
+
+def test_routed_model_builds_no_client_until_first_call(monkeypatch):
+    built = _recording_build_model(monkeypatch)
+
+    llm = model_router.routed_model("lazy_agent", "primary-model, fallback-model", slo_seconds=5)
+
+    assert [tier.model for tier in llm.tiers] == ["primary-model", "fallback-model"]
+    assert built == []
+
+    responses = _generate(llm)
+
+    assert responses[0].content.parts[0].text == "primary-model"
+    assert built == [("primary-model", "lazy_agent")]
+
+
+def test_lazy_llm_reuses_its_client(monkeypatch):
+    built = _recording_build_model(monkeypatch)
+    llm = model_router.LazyLlm(model="only-model", agent_name="lazy_agent")
+
+    _generate(llm)
+    _generate(llm)
+
+    assert built == [("only-model", "lazy_agent")]
+    assert llm.delegate is llm.delegate
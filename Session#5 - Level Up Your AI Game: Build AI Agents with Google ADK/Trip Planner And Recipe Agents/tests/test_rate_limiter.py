@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from agents import rate_limiter
+from agents.rate_limiter import TokenBucket, backoff_delay, retry_after_seconds
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "time", fake_clock)
+    return fake_clock
+
+
+def test_burst_is_free_then_waits_are_spaced_at_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # Borrowed tokens: waiters are released in arrival order, 1/rate apart.
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+    assert bucket.waits == 3
+    assert bucket.waited_seconds == pytest.approx(3.0)
+
+
+def test_tokens_refill_over_time_up_to_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.reserve()
+    clock.advance(1)  # two tokens back
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.5]
+
+    clock.advance(60)  # refill is capped at burst
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_drain_drops_saved_burst(clock):
+    bucket = TokenBucket(rate=1, burst=5)
+    bucket.drain()
+    assert bucket.reserve() == 1.0
+
+
+def test_zero_rate_disables_limiting(clock):
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+def test_acquire_async_sleeps_for_the_reserved_wait(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=4, burst=1)
+
+    async def main():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(main())
+    assert slept == [0.25]
+
+
+def test_backoff_delay_is_jittered_within_the_cap():
+    for attempt in range(8):
+        delay = backoff_delay(attempt, base=0.5, cap=8)
+        assert 0 <= delay <= min(8, 0.5 * 2 ** attempt)
+
+
+def test_retry_after_seconds_and_http_date(clock):
+    assert retry_after_seconds({"Retry-After": "3"}, cap=8) == 3
+    assert retry_after_seconds({"Retry-After": "120"}, cap=8) == 8
+    assert retry_after_seconds({}, cap=8) is None
+    assert retry_after_seconds({"Retry-After": "soon"}, cap=8) is None
+    clock.now = 784111777 - 2  # 2s before the date below
+    assert retry_after_seconds({"Retry-After": "Sun, 06 Nov 1994 08:49:37 GMT"}, cap=8) == pytest.approx(2)
@@ -0,0 +1,76 @@
+import asyncio
+import importlib
+import threading
+import time
+
+flight_module = importlib.import_module("agents.flight_agent")
+
+OUTBOUND = [{"price": 4500}]
+DEADLINE = 0.2
+
+
+def test_round_trip_returns_the_fast_leg_at_the_deadline(monkeypatch):
+    release = threading.Event()
+
+    def fetch(departure_id, arrival_id, travel_date, api_key, timeout, force_refresh):
+        if travel_date == "2030-05-05":
+            release.wait(5)
+            return [{"price": 1}], None
+        return OUTBOUND, None
+
+    monkeypatch.setattr(flight_module, "_cached_fetch_one_way_flights", fetch)
+    started = time.monotonic()
+    try:
+        outbound, inbound = flight_module._fetch_round_trip_flights(
+            "DEL", "GOI", "2030-05-01", "2030-05-05", "key", deadline=DEADLINE
+        )
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 1
+    assert outbound == (OUTBOUND, None)
+    assert inbound == (None, f"Search timed out after {DEADLINE:g}s")
+
+
+def test_round_trip_reports_a_failing_leg_instead_of_raising(monkeypatch):
+    def fetch(departure_id, arrival_id, travel_date, api_key, timeout, force_refresh):
+        if travel_date == "2030-05-05":
+            raise RuntimeError("boom")
+        return OUTBOUND, None
+
+    monkeypatch.setattr(flight_module, "_cached_fetch_one_way_flights", fetch)
+
+    outbound, inbound = flight_module._fetch_round_trip_flights("DEL", "GOI", "2030-05-01", "2030-05-05", "key")
+
+    assert outbound == (OUTBOUND, None)
+    assert inbound == (None, "Error searching flights: boom")
+
+
+def test_async_round_trip_returns_the_fast_leg_and_cancels_the_slow_one(monkeypatch):
+    cancelled = []
+
+    async def fetch(departure_id, arrival_id, travel_date, api_key, timeout, force_refresh):
+        if travel_date == "2030-05-05":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(travel_date)
+                raise
+        return OUTBOUND, None
+
+    monkeypatch.setattr(flight_module, "_cached_fetch_one_way_flights_async", fetch)
+
+    async def run():
+        started = time.monotonic()
+        legs = await flight_module._fetch_round_trip_flights_async(
+            "DEL", "GOI", "2030-05-01", "2030-05-05", "key", deadline=DEADLINE
+        )
+        await asyncio.sleep(0)
+        return time.monotonic() - started, legs
+
+    elapsed, (outbound, inbound) = asyncio.run(run())
+
+    assert elapsed < 1
+    assert outbound == (OUTBOUND, None)
+    assert inbound == (None, f"Search timed out after {DEADLINE:g}s")
+    assert cancelled == ["2030-05-05"]
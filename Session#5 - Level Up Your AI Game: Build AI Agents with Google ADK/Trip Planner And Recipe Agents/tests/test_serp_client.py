@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents import serp_client
+from agents.circuit_breaker import OPEN
+
+
+async def _pool():
+    return serp_client._async_pool()
+
+
+def test_async_pool_is_reused_within_a_loop():
+    async def main():
+        first, second = await _pool(), await _pool()
+        await serp_client.close_async_client()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert first.client.is_closed
+
+
+def test_each_loop_keeps_its_own_client_and_semaphore():
+    loop = asyncio.new_event_loop()
+    try:
+        pool = loop.run_until_complete(_pool())
+
+        async def other_loop():
+            other = await _pool()
+            await serp_client.close_async_client()
+            return other
+
+        other = asyncio.run(other_loop())
+        assert other.client is not pool.client
+        assert other.concurrency is not pool.concurrency
+        # The first loop is still running work: its client is neither replaced nor closed.
+        assert loop.run_until_complete(_pool()) is pool
+        assert not pool.client.is_closed
+    finally:
+        loop.run_until_complete(serp_client.close_async_client())
+        loop.close()
+    assert pool.client.is_closed
+    assert loop not in serp_client._async_pools
+
+
+def _hanging_attempts(monkeypatch, hedge_delay):
+    """Stub the SERP attempt with one that never answers and records how it ended."""
+    attempts = []
+
+    async def hang(params, timeout):
+        attempts.append("started")
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            attempts.append("cancelled")
+            raise
+
+    monkeypatch.setattr(serp_client, "_serp_get_once_async", hang)
+    monkeypatch.setattr(serp_client, "_hedge_delay", lambda engine: hedge_delay)
+    monkeypatch.setattr(serp_client, "serp_hedge_budget", serp_client.HedgeBudget(ratio=1))
+    return attempts
+
+
+def _cancel_caller_after(seconds, attempts):
+    """Give up on a hedged call after seconds; return the attempts as seen before the loop shuts down."""
+    async def main():
+        call = serp_client._serp_get_hedged_async({"engine": "google_flights"}, 30, True)
+        try:
+            await asyncio.wait_for(call, seconds)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0.01)
+        # asyncio.run cancels leftover tasks on exit, so look before it does.
+        return list(attempts)
+
+    return asyncio.run(main())
+
+
+def test_cancelled_caller_cancels_the_primary_before_hedging(monkeypatch):
+    attempts = _hanging_attempts(monkeypatch, hedge_delay=10)
+
+    assert _cancel_caller_after(0.05, attempts) == ["started", "cancelled"]
+
+
+def test_cancelled_caller_cancels_primary_and_hedge(monkeypatch):
+    attempts = _hanging_attempts(monkeypatch, hedge_delay=0.01)
+
+    assert _cancel_caller_after(0.1, attempts) == ["started", "started", "cancelled", "cancelled"]
+
+
+def test_success_admitted_before_the_breaker_tripped_does_not_close_it(monkeypatch):
+    registry = serp_client.BreakerRegistry(failure_threshold=1)
+    monkeypatch.setattr(serp_client, "serp_breakers", registry)
+
+    def slow_search(params, timeout, hedge):
+        # Other calls fail while this one is in flight and trip the breaker.
+        registry.get("google_flights").record_failure()
+        return SimpleNamespace(status_code=200)
+
+    monkeypatch.setattr(serp_client, "_serp_get_hedged", slow_search)
+
+    assert serp_client.serp_get({"engine": "google_flights"}).status_code == 200
+    assert registry.get("google_flights").state == OPEN
@@ -0,0 +1,162 @@
+import importlib
+import json
+
+import pytest
+
+from agents import serp_decode
+from agents.flight_results import parse_flight_options
+from agents.hotel_ranking import rank_hotels
+from agents.serp_decode import FLIGHT_PROJECTION, HOTEL_PROJECTION, compile_projection, decode_serp
+
+flight_module = importlib.import_module("agents.flight_agent")
+hotel_module = importlib.import_module("agents.hotel_agent")
+
+
+def airport(code, name, time):
+    return {"id": code, "name": name, "time": time}
+
+
+def flight_option(price, airline, number, departs, arrives, duration, layovers=None):
+    leg = {
+        "airline": airline,
+        "airline_logo": "https://example.com/logo.png",
+        "flight_number": number,
+        "duration": duration,
+        "departure_airport": airport("DEL", "Indira Gandhi International Airport", departs),
+        "arrival_airport": airport("GOI", "Dabolim Airport", arrives),
+        "airplane": "Airbus A320neo",
+        "travel_class": "Economy",
+        "legroom": "29 in",
+        "extensions": ["Average legroom (29 in)", "In-seat USB outlet"],
+    }
+    return {
+        "flights": [leg],
+        "layovers": layovers or [],
+        "total_duration": duration,
+        "carbon_emissions": {"this_flight": 120000, "typical_for_this_route": 130000},
+        "price": price,
+        "type": "Round trip",
+        "airline_logo": "https://example.com/logo.png",
+        "extensions": ["Checked baggage for a fee"],
+        "booking_token": "WyJDalJJ" * 20,
+    }
+
+
+FLIGHT_RESPONSE = {
+    "search_metadata": {"id": "abc", "status": "Success", "raw_html_file": "https://example.com/raw.html"},
+    "search_parameters": {"engine": "google_flights", "departure_id": "DEL", "arrival_id": "GOI"},
+    "best_flights": [
+        flight_option(5200, "IndiGo", "6E 521", "2030-05-01 06:00", "2030-05-01 08:35", 155),
+        flight_option(6100, "Air India", "AI 881", "2030-05-01 09:10", "2030-05-01 11:40", 150),
+    ],
+    "other_flights": [
+        flight_option(4800, "SpiceJet", "SG 115", "2030-05-01 22:00", "2030-05-02 04:10", 370,
+                      [{"duration": 120, "name": "Mumbai", "id": "BOM"}]),
+        flight_option("Price unavailable", "Akasa Air", "QP 1331", "2030-05-01 13:00", "2030-05-01 15:30", 150),
+    ],
+    "price_insights": {"lowest_price": 4800, "price_history": [[1714000000, 5100]] * 60},
+}
+
+HOTEL_RESPONSE = {
+    "search_metadata": {"id": "def", "status": "Success"},
+    "properties": [
+        {
+            "type": "hotel",
+            "name": "Sea Breeze Resort",
+            "description": "Beachfront resort with an outdoor pool.",
+            "link": "https://example.com/sea-breeze",
+            "gps_coordinates": {"latitude": 15.55, "longitude": 73.75},
+            "check_in_time": "2:00 PM",
+            "rate_per_night": {"lowest": "₹6,200", "extracted_lowest": 6200},
+            "total_rate": {"lowest": "₹24,800", "extracted_lowest": 24800},
+            "nearby_places": [{"name": "Calangute Beach", "transportations": [{"type": "Walking", "duration": "5 min"}]}],
+            "hotel_class": "4-star hotel",
+            "extracted_hotel_class": 4,
+            "images": [{"thumbnail": "https://example.com/t.jpg", "original_image": "https://example.com/o.jpg"}] * 8,
+            "overall_rating": 4.4,
+            "reviews": 1830,
+            "ratings": [{"stars": 5, "count": 1100}],
+            "amenities": ["Free Wi-Fi", "Outdoor pool", "Spa", "Fitness centre"],
+            "property_token": "ChcI" * 10,
+        },
+        {
+            "type": "hotel",
+            "name": "Old Quarter Inn",
+            "link": "https://example.com/old-quarter",
+            "gps_coordinates": {"latitude": 15.49, "longitude": 73.82},
+            "rate_per_night": {"lowest": "₹3,100", "extracted_lowest": 3100},
+            "overall_rating": 4.1,
+            "reviews": 240,
+            "amenities": ["Free Wi-Fi", "Breakfast"],
+            "neighborhood": "Fontainhas",
+        },
+        {"type": "hotel", "name": "Unrated Stay", "images": [], "description": "New listing."},
+    ],
+    "serpapi_pagination": {"next_page_token": "CBI="},
+}
+
+
+def both_decodes(response, projection):
+    body = json.dumps(response).encode()
+    return decode_serp(body, None), decode_serp(body, projection)
+
+
+def test_projection_keeps_only_the_listed_fields():
+    project = compile_projection({"keep": None, "items": {"a": None}, "inner": {"b": {"c": None}}})
+
+    value = {"keep": {"x": 1}, "drop": 2, "items": [{"a": 1, "z": 2}, 3], "inner": {"b": [{"c": 1, "d": 2}]}}
+
+    assert project(value) == {"keep": {"x": 1}, "items": [{"a": 1}, 3], "inner": {"b": [{"c": 1}]}}
+    assert project([value, "text"])[1] == "text"
+    assert compile_projection(None) is None
+
+
+def test_lean_flight_decode_drops_unused_fields():
+    full, lean = both_decodes(FLIGHT_RESPONSE, FLIGHT_PROJECTION)
+
+    assert set(lean) == {"best_flights", "other_flights"}
+    assert "booking_token" not in lean["best_flights"][0]
+    assert "airplane" not in lean["best_flights"][0]["flights"][0]
+    assert len(json.dumps(lean)) < len(json.dumps(full)) / 2
+
+
+def test_lean_flight_decode_renders_like_the_full_response():
+    full, lean = both_decodes(FLIGHT_RESPONSE, FLIGHT_PROJECTION)
+    full_leg, lean_leg = flight_module._parse_flights(full), flight_module._parse_flights(lean)
+    args = ("DEL", "GOI", "2030-05-01", "2030-05-05")
+
+    assert parse_flight_options(lean_leg[0]) == parse_flight_options(full_leg[0])
+    assert flight_module._flight_markdown(*args, lean_leg, lean_leg) == flight_module._flight_markdown(*args, full_leg, full_leg)
+    assert flight_module._flight_search_state(*args, lean_leg, lean_leg) == flight_module._flight_search_state(*args, full_leg, full_leg)
+    assert flight_module.format_flight_results(lean_leg[0], *args) == flight_module.format_flight_results(full_leg[0], *args)
+
+
+def test_lean_hotel_decode_renders_like_the_full_response():
+    full, lean = both_decodes(HOTEL_RESPONSE, HOTEL_PROJECTION)
+    full_hotels, _ = hotel_module._parse_hotels(full)
+    lean_hotels, _ = hotel_module._parse_hotels(lean)
+    args = ("Goa", "2030-05-01", "2030-05-05", 2, 1)
+
+    assert "images" not in lean_hotels[0] and "gps_coordinates" not in lean_hotels[0]
+    assert [hotel["name"] for hotel in rank_hotels(lean_hotels)] == [hotel["name"] for hotel in rank_hotels(full_hotels)]
+    assert hotel_module.format_hotel_markdown(lean_hotels, *args) == hotel_module.format_hotel_markdown(full_hotels, *args)
+    assert hotel_module.format_hotel_results(lean_hotels, *args) == hotel_module.format_hotel_results(full_hotels, *args)
+    assert hotel_module._hotel_search_state(lean_hotels, *args) == hotel_module._hotel_search_state(full_hotels, *args)
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_both_json_backends_decode_the_same(monkeypatch, backend):
+    if backend == "json":
+        monkeypatch.setattr(serp_decode, "orjson", None)
+    elif serp_decode.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    body = json.dumps(HOTEL_RESPONSE, ensure_ascii=False).encode()
+
+    assert decode_serp(body, HOTEL_PROJECTION) == HOTEL_PROJECTION(HOTEL_RESPONSE)
+
+
+def test_full_decode_when_lean_decoding_is_off(monkeypatch):
+    monkeypatch.setattr(serp_decode, "SERP_LEAN_DECODE", False)
+
+    assert decode_serp(json.dumps(FLIGHT_RESPONSE).encode(), FLIGHT_PROJECTION) == FLIGHT_RESPONSE
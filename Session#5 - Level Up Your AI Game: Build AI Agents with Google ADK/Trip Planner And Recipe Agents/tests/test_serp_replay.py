@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from agents import serp_client
+from agents.serp_replay import FixtureStore, ReplayServer, fixture_key
+
+SECRET = "sk-test-1234567890"
+PARAMS = {"engine": "google_flights", "departure_id": "DEL", "arrival_id": "GOI", "outbound_date": "2030-05-01"}
+BODY = json.dumps({
+    "search_metadata": {"google_flights_url": f"https://serpapi.com/search?api_key={SECRET}&engine=google_flights"},
+    "best_flights": [{"price": 5200}],
+})
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path, monkeypatch):
+    """Record one flight search through serp_client, as SERP_RECORD_DIR would."""
+    monkeypatch.setattr(serp_client, "SERP_RECORD_DIR", str(tmp_path))
+    serp_client._record({**PARAMS, "api_key": SECRET}, SimpleNamespace(status_code=200, text=BODY))
+    return tmp_path
+
+
+def test_fixture_key_ignores_the_api_key():
+    assert fixture_key({**PARAMS, "api_key": "one"}) == fixture_key({**PARAMS, "api_key": "two"}) == fixture_key(PARAMS)
+    assert fixture_key({**PARAMS, "outbound_date": "2030-05-02"}) != fixture_key(PARAMS)
+
+
+def test_recorded_fixture_has_the_api_key_redacted(fixtures_dir):
+    [path] = fixtures_dir.glob("*/*.json")
+    saved = path.read_text(encoding="utf-8")
+    fixture = json.loads(saved)
+
+    assert path.parent.name == "google_flights"
+    assert path.stem == fixture_key(PARAMS)
+    assert SECRET not in saved
+    assert "api_key" not in fixture["params"]
+    assert "api_key=REDACTED" in fixture["body"]
+    assert (fixture["status"], fixture["params"]) == (200, PARAMS)
+
+
+def test_replay_serves_the_recorded_response(fixtures_dir):
+    with ReplayServer(str(fixtures_dir)) as server:
+        response = requests.get(server.url, params={**PARAMS, "api_key": "a-different-key"}, timeout=5)
+
+    assert response.status_code == 200
+    assert response.json()["best_flights"] == [{"price": 5200}]
+    assert server.store.stats()["exact_hits"] == 1
+
+
+def test_missing_fixture_falls_back_to_the_engine_unless_strict(fixtures_dir):
+    other_date = {**PARAMS, "outbound_date": "2030-06-01"}
+    lenient, strict = FixtureStore(str(fixtures_dir)), FixtureStore(str(fixtures_dir), strict=True)
+
+    assert lenient.lookup(other_date) == (200, BODY.replace(SECRET, "REDACTED").encode())
+    assert lenient.lookup({**PARAMS, "engine": "google_hotels"}) is None
+    assert strict.lookup(other_date) is None
+    assert strict.lookup(PARAMS) is not None
+    assert (lenient.stats()["fallback_hits"], lenient.stats()["misses"]) == (1, 1)
+    assert (strict.stats()["exact_hits"], strict.stats()["misses"]) == (1, 1)
+
+
+def test_strict_replay_answers_404_for_a_missing_fixture(fixtures_dir):
+    other_date = {**PARAMS, "outbound_date": "2030-06-01"}
+
+    with ReplayServer(str(fixtures_dir), strict=True) as server:
+        missing = requests.get(server.url, params=other_date, timeout=5)
+    with ReplayServer(str(fixtures_dir)) as server:
+        fallback = requests.get(server.url, params=other_date, timeout=5)
+
+    assert missing.status_code == 404
+    assert fallback.status_code == 200
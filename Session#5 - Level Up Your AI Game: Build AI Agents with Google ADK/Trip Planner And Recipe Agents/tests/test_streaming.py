@@ -0,0 +1,56 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents.streaming import stream_trip_plan
+
+CHUNKS = ["Day 1: beach. ", "Day 2: fort. ", "Day 3: market."]
+
+
+class ChunkedLlm(BaseLlm):
+    """Answers in CHUNKS: partial responses when streaming, then the full text."""
+
+    model: str = "chunked-stub"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            for chunk in CHUNKS:
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="".join(CHUNKS))]))
+
+
+def _collect(streaming):
+    async def run():
+        agent = LlmAgent(name="itinerary_generator_agent", model=ChunkedLlm(), instruction="Plan the trip.")
+        runner = InMemoryRunner(agent=agent, app_name="trip_planner_test")
+        session = await runner.session_service.create_session(app_name="trip_planner_test", user_id="user")
+        return [
+            update
+            async for update in stream_trip_plan(runner, "user", session.id, "Plan a trip", streaming)
+        ]
+
+    return asyncio.run(run())
+
+
+def test_streaming_yields_partial_itinerary_chunks_before_final():
+    updates = _collect(streaming=True)
+
+    deltas = [update["text"] for update in updates if update["type"] == "delta"]
+    assert deltas == CHUNKS
+    assert all(update["author"] == "itinerary_generator_agent" for update in updates)
+    assert updates[-1] == {"type": "final", "author": "itinerary_generator_agent", "text": "".join(CHUNKS)}
+
+
+def test_streaming_disabled_yields_only_final():
+    updates = _collect(streaming=False)
+
+    assert [update["type"] for update in updates] == ["final"]
+    assert updates[0]["text"] == "".join(CHUNKS)
@@ -0,0 +1,54 @@
+import asyncio
+
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents.model_router import LazyLlm, RoutedLlm
+from agents.trip_params import FLIGHT_PARAMS, DirectSearchAgent, _extractor_agent
+
+TRIP = {"departure_id": "DEL", "arrival_id": "GOI", "outbound_date": "2030-05-01", "return_date": "2030-05-05"}
+MARKDOWN = "## ✈️ FLIGHT SEARCH RESULTS\n\n1. IndiGo - ₹4,500"
+
+
+async def _search(trip_params):
+    return {"flight_search": {"departure_id": trip_params["departure_id"]}, "flight_results": MARKDOWN}
+
+
+def _run(state):
+    async def run():
+        stage = DirectSearchAgent(
+            name="flight_search_stage",
+            search=_search,
+            required=FLIGHT_PARAMS,
+            fallback_agent=LlmAgent(name="flight_search_agent", model="gemini-2.5-flash"),
+            output_key="flight_results",
+        )
+        runner = InMemoryRunner(agent=stage, app_name="direct_search_test")
+        session = await runner.session_service.create_session(
+            app_name="direct_search_test", user_id="user", state=state
+        )
+        message = types.Content(role="user", parts=[types.Part(text="Flights please")])
+        events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+        session = await runner.session_service.get_session(app_name="direct_search_test", user_id="user", session_id=session.id)
+        return events, session.state
+
+    return asyncio.run(run())
+
+
+def test_direct_search_shows_the_rendered_results_to_the_user():
+    events, state = _run({"trip_params": TRIP})
+
+    shown = [event for event in events if event.is_final_response() and event.content]
+    assert [part.text for event in shown for part in event.content.parts] == [MARKDOWN]
+    assert shown[0].author == "flight_search_stage"
+    assert state["flight_results"] == MARKDOWN
+    assert state["flight_search"] == {"departure_id": "DEL"}
+
+
+def test_extractor_reads_the_date_per_request_through_the_model_router():
+    extractor = _extractor_agent()
+
+    assert "CURRENT DATE CONTEXT" in extractor.static_instruction
+    assert callable(extractor.instruction)
+    assert isinstance(extractor.model, (LazyLlm, RoutedLlm))
@@ -0,0 +1,42 @@
+import importlib
+
+summary_module = importlib.import_module("agents.itinerary_generator_agent")
+
+FLIGHTS = {
+    "departure_id": "DEL",
+    "arrival_id": "GOI",
+    "outbound_date": "2030-01-01",
+    "return_date": "2030-01-05",
+    "outbound": [{"price": 5000, "legs": []}],
+    "return": [],
+}
+
+
+def test_travelers_default_to_workflow_adults_without_hotel_search():
+    summary = summary_module.build_trip_summary(FLIGHTS, None)
+    assert "| Travelers | 2 |" in summary
+    assert "Flights (2 pax) | ₹10,000" in summary
+
+
+def test_travelers_read_from_trip_params():
+    summary = summary_module.build_trip_summary(FLIGHTS, None, {"adults": 3, "rooms": 2})
+    assert "| Travelers | 3 |" in summary
+    assert "Flights (3 pax) | ₹15,000" in summary
+
+
+def test_top_rated_hotel_prefers_cheaper_then_priced_on_ties():
+    hotels = [
+        {"name": "No price", "rating": 4.5, "reviews": 100},
+        {"name": "Pricey", "rating": 4.5, "reviews": 100, "price": 9000},
+        {"name": "Cheap", "rating": 4.5, "reviews": 100, "price": 4000},
+    ]
+    assert summary_module._top_rated_hotel(hotels)["name"] == "Cheap"
+    assert summary_module._top_rated_hotel(hotels[:1] + hotels[1:2])["name"] == "Pricey"
+
+
+def test_top_rated_hotel_rating_beats_price():
+    hotels = [
+        {"name": "Good", "rating": 4.8, "reviews": 10},
+        {"name": "Okay", "rating": 4.0, "reviews": 10, "price": 1000},
+    ]
+    assert summary_module._top_rated_hotel(hotels)["name"] == "Good"